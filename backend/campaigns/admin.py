@@ -4,8 +4,12 @@ from django.contrib import admin
 from django.contrib.gis.admin import GISModelAdmin
 from django.contrib.gis.geos import GEOSGeometry
 
+from .backfill import schedule_backfill
 from .models import Campaign
 
+# Changes to these fields affect which measurements belong to a campaign
+MEMBERSHIP_FIELDS = {"region", "start_time", "end_time"}
+
 
 @admin.register(Campaign)
 class CampaignAdmin(GISModelAdmin):
@@ -37,7 +41,9 @@ class CampaignAdmin(GISModelAdmin):
     def save_model(self, request, obj, form, change):
         """Save the model instance.
 
-        If no region is selected, set it to the world region.
+        If no region is selected, set it to the world region. When the campaign is created or
+        its region or time window changes, existing measurements are re-associated with it in
+        the background.
 
         Parameters
         ----------
@@ -71,6 +77,10 @@ class CampaignAdmin(GISModelAdmin):
 
         super().save_model(request, obj, form, change)
 
+        if not change or MEMBERSHIP_FIELDS.intersection(form.changed_data):
+            schedule_backfill(obj.pk)
+            self.message_user(request, "Existing measurements are being re-associated with this campaign.")
+
     def get_fieldsets(self, request, obj=None):
         """Override get_fieldsets to add help text to the region field.
 
@@ -16,3 +16,7 @@ class CampaignsConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "campaigns"
+
+    def ready(self):
+        """Import signals when the app is ready."""
+        from . import signals  # noqa: F401
@@ -0,0 +1,206 @@
+"""Recompute campaign membership of existing measurements."""
+
+import logging
+import threading
+
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from measurement_export.models import MeasurementChange
+from measurements.models import Measurement
+
+from .models import Campaign, CampaignBackfill
+from .statistics import rebuild_campaign_statistics
+
+logger = logging.getLogger("WATERWATCH")
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# A measurement belongs to a campaign if its location lies in the region and its local
+# timestamp, interpreted in the default timezone, lies within the campaign's time window.
+# This mirrors the check done in MeasurementSerializer.create.
+_MATCH_CONDITION = """
+    ST_Contains(c.region, m.location)
+    AND ((m.local_date + m.local_time) AT TIME ZONE %(tz)s) BETWEEN c.start_time AND c.end_time
+"""
+
+_DELETE_SQL = f"""
+    DELETE FROM {{through}} mc
+    USING {{measurement}} m, {{campaign}} c
+    WHERE mc.campaign_id = %(campaign_id)s
+      AND c.id = mc.campaign_id
+      AND m.id = mc.measurement_id
+      AND m.id > %(lower)s AND m.id <= %(upper)s
+      AND NOT ({_MATCH_CONDITION})
+"""
+
+_INSERT_SQL = f"""
+    INSERT INTO {{through}} (measurement_id, campaign_id)
+    SELECT m.id, c.id
+    FROM {{measurement}} m
+    JOIN {{campaign}} c ON c.id = %(campaign_id)s
+    WHERE m.id > %(lower)s AND m.id <= %(upper)s
+      AND {_MATCH_CONDITION}
+    ON CONFLICT (measurement_id, campaign_id) DO NOTHING
+"""
+
+
+# Wraps the statements above to log the measurements they change for the change feed. The row
+# count of the wrapped statement is the number of changed memberships.
+_LOG_CHANGES_SQL = """
+    WITH changed AS ({statement} RETURNING measurement_id)
+    INSERT INTO {change_log} (measurement_id, operation, changed_at)
+    SELECT measurement_id, '{operation}', now() FROM changed
+"""
+
+
+def _format_sql(sql):
+    statement = sql.format(
+        through=Measurement.campaigns.through._meta.db_table,
+        measurement=Measurement._meta.db_table,
+        campaign=Campaign._meta.db_table,
+    )
+    return _LOG_CHANGES_SQL.format(
+        statement=statement.strip(), change_log=MeasurementChange._meta.db_table, operation=MeasurementChange.UPDATE
+    )
+
+
+def backfill_campaign_membership(campaign_id, chunk_size=DEFAULT_CHUNK_SIZE, start_after=0):
+    """Recompute which measurements belong to a campaign.
+
+    Measurements are processed in ranges of ``chunk_size`` ids, each in its own transaction,
+    using one set-based DELETE and one set-based INSERT on the through table per range. Rows
+    are therefore only locked for the duration of a single chunk. The last processed id is
+    stored in ``CampaignBackfill`` in the same transaction, so an interrupted run can be
+    resumed from it.
+
+    Parameters
+    ----------
+    campaign_id : int
+        The id of the campaign to backfill
+    chunk_size : int, optional
+        The number of measurement ids processed per transaction
+    start_after : int, optional
+        Only process measurements with an id greater than this, used to resume an interrupted run
+
+    Yields
+    ------
+    tuple[int, int, int]
+        (last processed measurement id, rows inserted, rows deleted) for each chunk
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    max_id = Measurement.objects.aggregate(max_id=Max("id"))["max_id"] or 0
+    delete_sql = _format_sql(_DELETE_SQL)
+    insert_sql = _format_sql(_INSERT_SQL)
+    tz = timezone.get_default_timezone_name()
+    CampaignBackfill.objects.update_or_create(
+        campaign_id=campaign_id, defaults={"last_id": start_after, "finished_at": None}
+    )
+
+    lower = start_after
+    while lower < max_id:
+        upper = min(lower + chunk_size, max_id)
+        params = {"campaign_id": campaign_id, "lower": lower, "upper": upper, "tz": tz}
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(delete_sql, params)
+            deleted = cursor.rowcount
+            cursor.execute(insert_sql, params)
+            inserted = cursor.rowcount
+            CampaignBackfill.objects.filter(campaign_id=campaign_id).update(last_id=upper)
+        yield upper, inserted, deleted
+        lower = upper
+
+
+def finish_backfill(campaign_id):
+    """Rebuild the statistics of a backfilled campaign and mark its backfill as finished.
+
+    Parameters
+    ----------
+    campaign_id : int
+        The id of the backfilled campaign
+    """
+    rebuild_campaign_statistics(campaign_id)
+    CampaignBackfill.objects.filter(campaign_id=campaign_id).update(finished_at=timezone.now())
+
+
+def get_resume_id(campaign_id):
+    """Get the id of the last measurement processed by an unfinished backfill of a campaign.
+
+    Parameters
+    ----------
+    campaign_id : int
+        The id of the campaign
+
+    Returns
+    -------
+    int or None
+        The id to resume after, or None if the campaign has no unfinished backfill
+    """
+    return (
+        CampaignBackfill.objects.filter(campaign_id=campaign_id, finished_at__isnull=True)
+        .values_list("last_id", flat=True)
+        .first()
+    )
+
+
+def run_backfill(campaign_id, chunk_size=DEFAULT_CHUNK_SIZE, start_after=0):
+    """Run a full backfill for a campaign, logging progress, and rebuild its statistics.
+
+    Parameters
+    ----------
+    campaign_id : int
+        The id of the campaign to backfill
+    chunk_size : int, optional
+        The number of measurement ids processed per transaction
+    start_after : int, optional
+        Only process measurements with an id greater than this
+
+    Returns
+    -------
+    tuple[int, int]
+        Total number of rows inserted and deleted
+    """
+    total_inserted = total_deleted = 0
+    for last_id, inserted, deleted in backfill_campaign_membership(campaign_id, chunk_size, start_after):
+        total_inserted += inserted
+        total_deleted += deleted
+        logger.info("Campaign %s backfill processed up to measurement %s", campaign_id, last_id)
+    finish_backfill(campaign_id)
+    logger.info(
+        "Campaign %s backfill finished: %d measurements added, %d removed", campaign_id, total_inserted, total_deleted
+    )
+    return total_inserted, total_deleted
+
+
+def _run_backfill_in_thread(campaign_id):
+    try:
+        run_backfill(campaign_id)
+    except Exception:
+        logger.exception(
+            "Backfill of campaign %s failed after measurement %s, resume it with "
+            "`manage.py backfill_campaign %s --resume`",
+            campaign_id,
+            get_resume_id(campaign_id),
+            campaign_id,
+        )
+    finally:
+        # Threads get their own database connection which Django does not close for us
+        connection.close()
+
+
+def schedule_backfill(campaign_id):
+    """Run a backfill for a campaign in a background thread once the current transaction commits.
+
+    The thread does not survive a restart of the worker. Its progress is stored, so a backfill
+    that was interrupted can be resumed with ``manage.py backfill_campaign <id> --resume``.
+
+    Parameters
+    ----------
+    campaign_id : int
+        The id of the campaign to backfill
+    """
+    transaction.on_commit(
+        lambda: threading.Thread(target=_run_backfill_in_thread, args=(campaign_id,), daemon=True).start()
+    )
@@ -0,0 +1,218 @@
+"""In-process index used to resolve active campaigns without querying the database."""
+
+import bisect
+import hashlib
+import logging
+import threading
+import uuid
+
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Campaign
+
+logger = logging.getLogger("WATERWATCH")
+
+VERSION_KEY = "campaign_index:version"
+
+
+class IndexedCampaign:
+    """A campaign together with the pre-computed data needed to match it.
+
+    Attributes
+    ----------
+    campaign : Campaign
+        The indexed campaign instance
+    start_time : datetime.datetime
+        The start date and time of the campaign
+    end_time : datetime.datetime
+        The end date and time of the campaign
+    extent : tuple[float, float, float, float] or None
+        Bounding box of the region as (xmin, ymin, xmax, ymax), None if the region is empty
+    prepared : PreparedGeometry or None
+        Prepared region geometry for fast repeated containment checks
+    region_etag : str or None
+        Hash of the region geometry, used to reference the region in API responses
+    """
+
+    __slots__ = ("campaign", "end_time", "extent", "prepared", "region_etag", "start_time")
+
+    def __init__(self, campaign):
+        self.campaign = campaign
+        self.start_time = campaign.start_time
+        self.end_time = campaign.end_time
+        region = campaign.region
+        if region and not region.empty:
+            self.extent = region.extent
+            self.prepared = region.prepared
+            self.region_etag = hashlib.md5(bytes(region.wkb)).hexdigest()
+        else:
+            self.extent = None
+            self.prepared = None
+            self.region_etag = None
+
+    def contains(self, x, y, point):
+        """Check whether the campaign region contains the given point.
+
+        Parameters
+        ----------
+        x : float
+            Longitude of the point
+        y : float
+            Latitude of the point
+        point : Point
+            The same point as a GEOS geometry
+
+        Returns
+        -------
+        bool
+            True if the point lies strictly inside the region (same semantics as ``region__contains``).
+        """
+        if self.prepared is None:
+            return False
+        xmin, ymin, xmax, ymax = self.extent
+        if x < xmin or x > xmax or y < ymin or y > ymax:
+            return False
+        return self.prepared.contains(point)
+
+
+class CampaignIndex:
+    """Index of all campaigns, ordered by start time, with prepared regions.
+
+    The index is built lazily from the database and rebuilt whenever the shared version
+    token in the ``campaign_cache`` changes. The token is replaced once a transaction that
+    saved or deleted a Campaign commits, so all worker processes pick up changes on their
+    next lookup, and never rebuild from rows that are not committed yet.
+
+    A thread that changed campaigns in a transaction that is still open sees its own
+    uncommitted rows, so it builds a private index until the transaction ends instead of
+    sharing one that could turn out to be rolled back.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._version = None
+        # (start times, entries, entries by id), swapped together on rebuild
+        self._snapshot = ([], [], {})
+
+    def _current_version(self):
+        version_cache = caches["campaign_cache"]
+        version = version_cache.get(VERSION_KEY)
+        if version is None:
+            # add() is atomic, so concurrent workers agree on a single token
+            version_cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+            version = version_cache.get(VERSION_KEY)
+        return version
+
+    def _has_pending_changes(self):
+        if not getattr(self._local, "pending", False):
+            return False
+        if not transaction.get_connection().in_atomic_block:
+            # The transaction that changed campaigns was committed or rolled back
+            self._local.pending = False
+            return False
+        return True
+
+    def _fresh_snapshot(self):
+        if self._has_pending_changes():
+            return self._build()
+        version = self._current_version()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._snapshot = self._build()
+                    self._version = version
+                    logger.debug("Rebuilt campaign index with %d campaigns", len(self._snapshot[1]))
+        return self._snapshot
+
+    @staticmethod
+    def _build():
+        entries = [IndexedCampaign(c) for c in Campaign.objects.order_by("start_time", "id")]
+        return [e.start_time for e in entries], entries, {e.campaign.id: e for e in entries}
+
+    def invalidate(self):
+        """Invalidate the index in every process sharing the campaign cache."""
+        caches["campaign_cache"].set(VERSION_KEY, uuid.uuid4().hex, None)
+        self._version = None
+
+    def invalidate_on_commit(self):
+        """Invalidate the index once the current transaction commits.
+
+        Until then, lookups in the current thread read the campaigns of its own transaction.
+        """
+        self._local.pending = True
+        transaction.on_commit(self._committed)
+
+    def _committed(self):
+        self._local.pending = False
+        self.invalidate()
+
+    def get(self, campaign_id):
+        """Get the indexed entry of a single campaign.
+
+        Parameters
+        ----------
+        campaign_id : int
+            The id of the campaign
+
+        Returns
+        -------
+        IndexedCampaign or None
+            The indexed campaign, None if no campaign with this id exists
+        """
+        return self._fresh_snapshot()[2].get(campaign_id)
+
+    def find_entries(self, dt, point=None, until=None):
+        """Find the indexed campaigns active at a datetime, optionally containing a point.
+
+        Parameters
+        ----------
+        dt : datetime.datetime
+            The datetime to check, naive datetimes are interpreted in the default timezone
+        point : Point, optional
+            The location the campaign region must contain
+        until : datetime.datetime, optional
+            End of a period starting at ``dt``; campaigns active at any time of the period match
+
+        Returns
+        -------
+        list[IndexedCampaign]
+            The matching indexed campaigns ordered by end time
+        """
+        starts, entries, _by_id = self._fresh_snapshot()
+        if timezone.is_naive(dt):
+            dt = timezone.make_aware(dt)
+        if until is None:
+            until = dt
+        elif timezone.is_naive(until):
+            until = timezone.make_aware(until)
+
+        # Only campaigns that started at or before the end of the period can be active
+        candidates = [e for e in entries[: bisect.bisect_right(starts, until)] if e.end_time >= dt]
+        if point is not None:
+            candidates = [e for e in candidates if e.contains(point.x, point.y, point)]
+
+        candidates.sort(key=lambda e: (e.end_time, e.campaign.id))
+        return candidates
+
+    def find(self, dt, point=None):
+        """Find the campaigns active at a datetime, optionally containing a point.
+
+        Parameters
+        ----------
+        dt : datetime.datetime
+            The datetime to check, naive datetimes are interpreted in the default timezone
+        point : Point, optional
+            The location the campaign region must contain
+
+        Returns
+        -------
+        list[Campaign]
+            The matching campaigns ordered by end time
+        """
+        return [e.campaign for e in self.find_entries(dt, point)]
+
+
+campaign_index = CampaignIndex()
@@ -0,0 +1,87 @@
+"""Recompute campaign membership of existing measurements."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from campaigns.backfill import DEFAULT_CHUNK_SIZE, backfill_campaign_membership, finish_backfill, get_resume_id
+from campaigns.models import Campaign
+
+
+class Command(BaseCommand):
+    """Management command to backfill the measurements of a campaign.
+
+    Measurements are processed in id ranges, each in its own transaction. The last processed
+    id is printed and stored after every chunk, so an interrupted run, including one started
+    from the admin, can be resumed with `--resume` or `--start-after`.
+
+    Usage:
+    python manage.py backfill_campaign <campaign_id> [--chunk-size N] [--start-after ID | --resume]
+    """
+
+    help = "Recompute which existing measurements belong to a campaign"
+
+    def add_arguments(self, parser):
+        """Add command line arguments for the management command.
+
+        Parameters
+        ----------
+        parser : ArgumentParser
+            The argument parser to which the command line arguments will be added.
+        """
+        parser.add_argument("campaign_id", type=int, help="Id of the campaign to backfill")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Number of measurement ids processed per transaction",
+        )
+        resume = parser.add_mutually_exclusive_group()
+        resume.add_argument(
+            "--start-after",
+            type=int,
+            default=0,
+            help="Resume after this measurement id",
+        )
+        resume.add_argument(
+            "--resume",
+            action="store_true",
+            help="Resume after the last measurement processed by an unfinished backfill",
+        )
+
+    def handle(self, *_args, **options):
+        """Handle the command execution.
+
+        Parameters
+        ----------
+        *_args : tuple
+            Positional arguments passed to the command.
+        **options : dict
+            Keyword arguments passed to the command.
+        """
+        campaign_id = options["campaign_id"]
+        if not Campaign.objects.filter(id=campaign_id).exists():
+            raise CommandError(f"Campaign {campaign_id} does not exist")
+
+        start_after = options["start_after"]
+        if options["resume"]:
+            start_after = get_resume_id(campaign_id)
+            if start_after is None:
+                raise CommandError(f"Campaign {campaign_id} has no unfinished backfill")
+            self.stdout.write(f"Resuming after measurement {start_after}")
+
+        total_inserted = total_deleted = 0
+        try:
+            for last_id, inserted, deleted in backfill_campaign_membership(
+                campaign_id, options["chunk_size"], start_after
+            ):
+                total_inserted += inserted
+                total_deleted += deleted
+                self.stdout.write(f"Processed up to measurement {last_id} (+{inserted} / -{deleted})")
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+
+        finish_backfill(campaign_id)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Campaign {campaign_id} backfilled: {total_inserted} measurements added, {total_deleted} removed."
+            )
+        )
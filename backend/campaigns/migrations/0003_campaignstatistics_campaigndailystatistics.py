@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-19 07:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0002_campaign_campaigns_c_region_16212e_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampaignStatistics',
+            fields=[
+                ('campaign', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to='campaigns.campaign')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('temperature_count', models.PositiveIntegerField(default=0)),
+                ('temperature_sum', models.DecimalField(decimal_places=1, default=0, max_digits=14)),
+                ('temperature_min', models.DecimalField(blank=True, decimal_places=1, max_digits=4, null=True)),
+                ('temperature_max', models.DecimalField(blank=True, decimal_places=1, max_digits=4, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CampaignDailyStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('temperature_count', models.PositiveIntegerField(default=0)),
+                ('temperature_sum', models.DecimalField(decimal_places=1, default=0, max_digits=14)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_statistics', to='campaigns.campaign')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('campaign', 'date'), name='unique_campaign_daily_statistics')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 08:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0003_campaignstatistics_campaigndailystatistics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampaignBackfill',
+            fields=[
+                ('campaign', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='backfill', serialize=False, to='campaigns.campaign')),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
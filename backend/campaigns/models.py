@@ -42,3 +42,93 @@ class Campaign(models.Model):
     def format_time(self):
         """Format the start and end time of the campaign."""
         return f"{self.start_time.strftime('%Y-%m-%d %H:%M')} - {self.end_time.strftime('%Y-%m-%d %H:%M')}"
+
+
+class CampaignStatistics(models.Model):
+    """Model for the maintained summary statistics of a campaign.
+
+    Attributes
+    ----------
+    campaign : Campaign
+        The campaign the statistics belong to
+    count : int
+        Number of measurements in the campaign
+    temperature_count : int
+        Number of measurements with a temperature value
+    temperature_sum : decimal.Decimal
+        Sum of all temperature values, used to derive the average
+    temperature_min : decimal.Decimal, optional
+        Lowest recorded temperature
+    temperature_max : decimal.Decimal, optional
+        Highest recorded temperature
+    updated_at : datetime.datetime
+        Datetime of the last update
+    """
+
+    campaign = models.OneToOneField(Campaign, on_delete=models.CASCADE, primary_key=True, related_name="statistics")
+    count = models.PositiveIntegerField(default=0)
+    temperature_count = models.PositiveIntegerField(default=0)
+    temperature_sum = models.DecimalField(max_digits=14, decimal_places=1, default=0)
+    temperature_min = models.DecimalField(max_digits=4, decimal_places=1, null=True, blank=True)
+    temperature_max = models.DecimalField(max_digits=4, decimal_places=1, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Statistics: {self.campaign_id} ({self.count} measurements)"
+
+
+class CampaignDailyStatistics(models.Model):
+    """Model for the maintained per-day statistics of a campaign.
+
+    Attributes
+    ----------
+    campaign : Campaign
+        The campaign the statistics belong to
+    date : datetime.date
+        The local date of the measurements
+    count : int
+        Number of measurements on this date
+    temperature_count : int
+        Number of measurements with a temperature value on this date
+    temperature_sum : decimal.Decimal
+        Sum of the temperature values on this date
+    """
+
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name="daily_statistics")
+    date = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+    temperature_count = models.PositiveIntegerField(default=0)
+    temperature_sum = models.DecimalField(max_digits=14, decimal_places=1, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["campaign", "date"], name="unique_campaign_daily_statistics"),
+        ]
+
+    def __str__(self):
+        return f"Daily statistics: {self.campaign_id} {self.date} ({self.count} measurements)"
+
+
+class CampaignBackfill(models.Model):
+    """Model for the progress of the latest membership backfill of a campaign.
+
+    Attributes
+    ----------
+    campaign : Campaign
+        The campaign being backfilled
+    last_id : int
+        Id of the last measurement processed, from where an interrupted backfill is resumed
+    finished_at : datetime.datetime, optional
+        Datetime the backfill finished, empty while it is running or after it was interrupted
+    updated_at : datetime.datetime
+        Datetime of the last update
+    """
+
+    campaign = models.OneToOneField(Campaign, on_delete=models.CASCADE, primary_key=True, related_name="backfill")
+    last_id = models.BigIntegerField(default=0)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        state = "finished" if self.finished_at else f"at measurement {self.last_id}"
+        return f"Backfill: {self.campaign_id} ({state})"
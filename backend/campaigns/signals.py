@@ -0,0 +1,196 @@
+"""Signal handlers to keep the campaign index and statistics in sync with the database."""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from measurements.models import Measurement, Temperature
+
+from .index import campaign_index
+from .models import Campaign
+from .statistics import add_to_statistics, rebuild_campaign_statistics, remove_from_statistics
+
+CampaignMembership = Measurement.campaigns.through
+
+
+def invalidate_campaign_index(sender, **_kwargs):  # noqa: ARG001
+    """Signal handler to invalidate the in-process campaign index once the change commits.
+
+    Parameters
+    ----------
+    sender : Model
+        The model class that triggered the signal.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    campaign_index.invalidate_on_commit()
+
+
+def _campaign_ids(measurement_id):
+    return list(CampaignMembership.objects.filter(measurement_id=measurement_id).values_list("campaign_id", flat=True))
+
+
+def _temperature_value(measurement_id):
+    return Temperature.objects.filter(measurement_id=measurement_id).values_list("value", flat=True).first()
+
+
+def remember_stored_values(sender, instance, **_kwargs):
+    """Signal handler to remember the stored date of a measurement or value of a temperature before a save.
+
+    Parameters
+    ----------
+    sender : Model
+        The model class that triggered the signal.
+    instance : Measurement | Temperature
+        The instance that is about to be saved.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    field = "local_date" if sender is Measurement else "value"
+    stored = None
+    if instance.pk is not None:
+        stored = sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+    instance._stored_value = stored
+
+
+def update_statistics_on_measurement_save(sender, instance, created, **_kwargs):  # noqa: ARG001
+    """Signal handler to move an edited measurement to its new date in the statistics of its campaigns.
+
+    Parameters
+    ----------
+    sender : Model
+        The model class that triggered the signal.
+    instance : Measurement
+        The measurement that was saved.
+    created : bool
+        Whether the measurement was created.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    previous_date = instance.__dict__.pop("_stored_value", None)
+    if created or previous_date is None or str(previous_date) == str(instance.local_date):
+        return
+
+    campaign_ids = _campaign_ids(instance.id)
+    if campaign_ids:
+        value = _temperature_value(instance.id)
+        remove_from_statistics(campaign_ids, previous_date, 1, value)
+        add_to_statistics(campaign_ids, instance.local_date, 1, value)
+
+
+def update_statistics_on_measurement_delete(sender, instance, **_kwargs):  # noqa: ARG001
+    """Signal handler to remove a deleted measurement from the statistics of its campaigns.
+
+    Its temperature is removed by ``update_statistics_on_temperature_delete``, as the
+    temperature is deleted along with the measurement.
+
+    Parameters
+    ----------
+    sender : Model
+        The model class that triggered the signal.
+    instance : Measurement
+        The measurement that is about to be deleted.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    remove_from_statistics(_campaign_ids(instance.id), instance.local_date, 1)
+
+
+def update_statistics_on_temperature_save(sender, instance, created, **_kwargs):  # noqa: ARG001
+    """Signal handler to add a new or changed temperature to the statistics of its measurement's campaigns.
+
+    Parameters
+    ----------
+    sender : Model
+        The model class that triggered the signal.
+    instance : Temperature
+        The temperature that was saved.
+    created : bool
+        Whether the temperature was created.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    previous_value = instance.__dict__.pop("_stored_value", None)
+    if not created and (previous_value is None or previous_value == instance.value):
+        return
+
+    campaign_ids = _campaign_ids(instance.measurement_id)
+    if not campaign_ids:
+        return
+    local_date = Measurement.objects.filter(id=instance.measurement_id).values_list("local_date", flat=True).first()
+    if not created:
+        remove_from_statistics(campaign_ids, local_date, 0, previous_value)
+    add_to_statistics(campaign_ids, local_date, 0, instance.value)
+
+
+def update_statistics_on_temperature_delete(sender, instance, **_kwargs):  # noqa: ARG001
+    """Signal handler to remove a deleted temperature from the statistics of its measurement's campaigns.
+
+    Parameters
+    ----------
+    sender : Model
+        The model class that triggered the signal.
+    instance : Temperature
+        The temperature that is about to be deleted.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    campaign_ids = _campaign_ids(instance.measurement_id)
+    if not campaign_ids:
+        return
+    local_date = Measurement.objects.filter(id=instance.measurement_id).values_list("local_date", flat=True).first()
+    remove_from_statistics(campaign_ids, local_date, 0, instance.value, measurement_id=instance.measurement_id)
+
+
+def update_statistics_on_membership_change(sender, instance, action, reverse, pk_set, **_kwargs):  # noqa: ARG001
+    """Signal handler to add measurements to or remove them from the statistics of campaigns they join or leave.
+
+    Changes made from the campaign side may touch many measurements, so the statistics of the
+    campaign are rebuilt instead.
+
+    Parameters
+    ----------
+    sender : Model
+        The through model of the membership.
+    instance : Measurement | Campaign
+        The measurement, or with ``reverse`` the campaign, whose membership changed.
+    action : str
+        The kind of change, e.g. "post_add".
+    reverse : bool
+        Whether the change was made from the campaign side.
+    pk_set : set[int] | None
+        Ids of the added or removed campaigns, or with ``reverse`` measurements.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    if reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            rebuild_campaign_statistics(instance.id)
+        return
+
+    if action == "pre_clear":
+        instance._cleared_campaign_ids = _campaign_ids(instance.id)
+        return
+    if action == "post_clear":
+        campaign_ids = instance.__dict__.pop("_cleared_campaign_ids", [])
+    elif action in ("post_add", "post_remove") and pk_set:
+        campaign_ids = pk_set
+    else:
+        return
+
+    if not campaign_ids:
+        return
+    value = _temperature_value(instance.id)
+    if action == "post_add":
+        add_to_statistics(campaign_ids, instance.local_date, 1, value)
+    else:
+        remove_from_statistics(campaign_ids, instance.local_date, 1, value)
+
+
+post_save.connect(invalidate_campaign_index, sender=Campaign)
+post_delete.connect(invalidate_campaign_index, sender=Campaign)
+
+pre_save.connect(remember_stored_values, sender=Measurement)
+pre_save.connect(remember_stored_values, sender=Temperature)
+post_save.connect(update_statistics_on_measurement_save, sender=Measurement)
+post_save.connect(update_statistics_on_temperature_save, sender=Temperature)
+pre_delete.connect(update_statistics_on_measurement_delete, sender=Measurement)
+pre_delete.connect(update_statistics_on_temperature_delete, sender=Temperature)
+m2m_changed.connect(update_statistics_on_membership_change, sender=CampaignMembership)
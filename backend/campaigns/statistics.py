@@ -0,0 +1,245 @@
+"""Maintain the materialised per-campaign statistics."""
+
+from django.db import connection, transaction
+from measurements.models import Measurement, Temperature
+
+from .models import CampaignDailyStatistics, CampaignStatistics
+
+_THROUGH = Measurement.campaigns.through._meta.db_table
+
+_ADD_TOTALS_SQL = f"""
+    INSERT INTO {CampaignStatistics._meta.db_table} AS s
+        (campaign_id, count, temperature_count, temperature_sum, temperature_min, temperature_max, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s, now())
+    ON CONFLICT (campaign_id) DO UPDATE SET
+        count = s.count + EXCLUDED.count,
+        temperature_count = s.temperature_count + EXCLUDED.temperature_count,
+        temperature_sum = s.temperature_sum + EXCLUDED.temperature_sum,
+        temperature_min = LEAST(s.temperature_min, EXCLUDED.temperature_min),
+        temperature_max = GREATEST(s.temperature_max, EXCLUDED.temperature_max),
+        updated_at = now()
+"""
+
+_ADD_DAILY_SQL = f"""
+    INSERT INTO {CampaignDailyStatistics._meta.db_table} AS d
+        (campaign_id, date, count, temperature_count, temperature_sum)
+    VALUES (%s, %s, %s, %s, %s)
+    ON CONFLICT (campaign_id, date) DO UPDATE SET
+        count = d.count + EXCLUDED.count,
+        temperature_count = d.temperature_count + EXCLUDED.temperature_count,
+        temperature_sum = d.temperature_sum + EXCLUDED.temperature_sum
+"""
+
+_REMOVE_TOTALS_SQL = f"""
+    UPDATE {CampaignStatistics._meta.db_table}
+    SET count = count - %s,
+        temperature_count = temperature_count - %s,
+        temperature_sum = temperature_sum - %s,
+        updated_at = now()
+    WHERE campaign_id = ANY(%s)
+"""
+
+_REMOVE_DAILY_SQL = f"""
+    UPDATE {CampaignDailyStatistics._meta.db_table}
+    SET count = count - %s,
+        temperature_count = temperature_count - %s,
+        temperature_sum = temperature_sum - %s
+    WHERE campaign_id = ANY(%s) AND date = %s
+"""
+
+_DELETE_EMPTY_DAYS_SQL = f"""
+    DELETE FROM {CampaignDailyStatistics._meta.db_table}
+    WHERE campaign_id = ANY(%s) AND date = %s AND count = 0 AND temperature_count = 0
+"""
+
+# The lowest or highest temperature cannot be subtracted, so it is looked up again once removed
+_RESET_EXTREMES_SQL = f"""
+    UPDATE {CampaignStatistics._meta.db_table} s
+    SET temperature_min = (
+            SELECT MIN(t.value) FROM {_THROUGH} mc
+            JOIN {Temperature._meta.db_table} t ON t.measurement_id = mc.measurement_id
+            WHERE mc.campaign_id = s.campaign_id AND mc.measurement_id IS DISTINCT FROM %(excluded)s
+        ),
+        temperature_max = (
+            SELECT MAX(t.value) FROM {_THROUGH} mc
+            JOIN {Temperature._meta.db_table} t ON t.measurement_id = mc.measurement_id
+            WHERE mc.campaign_id = s.campaign_id AND mc.measurement_id IS DISTINCT FROM %(excluded)s
+        )
+    WHERE s.campaign_id = ANY(%(campaign_ids)s) AND %(value)s IN (s.temperature_min, s.temperature_max)
+"""
+
+_ENSURE_TOTALS_SQL = f"""
+    INSERT INTO {CampaignStatistics._meta.db_table} (campaign_id, count, temperature_count, temperature_sum, updated_at)
+    VALUES (%(campaign_id)s, 0, 0, 0, now())
+    ON CONFLICT (campaign_id) DO NOTHING
+"""
+
+_LOCK_TOTALS_SQL = f"""
+    SELECT 1 FROM {CampaignStatistics._meta.db_table} WHERE campaign_id = %(campaign_id)s FOR UPDATE
+"""
+
+_REBUILD_TOTALS_SQL = f"""
+    UPDATE {CampaignStatistics._meta.db_table} s
+    SET count = r.count,
+        temperature_count = r.temperature_count,
+        temperature_sum = r.temperature_sum,
+        temperature_min = r.temperature_min,
+        temperature_max = r.temperature_max,
+        updated_at = now()
+    FROM (
+        SELECT COUNT(*) AS count, COUNT(t.value) AS temperature_count,
+            COALESCE(SUM(t.value), 0) AS temperature_sum, MIN(t.value) AS temperature_min,
+            MAX(t.value) AS temperature_max
+        FROM {_THROUGH} mc
+        LEFT JOIN {Temperature._meta.db_table} t ON t.measurement_id = mc.measurement_id
+        WHERE mc.campaign_id = %(campaign_id)s
+    ) r
+    WHERE s.campaign_id = %(campaign_id)s
+"""
+
+_REBUILD_DAILY_SQL = f"""
+    INSERT INTO {CampaignDailyStatistics._meta.db_table}
+        (campaign_id, date, count, temperature_count, temperature_sum)
+    SELECT %(campaign_id)s, m.local_date, COUNT(*), COUNT(t.value), COALESCE(SUM(t.value), 0)
+    FROM {_THROUGH} mc
+    JOIN {Measurement._meta.db_table} m ON m.id = mc.measurement_id
+    LEFT JOIN {Temperature._meta.db_table} t ON t.measurement_id = mc.measurement_id
+    WHERE mc.campaign_id = %(campaign_id)s
+    GROUP BY m.local_date
+    ON CONFLICT (campaign_id, date) DO UPDATE SET
+        count = EXCLUDED.count,
+        temperature_count = EXCLUDED.temperature_count,
+        temperature_sum = EXCLUDED.temperature_sum
+"""
+
+
+def add_to_statistics(campaign_ids, local_date, count, temperature_value=None):
+    """Add a measurement, or only its temperature, to the statistics of its campaigns.
+
+    Every change updates the totals row of a campaign before its daily rows, so concurrent
+    changes and rebuilds of a campaign are serialised by the lock on its totals row.
+
+    Parameters
+    ----------
+    campaign_ids : Iterable[int]
+        Ids of the campaigns the measurement belongs to
+    local_date : datetime.date
+        The local date of the measurement
+    count : int
+        1 to add the measurement itself, 0 to only add its temperature
+    temperature_value : decimal.Decimal or float, optional
+        The temperature of the measurement, if it has one
+    """
+    campaign_ids = sorted(campaign_ids)
+    if not campaign_ids:
+        return
+
+    has_temperature = 1 if temperature_value is not None else 0
+    temperature_sum = temperature_value if temperature_value is not None else 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            _ADD_TOTALS_SQL,
+            [
+                (campaign_id, count, has_temperature, temperature_sum, temperature_value, temperature_value)
+                for campaign_id in campaign_ids
+            ],
+        )
+        cursor.executemany(
+            _ADD_DAILY_SQL,
+            [(campaign_id, local_date, count, has_temperature, temperature_sum) for campaign_id in campaign_ids],
+        )
+
+
+def remove_from_statistics(campaign_ids, local_date, count, temperature_value=None, measurement_id=None):
+    """Remove a measurement, or only its temperature, from the statistics of its campaigns.
+
+    Parameters
+    ----------
+    campaign_ids : Iterable[int]
+        Ids of the campaigns the measurement belonged to
+    local_date : datetime.date
+        The local date of the measurement
+    count : int
+        1 to remove the measurement itself, 0 to only remove its temperature
+    temperature_value : decimal.Decimal or float, optional
+        The removed temperature, if any
+    measurement_id : int, optional
+        Id of the measurement, if its temperature is still stored while the statistics are updated
+    """
+    campaign_ids = sorted(campaign_ids)
+    if not campaign_ids:
+        return
+
+    has_temperature = 1 if temperature_value is not None else 0
+    temperature_sum = temperature_value if temperature_value is not None else 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(_REMOVE_TOTALS_SQL, [count, has_temperature, temperature_sum, campaign_ids])
+        if temperature_value is not None:
+            cursor.execute(
+                _RESET_EXTREMES_SQL,
+                {"campaign_ids": campaign_ids, "value": temperature_value, "excluded": measurement_id},
+            )
+        cursor.execute(_REMOVE_DAILY_SQL, [count, has_temperature, temperature_sum, campaign_ids, local_date])
+        cursor.execute(_DELETE_EMPTY_DAYS_SQL, [campaign_ids, local_date])
+
+
+def rebuild_campaign_statistics(campaign_id):
+    """Recompute the statistics of a campaign from its current measurements.
+
+    Used after membership was changed in bulk, e.g. by a backfill. The totals row of the
+    campaign is locked first, so changes made concurrently are applied either before the
+    rebuild reads the measurements or on top of its result.
+
+    Parameters
+    ----------
+    campaign_id : int
+        The id of the campaign
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(_ENSURE_TOTALS_SQL, {"campaign_id": campaign_id})
+        cursor.execute(_LOCK_TOTALS_SQL, {"campaign_id": campaign_id})
+        cursor.execute(_REBUILD_TOTALS_SQL, {"campaign_id": campaign_id})
+        CampaignDailyStatistics.objects.filter(campaign_id=campaign_id).delete()
+        cursor.execute(_REBUILD_DAILY_SQL, {"campaign_id": campaign_id})
+
+
+def get_campaign_statistics(campaign_id):
+    """Get the statistics of a campaign in their response format.
+
+    Parameters
+    ----------
+    campaign_id : int
+        The id of the campaign
+
+    Returns
+    -------
+    dict
+        Dictionary with the measurement count, temperature summary and per-day histogram
+    """
+    totals = CampaignStatistics.objects.filter(campaign_id=campaign_id).first()
+    daily = CampaignDailyStatistics.objects.filter(campaign_id=campaign_id).order_by("date")
+
+    temperature = {"count": 0, "avg": None, "min": None, "max": None}
+    if totals and totals.temperature_count:
+        temperature = {
+            "count": totals.temperature_count,
+            "avg": float(totals.temperature_sum) / totals.temperature_count,
+            "min": float(totals.temperature_min),
+            "max": float(totals.temperature_max),
+        }
+
+    return {
+        "campaign_id": campaign_id,
+        "count": totals.count if totals else 0,
+        "temperature": temperature,
+        "daily": [
+            {
+                "date": day.date,
+                "count": day.count,
+                "avg_temperature": float(day.temperature_sum) / day.temperature_count
+                if day.temperature_count
+                else None,
+            }
+            for day in daily
+        ],
+    }
@@ -0,0 +1,136 @@
+"""Tests for the campaign membership backfill."""
+
+from datetime import UTC, datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from measurements.models import Measurement
+
+from campaigns.backfill import _run_backfill_in_thread, backfill_campaign_membership, run_backfill
+from campaigns.models import Campaign, CampaignBackfill
+
+
+class CampaignBackfillTest(TestCase):
+    """Test cases for backfilling campaign membership."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for the test cases."""
+        cls.campaign = Campaign.objects.create(
+            name="Backfill",
+            description="Campaign created after the measurements",
+            start_time=datetime(2025, 5, 14, 0, 0, tzinfo=UTC),
+            end_time=datetime(2025, 5, 16, 0, 0, tzinfo=UTC),
+            region=MultiPolygon(Polygon(((0, 0), (1, 0), (1, 1), (0, 1), (0, 0)))),
+        )
+        cls.inside = [
+            Measurement.objects.create(
+                location=Point(0.5, 0.5), local_date="2025-05-15", local_time="12:00:00", water_source="well"
+            )
+            for _ in range(5)
+        ]
+        cls.outside_region = Measurement.objects.create(
+            location=Point(2.5, 2.5), local_date="2025-05-15", local_time="12:00:00", water_source="well"
+        )
+        cls.outside_time = Measurement.objects.create(
+            location=Point(0.5, 0.5), local_date="2025-06-15", local_time="12:00:00", water_source="well"
+        )
+
+    def test_backfill_adds_matching_measurements(self):
+        inserted, deleted = run_backfill(self.campaign.id, chunk_size=2)
+
+        assert inserted == 5
+        assert deleted == 0
+        member_ids = set(self.campaign.measurement_set.values_list("id", flat=True))
+        assert member_ids == {m.id for m in self.inside}
+
+    def test_backfill_removes_stale_memberships(self):
+        self.outside_region.campaigns.add(self.campaign)
+
+        _, deleted = run_backfill(self.campaign.id)
+
+        assert deleted == 1
+        assert not self.outside_region.campaigns.exists()
+
+    def test_backfill_is_idempotent(self):
+        run_backfill(self.campaign.id)
+        assert run_backfill(self.campaign.id) == (0, 0)
+
+    def test_backfill_follows_region_changes(self):
+        run_backfill(self.campaign.id)
+        self.campaign.region = MultiPolygon(Polygon(((2, 2), (3, 2), (3, 3), (2, 3), (2, 2))))
+        self.campaign.save()
+
+        run_backfill(self.campaign.id)
+
+        assert list(self.campaign.measurement_set.all()) == [self.outside_region]
+
+    def test_backfill_resumes_after_id(self):
+        resume_after = self.inside[2].id
+        chunks = list(backfill_campaign_membership(self.campaign.id, chunk_size=1, start_after=resume_after))
+
+        assert all(last_id > resume_after for last_id, _, _ in chunks)
+        member_ids = set(self.campaign.measurement_set.values_list("id", flat=True))
+        assert member_ids == {m.id for m in self.inside[3:]}
+
+    def test_backfill_rejects_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            list(backfill_campaign_membership(self.campaign.id, chunk_size=0))
+
+    def test_backfill_command(self):
+        out = StringIO()
+        call_command("backfill_campaign", self.campaign.id, "--chunk-size", "3", stdout=out)
+
+        assert "5 measurements added" in out.getvalue()
+        assert self.campaign.measurement_set.count() == 5
+
+    def test_backfill_stores_progress(self):
+        chunks = backfill_campaign_membership(self.campaign.id, chunk_size=1)
+        last_id, _, _ = next(chunks)
+
+        backfill = CampaignBackfill.objects.get(campaign=self.campaign)
+        assert backfill.last_id == last_id
+        assert backfill.finished_at is None
+
+        run_backfill(self.campaign.id)
+        backfill.refresh_from_db()
+        assert backfill.last_id == self.outside_time.id
+        assert backfill.finished_at is not None
+
+    def test_backfill_command_resumes_unfinished_backfill(self):
+        CampaignBackfill.objects.create(campaign=self.campaign, last_id=self.inside[2].id)
+
+        call_command("backfill_campaign", self.campaign.id, "--resume", stdout=StringIO())
+
+        member_ids = set(self.campaign.measurement_set.values_list("id", flat=True))
+        assert member_ids == {m.id for m in self.inside[3:]}
+        with self.assertRaises(CommandError):
+            call_command("backfill_campaign", self.campaign.id, "--resume", stdout=StringIO())
+
+    def test_failed_background_backfill_is_logged(self):
+        CampaignBackfill.objects.create(campaign=self.campaign, last_id=self.inside[1].id)
+
+        # The thread closes its connection when done, which must not close the test's connection
+        with (
+            patch("campaigns.backfill.run_backfill", side_effect=RuntimeError("Connection lost")),
+            patch("campaigns.backfill.connection"),
+            self.assertLogs("WATERWATCH", level="ERROR") as logs,
+        ):
+            _run_backfill_in_thread(self.campaign.id)
+
+        assert f"failed after measurement {self.inside[1].id}" in logs.output[0]
+
+    @override_settings(TIME_ZONE="UTC")
+    def test_backfill_window_uses_local_time(self):
+        late = Measurement.objects.create(
+            location=Point(0.5, 0.5), local_date="2025-05-16", local_time="00:00:00", water_source="well"
+        )
+        self.campaign.end_time += timedelta(seconds=-1)
+        self.campaign.save()
+
+        run_backfill(self.campaign.id)
+
+        assert not late.campaigns.exists()
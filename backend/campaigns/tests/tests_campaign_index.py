@@ -0,0 +1,85 @@
+"""Tests for the in-process campaign index."""
+
+from datetime import UTC, datetime
+
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.core.cache import caches
+from django.test import TestCase
+
+from campaigns.index import VERSION_KEY, campaign_index
+from campaigns.models import Campaign
+
+
+class CampaignIndexTest(TestCase):
+    """Test cases for the campaign index."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for the test cases, committed as far as the index is concerned."""
+        # The shared index outlives the rolled back test data
+        cls.addClassCleanup(campaign_index.invalidate)
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls._create_campaigns()
+
+    @classmethod
+    def _create_campaigns(cls):
+        cls.square = Campaign.objects.create(
+            name="Square",
+            description="Unit square",
+            start_time=datetime(2025, 5, 14, 10, 0, tzinfo=UTC),
+            end_time=datetime(2025, 5, 16, 10, 0, tzinfo=UTC),
+            region=MultiPolygon(Polygon(((0, 0), (1, 0), (1, 1), (0, 1), (0, 0)))),
+        )
+        cls.far = Campaign.objects.create(
+            name="Far",
+            description="Far away square",
+            start_time=datetime(2025, 5, 14, 10, 0, tzinfo=UTC),
+            end_time=datetime(2025, 5, 15, 10, 0, tzinfo=UTC),
+            region=MultiPolygon(Polygon(((2, 2), (3, 2), (3, 3), (2, 3), (2, 2)))),
+        )
+
+    def test_find_by_time_orders_by_end_time(self):
+        result = campaign_index.find(datetime(2025, 5, 14, 12, 0, tzinfo=UTC))
+        assert [c.name for c in result] == ["Far", "Square"]
+
+    def test_find_excludes_inactive(self):
+        assert campaign_index.find(datetime(2025, 5, 14, 9, 0, tzinfo=UTC)) == []
+        result = campaign_index.find(datetime(2025, 5, 15, 12, 0, tzinfo=UTC))
+        assert [c.name for c in result] == ["Square"]
+
+    def test_find_by_location(self):
+        dt = datetime(2025, 5, 14, 12, 0, tzinfo=UTC)
+        assert [c.name for c in campaign_index.find(dt, Point(0.5, 0.5))] == ["Square"]
+        assert [c.name for c in campaign_index.find(dt, Point(2.5, 2.5))] == ["Far"]
+        assert campaign_index.find(dt, Point(1.5, 1.5)) == []
+
+    def test_find_accepts_naive_datetime(self):
+        result = campaign_index.find(datetime(2025, 5, 14, 12, 0), Point(0.5, 0.5))  # noqa: DTZ001
+        assert [c.name for c in result] == ["Square"]
+
+    def test_find_does_not_query_when_fresh(self):
+        dt = datetime(2025, 5, 14, 12, 0, tzinfo=UTC)
+        campaign_index.find(dt)
+        with self.assertNumQueries(0):
+            campaign_index.find(dt, Point(0.5, 0.5))
+
+    def test_index_refreshed_on_save_and_delete(self):
+        self.addCleanup(campaign_index.invalidate)
+        dt = datetime(2025, 5, 14, 12, 0, tzinfo=UTC)
+        campaign_index.find(dt)
+        version = caches["campaign_cache"].get(VERSION_KEY)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.far.region = MultiPolygon(Polygon(((0, 0), (2, 0), (2, 2), (0, 2), (0, 0))))
+            self.far.save()
+            # Other processes keep the committed index, this transaction sees its own change
+            assert caches["campaign_cache"].get(VERSION_KEY) == version
+            assert [c.name for c in campaign_index.find(dt, Point(1.5, 1.5))] == ["Far"]
+        assert caches["campaign_cache"].get(VERSION_KEY) != version
+        assert [c.name for c in campaign_index.find(dt, Point(1.5, 1.5))] == ["Far"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.far.delete()
+        assert [c.name for c in campaign_index.find(dt)] == ["Square"]
+        with self.assertNumQueries(0):
+            campaign_index.find(dt)
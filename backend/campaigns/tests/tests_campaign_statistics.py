@@ -0,0 +1,142 @@
+"""Tests for the materialised campaign statistics."""
+
+from datetime import UTC, datetime
+
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.test import TestCase
+from measurement_collection.serializers import MeasurementSerializer
+from measurements.models import Measurement, Temperature
+
+from campaigns.models import Campaign, CampaignStatistics
+from campaigns.statistics import rebuild_campaign_statistics
+
+
+class CampaignStatisticsTest(TestCase):
+    """Test cases for maintaining and serving campaign statistics."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for the test cases."""
+        cls.campaign = Campaign.objects.create(
+            name="Statistics",
+            description="Campaign with statistics",
+            start_time=datetime(2025, 5, 1, 0, 0, tzinfo=UTC),
+            end_time=datetime(2025, 5, 31, 0, 0, tzinfo=UTC),
+            region=MultiPolygon(Polygon(((0, 0), (1, 0), (1, 1), (0, 1), (0, 0)))),
+        )
+
+    def _add_measurement(self, local_date, value):
+        serializer = MeasurementSerializer(
+            data={
+                "local_date": local_date,
+                "local_time": "12:00:00",
+                "location": Point(0.5, 0.5),
+                "water_source": "well",
+                "temperature": {"sensor": "Test Sensor", "value": value, "time_waited": "00:01:00"},
+            }
+        )
+        assert serializer.is_valid(), serializer.errors
+        return serializer.save()
+
+    def test_statistics_updated_on_insert(self):
+        self._add_measurement("2025-05-10", 20.0)
+        self._add_measurement("2025-05-10", 10.0)
+        self._add_measurement("2025-05-11", 30.0)
+
+        stats = CampaignStatistics.objects.get(campaign=self.campaign)
+        assert stats.count == 3
+        assert stats.temperature_count == 3
+        assert float(stats.temperature_sum) == 60.0
+        assert float(stats.temperature_min) == 10.0
+        assert float(stats.temperature_max) == 30.0
+
+    def _assert_statistics_rebuilt(self):
+        """Assert the maintained statistics equal the statistics rebuilt from the measurements."""
+        stats = CampaignStatistics.objects.filter(campaign=self.campaign).values().first()
+        daily = list(self.campaign.daily_statistics.order_by("date").values("date", "count", "temperature_count"))
+        rebuild_campaign_statistics(self.campaign.id)
+        rebuilt = CampaignStatistics.objects.filter(campaign=self.campaign).values().first()
+        stats.pop("updated_at")
+        rebuilt.pop("updated_at")
+        assert stats == rebuilt
+        assert daily == list(
+            self.campaign.daily_statistics.order_by("date").values("date", "count", "temperature_count")
+        )
+
+    def test_statistics_updated_on_edit_and_delete(self):
+        coldest = self._add_measurement("2025-05-10", 10.0)
+        hottest = self._add_measurement("2025-05-11", 30.0)
+        self._add_measurement("2025-05-11", 20.0)
+
+        hottest.temperature.value = 25.0
+        hottest.temperature.save()
+        coldest.local_date = "2025-05-12"
+        coldest.save()
+        coldest.delete()
+        self._assert_statistics_rebuilt()
+
+        stats = CampaignStatistics.objects.get(campaign=self.campaign)
+        assert stats.count == 2
+        assert float(stats.temperature_sum) == 45.0
+        assert float(stats.temperature_min) == 20.0
+        assert float(stats.temperature_max) == 25.0
+        assert [day.date.isoformat() for day in self.campaign.daily_statistics.all()] == ["2025-05-11"]
+
+    def test_statistics_updated_on_membership_change(self):
+        measurement = self._add_measurement("2025-05-10", 20.0)
+        self._add_measurement("2025-05-11", 30.0)
+
+        measurement.campaigns.remove(self.campaign)
+        self._assert_statistics_rebuilt()
+        assert CampaignStatistics.objects.get(campaign=self.campaign).count == 1
+
+        self.campaign.measurement_set.add(measurement)
+        measurement.temperature.delete()
+        self._assert_statistics_rebuilt()
+        stats = CampaignStatistics.objects.get(campaign=self.campaign)
+        assert (stats.count, stats.temperature_count) == (2, 1)
+
+        measurement.campaigns.clear()
+        self._assert_statistics_rebuilt()
+        assert CampaignStatistics.objects.get(campaign=self.campaign).count == 1
+
+    def test_statistics_endpoint(self):
+        self._add_measurement("2025-05-10", 20.0)
+        self._add_measurement("2025-05-10", 10.0)
+        self._add_measurement("2025-05-11", 30.0)
+
+        response = self.client.get(f"/api/campaigns/{self.campaign.id}/statistics/")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 3
+        assert data["temperature"] == {"count": 3, "avg": 20.0, "min": 10.0, "max": 30.0}
+        assert data["daily"] == [
+            {"date": "2025-05-10", "count": 2, "avg_temperature": 15.0},
+            {"date": "2025-05-11", "count": 1, "avg_temperature": 30.0},
+        ]
+
+    def test_statistics_endpoint_without_measurements(self):
+        response = self.client.get(f"/api/campaigns/{self.campaign.id}/statistics/")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 0
+        assert data["temperature"]["avg"] is None
+        assert data["daily"] == []
+
+    def test_statistics_endpoint_unknown_campaign(self):
+        response = self.client.get("/api/campaigns/999999/statistics/")
+        assert response.status_code == 404
+
+    def test_rebuild_statistics(self):
+        measurement = Measurement.objects.create(
+            location=Point(0.5, 0.5), local_date="2025-05-12", local_time="12:00:00", water_source="well"
+        )
+        Temperature.objects.create(measurement=measurement, sensor="Test", value=12.5, time_waited="00:01:00")
+        measurement.campaigns.add(self.campaign)
+
+        rebuild_campaign_statistics(self.campaign.id)
+
+        stats = CampaignStatistics.objects.get(campaign=self.campaign)
+        assert stats.count == 1
+        assert float(stats.temperature_min) == 12.5
+        assert self.campaign.daily_statistics.get().date.isoformat() == "2025-05-12"
@@ -6,6 +6,7 @@ from datetime import UTC, datetime
 from django.contrib.gis.geos import MultiPolygon, Polygon
 from django.test import TestCase
 
+from campaigns.index import campaign_index
 from campaigns.models import Campaign
 
 logger = logging.getLogger(__name__)
@@ -71,3 +72,79 @@ class CampaignsEndpointTest(TestCase):
         assert "World Water Day 2025" in retrieved_names
         assert "World Water Week 2023" not in retrieved_names
         assert "World Water Week 2026" not in retrieved_names
+
+    def test_get_active_campaigns_references_region(self):
+        dt = datetime(2025, 5, 14, 11, 30, tzinfo=UTC)
+        response = self.client.get("/api/campaigns/active/", {"datetime": dt.isoformat(), "lat": 0.5, "lng": 0.5})
+        campaign = response.json()["campaigns"][0]
+        assert "region" not in campaign
+        assert campaign["region_etag"]
+
+        region_response = self.client.get(f"/api/campaigns/{campaign['id']}/region/")
+        assert region_response.status_code == 200
+        assert region_response.json()["type"] == "MultiPolygon"
+        assert region_response["ETag"] == f'"{campaign["region_etag"]}"'
+
+        not_modified = self.client.get(
+            f"/api/campaigns/{campaign['id']}/region/", HTTP_IF_NONE_MATCH=region_response["ETag"]
+        )
+        assert not_modified.status_code == 304
+
+    def test_get_campaign_region_not_found(self):
+        response = self.client.get("/api/campaigns/999999/region/")
+        assert response.status_code == 404
+
+    def test_get_active_campaigns_cached_per_minute_and_cell(self):
+        first = self.client.get(
+            "/api/campaigns/active/",
+            {"datetime": datetime(2025, 5, 14, 11, 30, 5, tzinfo=UTC).isoformat(), "lat": 0.5001, "lng": 0.5001},
+        )
+        with self.assertNumQueries(0):
+            second = self.client.get(
+                "/api/campaigns/active/",
+                {"datetime": datetime(2025, 5, 14, 11, 30, 45, tzinfo=UTC).isoformat(), "lat": 0.5002, "lng": 0.5},
+            )
+        assert first.json() == second.json()
+
+    def test_get_active_campaigns_starting_and_ending_within_the_minute(self):
+        # Committing replaces the shared index, which must not outlive the rolled back test data
+        self.addCleanup(campaign_index.invalidate)
+        with self.captureOnCommitCallbacks(execute=True):
+            Campaign.objects.create(
+                name="Lunch Break",
+                description="Campaign starts and ends mid-minute",
+                start_time=datetime(2025, 6, 1, 12, 0, 30, tzinfo=UTC),
+                end_time=datetime(2025, 6, 1, 12, 1, 30, tzinfo=UTC),
+                region=self.region,
+            )
+
+        def names(*time):
+            dt = datetime(2025, 6, 1, *time, tzinfo=UTC)
+            response = self.client.get("/api/campaigns/active/", {"datetime": dt.isoformat(), "lat": 0.5, "lng": 0.5})
+            return [c["name"] for c in response.json()["campaigns"]]
+
+        # The first request of each minute is cached, later ones are answered from it
+        assert names(12, 0, 10) == []
+        assert names(12, 0, 40) == ["Lunch Break"]
+        assert names(12, 1, 10) == ["Lunch Break"]
+        assert names(12, 1, 40) == []
+
+    def test_get_active_campaigns_not_modified(self):
+        params = {"datetime": datetime(2025, 5, 14, 11, 30, tzinfo=UTC).isoformat(), "lat": 0.5, "lng": 0.5}
+        response = self.client.get("/api/campaigns/active/", params)
+        assert response["ETag"]
+
+        not_modified = self.client.get("/api/campaigns/active/", params, headers={"If-None-Match": response["ETag"]})
+        assert not_modified.status_code == 304
+
+        # Committing replaces the shared index, which must not outlive the rolled back test data
+        self.addCleanup(campaign_index.invalidate)
+        with self.captureOnCommitCallbacks(execute=True):
+            Campaign.objects.filter(pk=self.active_campaign.pk).first().save()
+        modified = self.client.get("/api/campaigns/active/", params, headers={"If-None-Match": response["ETag"]})
+        assert modified.status_code == 200
+
+    def test_get_active_campaigns_invalid_location(self):
+        dt = datetime(2025, 5, 14, 11, 30, tzinfo=UTC)
+        response = self.client.get("/api/campaigns/active/", {"datetime": dt.isoformat(), "lat": "x", "lng": "y"})
+        assert response.status_code == 400
@@ -8,4 +8,6 @@ app_name = "api"
 
 urlpatterns = [
     path("active/", views.get_active_campaigns, name="active-campaigns"),
+    path("<int:campaign_id>/region/", views.get_campaign_region, name="campaign-region"),
+    path("<int:campaign_id>/statistics/", views.campaign_statistics_view, name="campaign-statistics"),
 ]
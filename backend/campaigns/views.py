@@ -2,21 +2,48 @@
 
 # Create your views here.
 import logging
+import os
+from datetime import UTC, timedelta
 
 from django.contrib.gis.geos import Point
-from django.http import JsonResponse
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
 from django.utils.dateparse import parse_datetime
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from dotenv import load_dotenv
+from measurement_analysis.conditional import CAMPAIGNS, conditional_view, get_versions
 from rest_framework.decorators import api_view
 
-from .models import Campaign
+from .index import campaign_index
+from .statistics import get_campaign_statistics
+
+load_dotenv()
+cache_timeout = int(os.getenv("DJANGO_CACHE_TIMEOUT", 300))  # Default to 5 minutes
 
 logger = logging.getLogger("WATERWATCH")
 
+# Coordinates are rounded to the same precision as stored measurement locations (~100 m)
+COORDINATE_PRECISION = 3
+
+
+def _active_campaigns_versions(request):
+    parameters = {name: request.GET.get(name) for name in ("datetime", "lat", "lng")}
+    return get_versions([CAMPAIGNS]), parameters
 
+
+@conditional_view(_active_campaigns_versions)
 @api_view(["GET"])
 def get_active_campaigns(request):
     """View to handle incoming requests for active campaigns.
 
+    The campaigns active at any time of the requested minute are cached per minute and per
+    rounded location cell, and filtered to the requested datetime. Region geometries are not
+    included; each campaign carries a ``region_etag`` and the geometry is served by
+    ``get_campaign_region``. Supports conditional requests with an ETag that changes with the
+    Campaign table.
+
     Attributes
     ----------
     request : HttpRequest
@@ -30,30 +57,123 @@ def get_active_campaigns(request):
     dt_string = request.GET.get("datetime")
     lat = request.GET.get("lat")
     lng = request.GET.get("lng")
-    dt = parse_datetime(dt_string)
+    dt = parse_datetime(dt_string) if dt_string else None
 
     if not dt:
         return JsonResponse({"error": "Invalid or missing datetime"}, status=400)
-    matching_campaigns = find_matching_campaigns(dt, lat, lng)
 
-    results = [
+    try:
+        if timezone.is_naive(dt):
+            dt = timezone.make_aware(dt)
+        minute = _bucket_datetime(dt)
+        if lat and lng:
+            lat = round(float(lat), COORDINATE_PRECISION)
+            lng = round(float(lng), COORDINATE_PRECISION)
+        else:
+            lat = lng = None
+    except ValueError:
+        return JsonResponse({"error": "Invalid lat/lng"}, status=400)
+
+    cache_key = f"active_campaigns:{minute.isoformat()}:{lat}:{lng}"
+    candidates = cache.get(cache_key)
+    if candidates is None:
+        candidates = _serialize_active_campaigns(minute, lat, lng)
+        cache.set(cache_key, candidates, cache_timeout)
+
+    # Campaigns may start or end within the minute
+    results = [c for c in candidates if c["start_time"] <= dt <= c["end_time"]]
+    return JsonResponse({"campaigns": results})
+
+
+def _bucket_datetime(dt):
+    """Truncate an aware datetime to the start of its minute in UTC."""
+    return dt.astimezone(UTC).replace(second=0, microsecond=0)
+
+
+def _serialize_active_campaigns(minute, lat, lng):
+    """Serialize the campaigns active during a minute, referencing regions by ETag instead of embedding them."""
+    until = minute + timedelta(minutes=1) - timedelta(microseconds=1)
+    if lat is None or lng is None:
+        logger.warning("No lat/lng provided, returning all campaigns")
+        entries = campaign_index.find_entries(minute, until=until)
+    else:
+        entries = campaign_index.find_entries(minute, Point(lng, lat, srid=4326), until=until)
+
+    return [
         {
-            "id": c.id,
-            "name": c.name,
-            "description": c.description,
-            "start_time": c.start_time,
-            "end_time": c.end_time,
-            "region": c.region.geojson if c.region else None,
+            "id": e.campaign.id,
+            "name": e.campaign.name,
+            "description": e.campaign.description,
+            "start_time": e.campaign.start_time,
+            "end_time": e.campaign.end_time,
+            "region_etag": e.region_etag,
         }
-        for c in matching_campaigns
+        for e in entries
     ]
 
-    return JsonResponse({"campaigns": results})
+
+def _region_etag(_request, campaign_id):
+    entry = campaign_index.get(campaign_id)
+    return entry.region_etag if entry else None
+
+
+@condition(etag_func=_region_etag)
+@cache_control(public=True, max_age=cache_timeout)
+@api_view(["GET"])
+def get_campaign_region(_request, campaign_id):
+    """Get the region of a campaign as GeoJSON.
+
+    The response carries an ETag derived from the region geometry, so clients can revalidate
+    with ``If-None-Match`` and receive a 304 when the region did not change.
+
+    Parameters
+    ----------
+    _request : HttpRequest
+        The HTTP request object.
+    campaign_id : int
+        The id of the campaign.
+
+    Returns
+    -------
+    HttpResponse
+        The region as a GeoJSON MultiPolygon, or a 404 JSON response if the campaign or region does not exist.
+    """
+    entry = campaign_index.get(campaign_id)
+    if entry is None or entry.region_etag is None:
+        return JsonResponse({"error": "Campaign region not found"}, status=404)
+    return HttpResponse(entry.campaign.region.geojson, content_type="application/geo+json")
+
+
+@api_view(["GET"])
+def campaign_statistics_view(_request, campaign_id):
+    """Get the maintained statistics of a campaign.
+
+    The statistics are updated incrementally when measurements are added, so this view only
+    reads the stored summary and per-day rows instead of aggregating the campaign's measurements.
+
+    Parameters
+    ----------
+    _request : HttpRequest
+        The HTTP request object.
+    campaign_id : int
+        The id of the campaign.
+
+    Returns
+    -------
+    JsonResponse
+        JSON response with the measurement count, temperature count/avg/min/max and a per-day histogram.
+    """
+    if campaign_index.get(campaign_id) is None:
+        return JsonResponse({"error": "Campaign not found"}, status=404)
+    return JsonResponse(get_campaign_statistics(campaign_id))
 
 
 def find_matching_campaigns(dt, lat, lng):
     """Find matching campaigns based on datetime and location.
 
+    Campaigns are resolved from the in-process campaign index, so no database query is made
+    unless the index has to be rebuilt after a campaign changed.
+
     Attributes
     ----------
     dt : datetime
@@ -65,15 +185,11 @@ def find_matching_campaigns(dt, lat, lng):
 
     Returns
     -------
-    QuerySet
-        A QuerySet of matching Campaign objects
+    list[Campaign]
+        A list of matching Campaign objects ordered by end time
     """
     if not lat or not lng:
         logger.warning("No lat/lng provided, returning all campaigns")
-        return Campaign.objects.filter(start_time__lte=dt, end_time__gte=dt).order_by("end_time")
-    point = Point(float(lng), float(lat))
-    return (
-        Campaign.objects.filter(start_time__lte=dt, end_time__gte=dt)
-        .filter(region__contains=point)
-        .order_by("end_time")
-    )
+        return campaign_index.find(dt)
+    point = Point(float(lng), float(lat), srid=4326)
+    return campaign_index.find(dt, point)
@@ -0,0 +1,54 @@
+"""Add Regions to Admin view."""
+
+from django.contrib import admin
+from django.contrib.gis.admin import GISModelAdmin
+from measurement_export.models import Location
+
+from .models import Region
+from .regions import refresh_region_aggregates
+
+
+@admin.register(Region)
+class RegionAdmin(GISModelAdmin):
+    """Admin view for saved analysis regions."""
+
+    list_display = ("name", "country")
+    list_display_links = ("name",)
+    search_fields = ("name",)
+    actions = ["refresh_aggregates"]
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        """List countries by name when choosing the location of a region.
+
+        Parameters
+        ----------
+        db_field : ForeignKey
+            The foreign key field.
+        request : HttpRequest
+            The request object.
+        **kwargs : dict
+            Additional keyword arguments for the form field.
+
+        Returns
+        -------
+        ModelChoiceField
+            The form field for the foreign key.
+        """
+        if db_field.name == "location":
+            kwargs["queryset"] = Location.objects.order_by("country_name")
+            field = super().formfield_for_foreignkey(db_field, request, **kwargs)
+            field.label_from_instance = lambda location: location.country_name
+            return field
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    @admin.display(description="Country")
+    def country(self, obj):
+        """Get the country name of a country region."""
+        return obj.location.country_name if obj.location_id else None
+
+    @admin.action(description="Recompute precomputed aggregates")
+    def refresh_aggregates(self, request, queryset):
+        """Recompute the monthly aggregates of the selected regions."""
+        for region in queryset:
+            refresh_region_aggregates(region)
+        self.message_user(request, f"Recomputed aggregates of {queryset.count()} region(s).")
@@ -16,3 +16,7 @@ class MeasurementAnalysisConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "measurement_analysis"
+
+    def ready(self):
+        """Import signals when the app is ready."""
+        from . import signals  # noqa: F401
@@ -0,0 +1,112 @@
+"""Parse user-drawn boundaries into a canonical form shared by the queries and cache keys."""
+
+import hashlib
+import json
+from functools import lru_cache
+
+from django.contrib.gis.geos import GEOSException, GEOSGeometry
+
+# Coordinates are snapped to 7 decimals (about 1 cm), well below the precision of a drawn polygon
+BOUNDARY_PRECISION = 7
+BOUNDARY_CACHE_SIZE = 256
+
+
+class Boundary:
+    """A boundary in canonical form.
+
+    Two boundaries describing the same polygon with a different start vertex, ring orientation,
+    coordinate precision or formatting have the same canonical geometry and therefore the same key.
+
+    Attributes
+    ----------
+    geometry : GEOSGeometry
+        The canonical geometry in EPSG:4326
+    key : str
+        Hash of the canonical WKB, used in cache keys
+    extent : tuple[float, float, float, float] or None
+        Bounding box of the geometry as (xmin, ymin, xmax, ymax), None if the geometry is empty
+    prepared : PreparedGeometry
+        Prepared geometry for fast repeated spatial predicates
+    """
+
+    __slots__ = ("extent", "geometry", "key", "prepared")
+
+    def __init__(self, geometry):
+        self.geometry = geometry
+        self.key = hashlib.md5(bytes(geometry.wkb)).hexdigest()
+        self.extent = None if geometry.empty else geometry.extent
+        self.prepared = geometry.prepared
+
+
+def _snap(coordinates):
+    # Empty geometries and rings have no coordinates
+    if coordinates and isinstance(coordinates[0], (int | float)):
+        return [round(c, BOUNDARY_PRECISION) for c in coordinates[:2]]
+    return [_snap(c) for c in coordinates]
+
+
+def _snap_geojson(geojson):
+    if geojson["type"] == "GeometryCollection":
+        geojson["geometries"] = [_snap_geojson(member) for member in geojson["geometries"]]
+    else:
+        geojson["coordinates"] = _snap(geojson["coordinates"])
+    return geojson
+
+
+def _canonicalize(geometry):
+    """Snap a geometry to the precision grid and normalise its ring orientation and start points."""
+    geojson = _snap_geojson(json.loads(geometry.json))
+    snapped = GEOSGeometry(json.dumps(geojson), srid=4326)
+    snapped.normalize()
+    return snapped
+
+
+@lru_cache(maxsize=BOUNDARY_CACHE_SIZE)
+def parse_boundary(boundary_geometry):
+    """Parse a boundary into its canonical form.
+
+    Results are cached per input string, so repeated requests for the same boundary reuse the
+    parsed and prepared geometry.
+
+    Parameters
+    ----------
+    boundary_geometry : str
+        WKT (or any other format accepted by GEOS) of the boundary in EPSG:4326
+
+    Returns
+    -------
+    Boundary
+        The canonical boundary
+
+    Raises
+    ------
+    ValueError
+        If the boundary cannot be parsed.
+    """
+    try:
+        geometry = GEOSGeometry(boundary_geometry.strip(), srid=4326)
+        return Boundary(_canonicalize(geometry))
+    except (TypeError, ValueError, GEOSException) as err:
+        raise ValueError("Invalid boundary_geometry format") from err
+
+
+def boundary_cache_key(boundary_geometry):
+    """Get the cache key of a boundary.
+
+    Boundaries that cannot be parsed are keyed on their raw text; the query using them fails
+    with a validation error anyway.
+
+    Parameters
+    ----------
+    boundary_geometry : str
+        The boundary as sent by the client
+
+    Returns
+    -------
+    str
+        Hex digest identifying the boundary
+    """
+    try:
+        return parse_boundary(str(boundary_geometry)).key
+    except ValueError:
+        return hashlib.md5(str(boundary_geometry).encode()).hexdigest()
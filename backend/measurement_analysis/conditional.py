@@ -0,0 +1,194 @@
+"""Conditional requests for read endpoints, based on versions of the datasets they read."""
+
+import hashlib
+import json
+import os
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from dotenv import load_dotenv
+
+load_dotenv()
+# How long clients and proxies may reuse a response before revalidating it
+http_max_age = int(os.getenv("DJANGO_HTTP_MAX_AGE", 0))
+# How long a caching proxy may reuse a response, the window a purge hook closes early
+proxy_max_age = int(os.getenv("DJANGO_PROXY_MAX_AGE", 5))
+
+# Query parameters holding comma-separated lists, sent as JSON arrays in request bodies
+LIST_PARAMETERS = ("quantiles",)
+
+# Datasets read by the endpoints; measurements are versioned per month of the year
+LOCATIONS = "locations"
+PRESETS = "presets"
+CAMPAIGNS = "campaigns"
+REGIONS = "regions"
+
+
+def measurement_dataset(month):
+    """Get the dataset name of the measurements of a month of the year."""
+    return f"measurements:{month}"
+
+
+def _version_key(dataset):
+    return f"version:{dataset}"
+
+
+def get_versions(datasets):
+    """Get the current versions of datasets.
+
+    A version is the time of the last change to a dataset in nanoseconds. Datasets without a
+    known version, e.g. after the cache was flushed, start at the current time.
+
+    Parameters
+    ----------
+    datasets : Iterable[str]
+        Dataset names
+
+    Returns
+    -------
+    dict
+        Version per dataset
+    """
+    stats_cache = caches["stats_cache"]
+    keys = {_version_key(dataset): dataset for dataset in datasets}
+    versions = stats_cache.get_many(list(keys))
+    for key in keys.keys() - versions.keys():
+        # add() keeps the version of a worker that initialized it first
+        stats_cache.add(key, time.time_ns(), None)
+        versions[key] = stats_cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_versions(datasets):
+    """Mark datasets as changed, so responses built from them get a new ETag.
+
+    Parameters
+    ----------
+    datasets : Iterable[str]
+        Dataset names
+    """
+    now = time.time_ns()
+    caches["stats_cache"].set_many({_version_key(dataset): now for dataset in datasets}, None)
+
+
+def _not_modified(request, etag, last_modified):
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        return etag in parse_etags(if_none_match) or "*" in parse_etags(if_none_match)
+
+    if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+    return request.method in ("GET", "HEAD") and if_modified_since is not None and last_modified <= if_modified_since
+
+
+def _set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, public=True, max_age=http_max_age, s_maxage=proxy_max_age, must_revalidate=True)
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+def conditional_view(version_func, methods=("GET", "HEAD")):
+    """Answer requests whose data did not change with a 304 instead of building the response.
+
+    The ETag is derived from the versions of the datasets a request reads and the parameters
+    it was made with, so checking it only reads a few keys from the cache. Unlike
+    ``django.views.decorators.http.condition`` this also applies to the read-only POST
+    endpoints, whose body holds the query.
+
+    Parameters
+    ----------
+    version_func : Callable[[HttpRequest, ...], tuple | None]
+        Returns the dataset versions (see ``get_versions``) and a JSON-serialisable key of the
+        request parameters, or None if the request is not cacheable. A ValueError or TypeError
+        is treated as None, so the view can report the invalid parameters.
+    methods : tuple[str], optional
+        Methods of the view that read data; other methods are passed through
+
+    Returns
+    -------
+    Callable
+        The view decorator
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in methods:
+                return view(request, *args, **kwargs)
+            try:
+                validators = version_func(request, *args, **kwargs)
+            except (ValueError, TypeError):
+                validators = None
+            if validators is None:
+                return view(request, *args, **kwargs)
+
+            versions, parameters = validators
+            payload = json.dumps([sorted(versions.items()), parameters], sort_keys=True, default=str)
+            etag = quote_etag(hashlib.md5(payload.encode()).hexdigest())
+            last_modified = max(versions.values()) // 1_000_000_000 if versions else 0
+
+            if _not_modified(request, etag, last_modified):
+                return _set_validators(HttpResponseNotModified(), etag, last_modified)
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                _set_validators(response, etag, last_modified)
+            return response
+
+        return wrapped
+
+    return decorator
+
+
+def query_data(query_params):
+    """Convert query parameters to the shape of a JSON request body.
+
+    Parameters
+    ----------
+    query_params : QueryDict
+        Query parameters of a GET request
+
+    Returns
+    -------
+    dict
+        The parameters, with the values of ``LIST_PARAMETERS`` split into lists
+    """
+    return {name: value.split(",") if name in LIST_PARAMETERS else value for name, value in query_params.dict().items()}
+
+
+def request_parameters(request):
+    """Get the parameters of a read request from its query string or JSON body.
+
+    Parameters
+    ----------
+    request : HttpRequest
+        The request
+
+    Returns
+    -------
+    dict
+        The parameters
+
+    Raises
+    ------
+    ValueError
+        If the body is not valid JSON, or too large to be read by ``HttpRequest.body``.
+    TypeError
+        If the body is not a JSON object.
+    """
+    if request.method in ("GET", "HEAD"):
+        return query_data(request.GET)
+    max_size = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+    if max_size is not None and int(request.META.get("CONTENT_LENGTH") or 0) > max_size:
+        # Left to the view, which parses the body as a stream
+        raise ValueError("Request body too large")
+    data = json.loads(request.body or b"{}")
+    if not isinstance(data, dict):
+        raise TypeError("Request body must be a JSON object")
+    return data
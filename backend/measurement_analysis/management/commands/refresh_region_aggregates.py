@@ -0,0 +1,52 @@
+"""Recompute the precomputed aggregates of saved regions."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from measurement_analysis.models import Region
+from measurement_analysis.regions import refresh_region_aggregates
+
+
+class Command(BaseCommand):
+    """Management command to recompute the monthly aggregates of saved regions.
+
+    Aggregates are also computed on first use and removed when measurements change, so this
+    is only needed to warm them, e.g. after creating regions or importing measurements.
+
+    Usage:
+    python manage.py refresh_region_aggregates [region_id ...]
+    """
+
+    help = "Recompute the monthly aggregates of saved regions"
+
+    def add_arguments(self, parser):
+        """Add command line arguments for the management command.
+
+        Parameters
+        ----------
+        parser : ArgumentParser
+            The argument parser to which the command line arguments will be added.
+        """
+        parser.add_argument("region_ids", nargs="*", type=int, help="Ids of the regions to refresh (default: all)")
+
+    def handle(self, *_args, **options):
+        """Handle the command execution.
+
+        Parameters
+        ----------
+        *_args : tuple
+            Positional arguments passed to the command.
+        **options : dict
+            Keyword arguments passed to the command.
+        """
+        regions = Region.objects.all()
+        if options["region_ids"]:
+            regions = regions.filter(id__in=options["region_ids"])
+            missing = set(options["region_ids"]) - set(regions.values_list("id", flat=True))
+            if missing:
+                raise CommandError(f"Unknown region(s): {sorted(missing)}")
+
+        for region in regions:
+            refresh_region_aggregates(region)
+            self.stdout.write(f"Refreshed region {region.id} ({region.name})")
+
+        self.stdout.write(self.style.SUCCESS("Region aggregates refreshed."))
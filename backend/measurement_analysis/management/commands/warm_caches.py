@@ -0,0 +1,51 @@
+"""Precompute the most requested analysis results."""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from measurement_analysis.warming import warm_caches
+
+
+class Command(BaseCommand):
+    """Management command to warm the analysis caches.
+
+    Computes the missing and stale cache entries of the map defaults and of the most frequently
+    requested aggregated measurement and temperature results, and the missing aggregates of
+    saved regions. Useful after a deploy or a bulk import; set DJANGO_CACHE_WARM_INTERVAL to
+    do the same periodically from the web workers.
+
+    Usage:
+    python manage.py warm_caches [--limit N]
+    """
+
+    help = "Precompute the most requested analysis results"
+
+    def add_arguments(self, parser):
+        """Add command line arguments for the management command.
+
+        Parameters
+        ----------
+        parser : ArgumentParser
+            The argument parser to which the command line arguments will be added.
+        """
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Maximum number of observed requests to warm (default: DJANGO_CACHE_WARM_LIMIT)",
+        )
+
+    def handle(self, *_args, **options):
+        """Handle the command execution.
+
+        Parameters
+        ----------
+        *_args : tuple
+            Positional arguments passed to the command.
+        **options : dict
+            Keyword arguments passed to the command.
+        """
+        started = time.monotonic()
+        warmed = warm_caches(options["limit"])
+        self.stdout.write(self.style.SUCCESS(f"Warmed {warmed} cached results in {time.monotonic() - started:.1f}s."))
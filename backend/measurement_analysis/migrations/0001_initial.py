@@ -0,0 +1,48 @@
+# Generated by Django 5.2 on 2026-10-19 07:18
+
+import django.contrib.gis.db.models.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('measurement_export', '0006_create_location_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Region',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('geometry', django.contrib.gis.db.models.fields.MultiPolygonField(blank=True, null=True, srid=4326)),
+                ('location', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='measurement_export.location')),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RegionAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('aggregated_measurements', 'Aggregated measurements'), ('temperature_values', 'Temperature values')], max_length=32)),
+                ('month', models.SmallIntegerField()),
+                ('payload', models.JSONField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('region', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aggregates', to='measurement_analysis.region')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='region',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('geometry__isnull', True), ('location__isnull', False)), models.Q(('geometry__isnull', False), ('location__isnull', True)), _connector='OR'), name='region_location_xor_geometry'),
+        ),
+        migrations.AddConstraint(
+            model_name='regionaggregate',
+            constraint=models.UniqueConstraint(fields=('region', 'kind', 'month'), name='unique_region_aggregate'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 08:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('measurement_analysis', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='regionaggregate',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='regionaggregate',
+            name='payload',
+            field=models.JSONField(null=True),
+        ),
+    ]
@@ -0,0 +1,90 @@
+"""Define models associated with Measurement Analysis."""
+
+from django.contrib.gis.db import models
+
+
+class Region(models.Model):
+    """Named region for which analysis aggregates are precomputed.
+
+    A region either references a country from the Location table or has its own polygon
+    defined by an admin.
+
+    Attributes
+    ----------
+    name : str
+        Name of the region
+    location : Location, optional
+        Country the region corresponds to; measurements are matched on their ``location_ref``
+    geometry : MultiPolygon, optional
+        Polygon of the region, used when it does not reference a country
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+    location = models.ForeignKey(
+        "measurement_export.Location",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    geometry = models.MultiPolygonField(srid=4326, null=True, blank=True)
+
+    class Meta:
+        ordering = ["name"]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(location__isnull=False, geometry__isnull=True)
+                | models.Q(location__isnull=True, geometry__isnull=False),
+                name="region_location_xor_geometry",
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class RegionAggregate(models.Model):
+    """Precomputed per-month analysis result for a region.
+
+    Rows are computed on first use or by the ``refresh_region_aggregates`` command. When a
+    measurement in the region and month is added, changed or deleted, the payload is cleared and
+    the version increased, so results computed before the change are not stored.
+
+    Attributes
+    ----------
+    region : Region
+        Region the aggregate belongs to
+    kind : str
+        Type of result, matching the cache types of the analysis views
+    month : int
+        Month of the year (1-12)
+    payload : dict | list | None
+        The JSON-serialisable result for the region and month, None if it is outdated
+    version : int
+        Number of times the aggregate was invalidated
+    updated_at : datetime
+        When the aggregate was computed
+    """
+
+    AGGREGATED_MEASUREMENTS = "aggregated_measurements"
+    TEMPERATURE_VALUES = "temperature_values"
+    KIND_CHOICES = [
+        (AGGREGATED_MEASUREMENTS, "Aggregated measurements"),
+        (TEMPERATURE_VALUES, "Temperature values"),
+    ]
+
+    region = models.ForeignKey(Region, on_delete=models.CASCADE, related_name="aggregates")
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES)
+    month = models.SmallIntegerField()
+    payload = models.JSONField(null=True)
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["region", "kind", "month"], name="unique_region_aggregate"),
+        ]
+
+    def __str__(self):
+        return f"RegionAggregate: {self.region_id} - {self.kind} - {self.month}"
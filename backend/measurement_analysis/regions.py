@@ -0,0 +1,201 @@
+"""Serve analysis results for saved regions from precomputed per-month aggregates."""
+
+from itertools import product
+
+from django.db.models import Case, F, JSONField, Q, Value, When
+from django.db.models.functions import Now
+
+from .models import Region, RegionAggregate
+
+ALL_MONTHS = list(range(1, 13))
+
+
+def get_region(region_id):
+    """Get a saved region by id.
+
+    Parameters
+    ----------
+    region_id : int | str
+        The id of the region
+
+    Returns
+    -------
+    Region
+        The region
+
+    Raises
+    ------
+    ValueError
+        If the id is invalid or no region with this id exists.
+    """
+    try:
+        return Region.objects.select_related("location").get(id=int(region_id))
+    except (TypeError, ValueError, Region.DoesNotExist) as err:
+        raise ValueError(f"Unknown region: {region_id!r}") from err
+
+
+def apply_region_filter(queryset, region):
+    """Only return measurements in a saved region.
+
+    Country regions match on the precomputed ``location_ref`` instead of a spatial query.
+
+    Parameters
+    ----------
+    queryset : QuerySet
+        Measurement or MeasurementMetrics queryset to filter
+    region : Region
+        The region
+
+    Returns
+    -------
+    QuerySet
+        Filtered queryset
+    """
+    if region.location_id is not None:
+        return queryset.filter(location_ref_id=region.location_id)
+    return queryset.filter(location__coveredby=region.geometry)
+
+
+def _read_aggregates(region, kind, months):
+    """Read the stored payloads and versions of a region, per month with a stored row."""
+    rows = RegionAggregate.objects.filter(region=region, kind=kind, month__in=months)
+    return {month: (payload, version) for month, payload, version in rows.values_list("month", "payload", "version")}
+
+
+def get_region_payloads(region, kind, months, compute):
+    """Get the aggregates of a region for the given months, computing and storing missing ones.
+
+    Parameters
+    ----------
+    region : Region
+        The region
+    kind : str
+        One of the ``RegionAggregate`` kinds
+    months : list[int]
+        Months of the year (1-12)
+    compute : Callable[[list[int]], dict[int, Any]]
+        Computes the JSON-serialisable payloads of the given months; it must return every month
+
+    Returns
+    -------
+    dict[int, Any]
+        Payload per month
+    """
+    stored = _read_aggregates(region, kind, months)
+    payloads = {month: payload for month, (payload, _version) in stored.items() if payload is not None}
+    missing_months = [m for m in months if m not in payloads]
+    if missing_months:
+        computed = compute(missing_months)
+        store_region_payloads(region, kind, computed, {m: stored[m][1] for m in missing_months if m in stored})
+        payloads.update(computed)
+    return payloads
+
+
+def store_region_payloads(region, kind, payloads, versions):
+    """Store computed aggregates of a region, unless they were invalidated while being computed.
+
+    A month is only stored if its version is still the one read before computing it. Rows that
+    did not exist are only inserted if no invalidation or other computation created them since.
+
+    Parameters
+    ----------
+    region : Region
+        The region
+    kind : str
+        One of the ``RegionAggregate`` kinds
+    payloads : dict[int, Any]
+        Payload per month
+    versions : dict[int, int]
+        Version per month read before computing, for the months that had a stored row
+    """
+    new_months = [month for month in payloads if month not in versions]
+    RegionAggregate.objects.bulk_create(
+        [RegionAggregate(region=region, kind=kind, month=month, payload=payloads[month]) for month in new_months],
+        ignore_conflicts=True,
+    )
+
+    known_months = [month for month in payloads if month in versions]
+    if not known_months:
+        return
+    unchanged = Q()
+    for month in known_months:
+        unchanged |= Q(month=month, version=versions[month])
+    RegionAggregate.objects.filter(unchanged, region=region, kind=kind).update(
+        payload=Case(
+            *[When(month=month, then=Value(payloads[month], output_field=JSONField())) for month in known_months],
+            output_field=JSONField(),
+        ),
+        updated_at=Now(),
+    )
+
+
+def invalidate_aggregates(region_ids, months):
+    """Mark the aggregates of regions as outdated for the given months.
+
+    Rows are created for months without one and their version is increased, so a computation
+    that started before the invalidation does not store its result afterwards.
+
+    Parameters
+    ----------
+    region_ids : Iterable[int]
+        Ids of the regions
+    months : Iterable[int]
+        Months of the year (1-12)
+    """
+    region_ids, months = list(region_ids), sorted(set(months))
+    if not region_ids or not months:
+        return
+    kinds = [kind for kind, _label in RegionAggregate.KIND_CHOICES]
+    RegionAggregate.objects.bulk_create(
+        [
+            RegionAggregate(region_id=region_id, kind=kind, month=month)
+            for region_id, kind, month in product(region_ids, kinds, months)
+        ],
+        ignore_conflicts=True,
+    )
+    RegionAggregate.objects.filter(region_id__in=region_ids, month__in=months).update(
+        payload=None, version=F("version") + 1
+    )
+
+
+def invalidate_region_aggregates(location, location_ref_id, months):
+    """Mark the aggregates of all regions containing a location as outdated.
+
+    Parameters
+    ----------
+    location : Point | None
+        Location of the measurement that was added, changed or deleted
+    location_ref_id : int | None
+        Id of the country of the measurement
+    months : Iterable[int]
+        Months to invalidate
+    """
+    if location is None:
+        return
+
+    matching_regions = Region.objects.filter(geometry__covers=location)
+    if location_ref_id is not None:
+        matching_regions = matching_regions | Region.objects.filter(location_id=location_ref_id)
+
+    invalidate_aggregates(matching_regions.values_list("id", flat=True), months)
+
+
+def refresh_region_aggregates(region):
+    """Recompute and store all monthly aggregates of a region.
+
+    Parameters
+    ----------
+    region : Region
+        The region
+    """
+    # Import here to avoid circular imports
+    from measurements.views import compute_region_temperature_payloads
+
+    from .views import compute_region_aggregates
+
+    for kind, compute in (
+        (RegionAggregate.AGGREGATED_MEASUREMENTS, compute_region_aggregates),
+        (RegionAggregate.TEMPERATURE_VALUES, compute_region_temperature_payloads),
+    ):
+        versions = {month: version for month, (_payload, version) in _read_aggregates(region, kind, ALL_MONTHS).items()}
+        store_region_payloads(region, kind, compute(region, ALL_MONTHS), versions)
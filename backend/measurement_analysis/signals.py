@@ -0,0 +1,104 @@
+"""Signal handlers to keep precomputed region aggregates in sync with the measurements."""
+
+from django.core.signals import request_started
+from django.db.models.signals import post_delete, post_save, pre_save
+from measurements.metrics import METRIC_MODELS
+from measurements.models import Measurement
+
+from .models import Region
+from .regions import ALL_MONTHS, invalidate_aggregates, invalidate_region_aggregates
+from .warming import start_scheduler
+
+
+def remember_measurement_location(sender, instance, **_kwargs):  # noqa: ARG001
+    """Signal handler to remember the stored location and month of a measurement before it is saved.
+
+    Parameters
+    ----------
+    sender : Model
+        The model class that triggered the signal.
+    instance : Measurement
+        The measurement that is about to be saved.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    previous = None
+    if instance.pk is not None:
+        previous = (
+            Measurement.objects.filter(pk=instance.pk).values_list("location", "location_ref_id", "local_month").first()
+        )
+    instance._previous_location = previous
+
+
+def invalidate_measurement_regions(sender, instance, **_kwargs):  # noqa: ARG001
+    """Signal handler to invalidate the aggregates of the regions containing a changed measurement.
+
+    An edited measurement may have moved to another place or month, so both the regions and
+    month it was in and the ones it is in now are invalidated.
+
+    Parameters
+    ----------
+    sender : Model
+        The model class that triggered the signal.
+    instance : Measurement
+        The measurement that was saved or deleted.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    months = [instance.local_month]
+    previous = instance.__dict__.pop("_previous_location", None)
+    if previous is not None:
+        location, location_ref_id, month = previous
+        months.append(month)
+        invalidate_region_aggregates(location, location_ref_id, months)
+    invalidate_region_aggregates(instance.location, instance.location_ref_id, months)
+
+
+def invalidate_metric_regions(sender, instance, **_kwargs):  # noqa: ARG001
+    """Signal handler to invalidate the aggregates of the regions containing the measurement of a changed metric.
+
+    Parameters
+    ----------
+    sender : Model
+        The model class that triggered the signal.
+    instance : Model
+        The metric that was saved or deleted.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    measurement = (
+        Measurement.objects.filter(id=instance.measurement_id)
+        .values_list("location", "location_ref_id", "local_month")
+        .first()
+    )
+    if measurement is not None:
+        location, location_ref_id, month = measurement
+        invalidate_region_aggregates(location, location_ref_id, [month])
+
+
+def clear_region_aggregates(sender, instance, **_kwargs):  # noqa: ARG001
+    """Signal handler to invalidate all aggregates of a region whose boundary may have changed.
+
+    Parameters
+    ----------
+    sender : Model
+        The model class that triggered the signal.
+    instance : Region
+        The region that was saved.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    invalidate_aggregates([instance.id], ALL_MONTHS)
+
+
+pre_save.connect(remember_measurement_location, sender=Measurement)
+post_save.connect(invalidate_measurement_regions, sender=Measurement)
+post_delete.connect(invalidate_measurement_regions, sender=Measurement)
+post_save.connect(clear_region_aggregates, sender=Region)
+
+for metric_model in METRIC_MODELS:
+    post_save.connect(invalidate_metric_regions, sender=metric_model)
+    post_delete.connect(invalidate_metric_regions, sender=metric_model)
+
+# Start the cache warming scheduler, if enabled, in processes that serve requests
+request_started.connect(start_scheduler, dispatch_uid="measurement_analysis.start_scheduler")
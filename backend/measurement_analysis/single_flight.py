@@ -0,0 +1,63 @@
+"""Coalesce concurrent computations of the same cache entries across worker processes."""
+
+import logging
+import os
+import time
+import uuid
+
+from django.core.cache import cache
+from dotenv import load_dotenv
+
+load_dotenv()
+# Upper bound on how long a computation may hold its lock, in case the worker dies
+lock_timeout = int(os.getenv("DJANGO_CACHE_LOCK_TIMEOUT", 30))
+# How long followers wait for the leader before computing the result themselves
+wait_timeout = float(os.getenv("DJANGO_CACHE_LOCK_WAIT", 10))
+POLL_INTERVAL = 0.05
+
+logger = logging.getLogger("WATERWATCH")
+
+
+def single_flight(lock_key, read, compute):
+    """Compute a cached result at most once at a time across all workers.
+
+    The first caller takes a lock in the shared cache and computes the result. Callers arriving
+    while the lock is held poll the cache until the result appears instead of running the same
+    query. If it does not appear in time, e.g. because the computing worker died, they compute
+    it themselves.
+
+    Parameters
+    ----------
+    lock_key : str
+        Key identifying the computation
+    read : Callable[[], Any]
+        Reads the result from the cache, returning None while it is not available
+    compute : Callable[[], Any]
+        Computes the result and stores it in the cache
+
+    Returns
+    -------
+    Any
+        The result
+    """
+    key = f"lock:{lock_key}"
+    token = uuid.uuid4().hex
+    # add() is atomic, so exactly one worker takes the lock
+    if cache.add(key, token, lock_timeout):
+        try:
+            # Another worker may have finished the computation just before we took the lock
+            result = read()
+            return result if result is not None else compute()
+        finally:
+            if cache.get(key) == token:
+                cache.delete(key)
+
+    deadline = time.monotonic() + wait_timeout
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        result = read()
+        if result is not None:
+            return result
+
+    logger.warning("Timed out waiting for %s, computing it without the lock", lock_key)
+    return compute()
@@ -0,0 +1,68 @@
+"""Test cases for the canonical form of boundaries."""
+
+from django.test import SimpleTestCase
+
+from measurement_analysis.boundaries import boundary_cache_key, parse_boundary
+from measurement_analysis.views import build_cache_key
+
+SQUARE = "POLYGON((0 0, 2 0, 2 2, 0 2, 0 0))"
+
+
+class BoundaryTests(SimpleTestCase):
+    """Test normalising boundaries and deriving their cache keys."""
+
+    def test_equivalent_boundaries_share_key(self):
+        """Test start vertex, orientation, precision and formatting do not change the key."""
+        variants = [
+            "POLYGON ((2 2, 0 2, 0 0, 2 0, 2 2))",  # different start vertex
+            "POLYGON((0 0, 0 2, 2 2, 2 0, 0 0))",  # clockwise
+            "POLYGON((0.000000001 0, 2 0, 2 2, 0 2, 0.000000001 0))",  # below the precision grid
+            "  polygon ( ( 0 0,2 0,2 2,0 2,0 0 ) )",
+            '{"type": "Polygon", "coordinates": [[[0, 0], [2, 0], [2, 2], [0, 2], [0, 0]]]}',
+        ]
+        key = parse_boundary(SQUARE).key
+        for variant in variants:
+            assert parse_boundary(variant).key == key, variant
+
+    def test_different_boundaries_have_different_keys(self):
+        """Test different polygons get different keys."""
+        assert parse_boundary(SQUARE).key != parse_boundary("POLYGON((0 0, 3 0, 3 3, 0 3, 0 0))").key
+
+    def test_parsed_boundary_is_reused(self):
+        """Test the parsed and prepared boundary is cached per input."""
+        boundary = parse_boundary(SQUARE)
+        assert parse_boundary(SQUARE) is boundary
+        assert boundary.extent == (0.0, 0.0, 2.0, 2.0)
+        assert boundary.geometry.srid == 4326
+
+    def test_invalid_boundary(self):
+        """Test an invalid boundary raises a ValueError but still has a cache key."""
+        with self.assertRaises(ValueError):
+            parse_boundary("invalid geometry string")
+        assert len(boundary_cache_key("invalid geometry string")) == 32
+
+    def test_empty_boundary(self):
+        """Test empty geometries are valid boundaries without an extent."""
+        for empty in ("POLYGON EMPTY", "MULTIPOLYGON EMPTY", "GEOMETRYCOLLECTION EMPTY"):
+            boundary = parse_boundary(empty)
+            assert boundary.geometry.empty, empty
+            assert boundary.extent is None
+            assert boundary_cache_key(empty) == boundary.key
+        assert parse_boundary("POLYGON EMPTY").key != parse_boundary("MULTIPOLYGON EMPTY").key
+
+    def test_geometry_collection_boundary(self):
+        """Test the members of a geometry collection are snapped and normalised."""
+        boundary = parse_boundary(f"GEOMETRYCOLLECTION({SQUARE}, POINT(5 5))")
+
+        assert boundary.extent == (0.0, 0.0, 5.0, 5.0)
+        assert (
+            parse_boundary("GEOMETRYCOLLECTION(POINT(5.000000001 5), POLYGON((0 0, 0 2, 2 2, 2 0, 0 0)))").key
+            == boundary.key
+        )
+        assert parse_boundary("GEOMETRYCOLLECTION(POLYGON EMPTY, POINT(1 1))").extent == (1.0, 1.0, 1.0, 1.0)
+
+    def test_build_cache_key_uses_canonical_boundary(self):
+        """Test analysis cache keys of equivalent boundaries are equal."""
+        assert build_cache_key("test_type", 5, SQUARE) == build_cache_key(
+            "test_type", 5, "POLYGON((0 2, 2 2, 2 0, 0 0, 0 2))"
+        )
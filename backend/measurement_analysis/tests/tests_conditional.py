@@ -0,0 +1,188 @@
+"""Test cases for conditional requests to the read endpoints."""
+
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache, caches
+from django.test import TestCase
+from measurement_export.models import Preset
+from measurements.models import Measurement, MeasurementMetrics, Temperature
+
+from measurement_analysis.conditional import bump_versions, get_versions, measurement_dataset
+
+
+def _create_measurement(local_date, value):
+    measurement = Measurement.objects.create(location="POINT(1 1)", local_date=local_date, local_time="12:00")
+    Temperature.objects.create(
+        measurement=measurement, value=value, sensor="Test Sensor", time_waited=timedelta(seconds=1)
+    )
+    return measurement
+
+
+class DatasetVersionTests(TestCase):
+    """Test the versions of the datasets behind the ETags."""
+
+    def setUp(self):
+        """Clear the versions before each test."""
+        caches["stats_cache"].clear()
+
+    def test_versions_are_stable_until_bumped(self):
+        """Test a version is initialized once and only changes when the dataset is bumped."""
+        first = get_versions(["presets"])
+        assert get_versions(["presets"]) == first
+
+        bump_versions(["presets"])
+        assert get_versions(["presets"])["presets"] > first["presets"]
+
+    def test_measurement_changes_bump_their_month(self):
+        """Test a new measurement only bumps the version of its own month."""
+        before = get_versions([measurement_dataset(4), measurement_dataset(5)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            _create_measurement("2025-04-03", 18.0)
+            # Responses built before the commit keep the old ETag
+            assert get_versions([measurement_dataset(4)]) == {measurement_dataset(4): before[measurement_dataset(4)]}
+
+        after = get_versions([measurement_dataset(4), measurement_dataset(5)])
+        assert after[measurement_dataset(4)] > before[measurement_dataset(4)]
+        assert after[measurement_dataset(5)] == before[measurement_dataset(5)]
+
+
+class ConditionalRequestTests(TestCase):
+    """Test ETags, 304 responses and Cache-Control headers of the read endpoints."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for the test cases."""
+        _create_measurement("2025-04-03", 18.0)
+
+    def setUp(self):
+        """Clear the caches before each test."""
+        cache.clear()
+        caches["stats_cache"].clear()
+
+    def _post(self, url, data, etag=None):
+        headers = {"If-None-Match": etag} if etag else {}
+        return self.client.post(url, json.dumps(data), content_type="application/json", headers=headers)
+
+    def test_aggregated_not_modified(self):
+        """Test sending back the ETag of an aggregated response returns a 304 without queries."""
+        response = self._post("/api/measurements/aggregated/", {"month": 4})
+
+        assert response.status_code == 200
+        assert response["ETag"]
+        assert "public" in response["Cache-Control"]
+
+        with self.assertNumQueries(0):
+            not_modified = self._post("/api/measurements/aggregated/", {"month": 4}, response["ETag"])
+        assert not_modified.status_code == 304
+        assert not_modified["ETag"] == response["ETag"]
+
+    def test_etag_changes_with_the_data_of_its_months(self):
+        """Test only a change to a requested month changes the ETag."""
+        etag = self._post("/api/measurements/aggregated/", {"month": 4})["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            _create_measurement("2025-05-03", 20.0)
+        assert self._post("/api/measurements/aggregated/", {"month": 4})["ETag"] == etag
+
+        with self.captureOnCommitCallbacks(execute=True):
+            _create_measurement("2025-04-04", 21.0)
+        response = self._post("/api/measurements/aggregated/", {"month": 4}, etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_new_etag_never_has_old_data(self):
+        """Test results computed from the old data before a change commits are not served afterwards."""
+        etag = self._post("/api/measurements/aggregated/", {"month": 4})["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            measurement = _create_measurement("2025-04-03", 22.0)
+            # Other connections do not see the uncommitted measurement yet
+            old_data = MeasurementMetrics.objects.exclude(id=measurement.id)
+            with patch("measurement_analysis.views._build_optimized_queryset", return_value=old_data):
+                during = self._post("/api/measurements/aggregated/", {"month": 4})
+            assert during["ETag"] == etag
+            assert during.json()["measurements"][0]["count"] == 1
+
+        after = self._post("/api/measurements/aggregated/", {"month": 4}, etag)
+        assert after.status_code == 200
+        assert after["ETag"] != etag
+        assert after.json()["measurements"][0]["count"] == 2
+
+    def test_etag_depends_on_parameters(self):
+        """Test requests with different parameters get different ETags."""
+        raw = self._post("/api/measurements/temperatures/", {"month": 4})
+        summary = self._post("/api/measurements/temperatures/", {"month": 4, "mode": "summary"})
+        other_month = self._post("/api/measurements/temperatures/", {"month": 5})
+
+        assert len({raw["ETag"], summary["ETag"], other_month["ETag"]}) == 3
+
+    def test_invalid_request_has_no_etag(self):
+        """Test error responses are not given validators."""
+        response = self._post("/api/measurements/aggregated/", {"month": 13})
+
+        assert response.status_code == 400
+        assert not response.has_header("ETag")
+
+    def test_presets_not_modified_until_changed(self):
+        """Test the preset list is revalidated with its ETag or its Last-Modified date."""
+        response = self.client.get("/api/presets/")
+
+        assert self.client.get("/api/presets/", headers={"If-None-Match": response["ETag"]}).status_code == 304
+        modified_since = self.client.get("/api/presets/", headers={"If-Modified-Since": response["Last-Modified"]})
+        assert modified_since.status_code == 304
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Preset.objects.create(name="New preset")
+        assert self.client.get("/api/presets/", headers={"If-None-Match": response["ETag"]}).status_code == 200
+
+
+class CacheableGetTests(TestCase):
+    """Test the GET variants of the map endpoints that a caching proxy can store."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for the test cases."""
+        _create_measurement("2025-04-03", 18.0)
+        _create_measurement("2025-05-03", 20.0)
+
+    def setUp(self):
+        """Clear the caches before each test."""
+        cache.clear()
+        caches["stats_cache"].clear()
+
+    def test_get_matches_post(self):
+        """Test a GET request returns the same result as the POST request with the same parameters."""
+        get = self.client.get("/api/measurements/aggregated/?month=4,5")
+        post = self.client.post(
+            "/api/measurements/aggregated/", json.dumps({"month": [4, 5]}), content_type="application/json"
+        )
+
+        assert get.status_code == 200
+        assert get.json() == post.json()
+
+    def test_get_redirects_to_canonical_query(self):
+        """Test equivalent GET requests are redirected to one canonical URL."""
+        response = self.client.get(
+            "/api/measurements/temperatures/",
+            {"quantiles": "0.5", "month": "5,4", "mode": "summary", "boundary_geometry": "POLYGON((0 0,2 0,2 2,0 0))"},
+        )
+
+        assert response.status_code == 301
+        canonical = response["Location"]
+        assert canonical == (
+            "/api/measurements/temperatures/?boundary_geometry=POLYGON+((0+0,+2+2,+2+0,+0+0))"
+            "&mode=summary&month=4,5&quantiles=0.5"
+        )
+        final = self.client.get(canonical)
+        assert final.status_code == 200
+        assert final.json()["count"] == 2
+
+    def test_get_cache_headers(self):
+        """Test GET responses can be stored by a shared cache and do not vary on the session."""
+        response = self.client.get("/api/measurements/aggregated/?month=4")
+
+        assert "s-maxage" in response["Cache-Control"]
+        assert response["Vary"] == "Accept-Encoding"
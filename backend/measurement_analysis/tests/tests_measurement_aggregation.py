@@ -2,7 +2,7 @@
 
 import json
 from datetime import UTC, datetime, timedelta
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from django.core.cache import cache
 from django.db import connection
@@ -513,8 +513,8 @@ class CachingFunctionalityTests(MeasurementAnalysisBaseTest):
         data = response3.json()
         assert data["count"] == 2
 
-    @patch("measurement_analysis.views.get_cached_results_for_months")
-    @patch("measurement_analysis.views.cache_results_by_month")
+    @patch("measurement_analysis.views.get_cached_partitions")
+    @patch("measurement_analysis.views.cache_partitions")
     def test_cache_hit_behavior(self, mock_cache_set, mock_cache_get):
         """Test behavior when cache hit occurs."""
         # Mock a cache hit
@@ -527,7 +527,7 @@ class CachingFunctionalityTests(MeasurementAnalysisBaseTest):
                 "max_temperature": 20.0,
             }
         ]
-        mock_cache_get.return_value = (mock_aggregated_data, [])  # cached_results, missing_months
+        mock_cache_get.return_value = ({10: mock_aggregated_data}, [])  # cached partitions, missing_months
 
         response = self.client.post(
             "/api/measurements/aggregated/",
@@ -545,12 +545,12 @@ class CachingFunctionalityTests(MeasurementAnalysisBaseTest):
         mock_cache_get.assert_called_once()
         mock_cache_set.assert_not_called()
 
-    @patch("measurement_analysis.views.get_cached_results_for_months")
-    @patch("measurement_analysis.views.cache_results_by_month")
+    @patch("measurement_analysis.views.get_cached_partitions")
+    @patch("measurement_analysis.views.cache_partitions")
     def test_cache_miss_behavior(self, mock_cache_set, mock_cache_get):
         """Test behavior when cache miss occurs."""
         # Mock a cache miss
-        mock_cache_get.return_value = ([], [10])  # cached_results, missing_months
+        mock_cache_get.return_value = ({}, [10])  # cached partitions, missing_months
 
         response = self.client.post(
             "/api/measurements/aggregated/",
@@ -564,11 +564,12 @@ class CachingFunctionalityTests(MeasurementAnalysisBaseTest):
         # Should fetch fresh data and cache it
         assert data["count"] == 1  # Should have fetched the October measurement
 
-        mock_cache_get.assert_called_once()
+        # Looked up once, and once more after taking the computation lock
+        assert mock_cache_get.call_count == 2
         mock_cache_set.assert_called_once()
 
-    @patch("measurement_analysis.views.get_cached_results_for_months")
-    @patch("measurement_analysis.views.cache_results_by_month")
+    @patch("measurement_analysis.views.get_cached_partitions")
+    @patch("measurement_analysis.views.cache_partitions")
     def test_partial_cache_hit_behavior(self, mock_cache_set, mock_cache_get):
         """Test behavior with partial cache hit (some months cached, some not)."""
         # Mock partial cache hit - November cached, October not
@@ -581,7 +582,7 @@ class CachingFunctionalityTests(MeasurementAnalysisBaseTest):
                 "max_temperature": 25.5,
             }
         ]
-        mock_cache_get.return_value = (mock_cached_november, [10])  # cached November, missing October
+        mock_cache_get.return_value = ({11: mock_cached_november}, [10])  # cached November, missing October
 
         response = self.client.post(
             "/api/measurements/aggregated/",
@@ -600,12 +601,13 @@ class CachingFunctionalityTests(MeasurementAnalysisBaseTest):
         assert 25.5 in temperatures  # November (cached)
         assert 20.0 in temperatures  # October (fresh)
 
-        mock_cache_get.assert_called_once()
+        # Looked up once, and once more after taking the computation lock
+        assert mock_cache_get.call_count == 2
         mock_cache_set.assert_called_once()
 
     def test_no_caching_for_non_month_queries(self):
         """Test that queries without month parameter don't use caching."""
-        with patch("measurement_analysis.views.get_cached_results_for_months") as mock_cache_get:
+        with patch("measurement_analysis.views.get_cached_partitions") as mock_cache_get:
             response = self.client.post(
                 "/api/measurements/aggregated/",
                 data=json.dumps({}),  # No month parameter
@@ -616,6 +618,191 @@ class CachingFunctionalityTests(MeasurementAnalysisBaseTest):
             # Should not attempt to use caching
             mock_cache_get.assert_not_called()
 
+    def test_fetch_aggregated_partitions_groups_by_month(self):
+        """Test missing months are aggregated with a single query and split per month."""
+        from measurement_analysis.views import _fetch_aggregated_partitions
+
+        with self.assertNumQueries(1):
+            partitions = _fetch_aggregated_partitions(None, [10, 11, 12])
+
+        assert sorted(partitions) == [10, 11]
+        assert all(row["month"] == month for month, rows in partitions.items() for row in rows)
+
+    def test_last_30_days_cached_per_day(self):
+        """Test the last 30 days are merged from daily partitions, so a new day only computes that day."""
+        from measurement_analysis.views import build_cache_key
+
+        today = timezone.now().date()
+        for days_ago, value in ((3, 20.0), (2, 30.0)):
+            measurement = Measurement.objects.create(
+                location="POINT(7 7)",
+                local_date=(today - timedelta(days=days_ago)).isoformat(),
+                local_time="00:00:00",
+            )
+            Temperature.objects.create(
+                measurement=measurement, value=value, sensor="Test Sensor", time_waited=timedelta(seconds=1)
+            )
+        cache.clear()
+
+        first = self.client.post(
+            "/api/measurements/aggregated/", data=json.dumps({"month": 0}), content_type="application/json"
+        ).json()
+        row = next(m for m in first["measurements"] if m["location"] == {"latitude": 7.0, "longitude": 7.0})
+        assert row["count"] == 2
+        assert row["avg_temperature"] == 25.0
+        assert row["min_temperature"] == 20.0
+        assert row["max_temperature"] == 30.0
+
+        # Only the missing day is aggregated again
+        cache.delete(build_cache_key("aggregated_measurements", today))
+        with self.assertNumQueries(1):
+            second = self.client.post(
+                "/api/measurements/aggregated/", data=json.dumps({"month": 0}), content_type="application/json"
+            ).json()
+        assert second == first
+
+    def test_last_30_days_include_later_dates(self):
+        """Test measurements dated after the last 30 days are counted in its last day."""
+        Measurement.objects.create(
+            location="POINT(8 8)",
+            local_date=(timezone.now().date() + timedelta(days=10)).isoformat(),
+            local_time="00:00:00",
+        )
+        cache.clear()
+
+        response = self.client.post(
+            "/api/measurements/aggregated/", data=json.dumps({"month": 0}), content_type="application/json"
+        ).json()
+        row = next(m for m in response["measurements"] if m["location"] == {"latitude": 8.0, "longitude": 8.0})
+        assert row["count"] == 1
+
+    def test_merge_day_partitions(self):
+        """Test merging daily aggregates of a location, including days without temperatures."""
+        from measurement_analysis.views import _merge_day_partitions
+
+        day = timezone.now().date()
+        row = {"location": None, "longitude": 1.0, "latitude": 2.0, "month": 10}
+        partitions = {
+            day: [
+                {
+                    **row,
+                    "count": 2,
+                    "temperature_count": 2,
+                    "temperature_sum": 30.0,
+                    "min_temperature": 10.0,
+                    "max_temperature": 20.0,
+                }
+            ],
+            day - timedelta(days=1): [
+                {
+                    **row,
+                    "count": 1,
+                    "temperature_count": 0,
+                    "temperature_sum": None,
+                    "min_temperature": None,
+                    "max_temperature": None,
+                }
+            ],
+            day - timedelta(days=2): [
+                {
+                    **row,
+                    "count": 1,
+                    "temperature_count": 1,
+                    "temperature_sum": 30.0,
+                    "min_temperature": 30.0,
+                    "max_temperature": 30.0,
+                }
+            ],
+        }
+
+        assert _merge_day_partitions(partitions) == [
+            {**row, "count": 4, "avg_temperature": 20.0, "min_temperature": 10.0, "max_temperature": 30.0}
+        ]
+
+    def test_get_partitions_caches_each_month(self):
+        """Test get_partitions fetches missing months once and caches one entry per month."""
+        from measurement_analysis.views import get_partitions
+
+        fetch = MagicMock(return_value={1: ["january"], 2: ["february"]})
+
+        assert get_partitions("test_type", [1, 2], None, fetch) == {1: ["january"], 2: ["february"]}
+        assert get_partitions("test_type", [2, 1], None, fetch) == {2: ["february"], 1: ["january"]}
+
+        fetch.assert_called_once_with([1, 2])
+        assert cache.get("test_type:month:1") == ["january"]
+
+    def test_get_partitions_caches_empty_months(self):
+        """Test months without data are cached as empty and not fetched again."""
+        from measurement_analysis.views import EMPTY_PARTITION, get_partitions
+
+        fetch = MagicMock(return_value={1: ["january"]})
+
+        assert get_partitions("test_type", [1, 2], None, fetch) == {1: ["january"]}
+        assert get_partitions("test_type", [1, 2], None, fetch) == {1: ["january"]}
+
+        fetch.assert_called_once_with([1, 2])
+        assert cache.get("test_type:month:2") == EMPTY_PARTITION
+
+    def test_get_partitions_serves_stale_and_refreshes(self):
+        """Test a stale partition is returned immediately while a refresh runs in the background."""
+        from measurement_analysis.views import get_partitions
+
+        fetch = MagicMock(return_value={1: ["old"]})
+        get_partitions("test_type", [1], None, fetch)
+        cache.set("test_type:month:1:stale_at", 0)
+
+        with patch("measurement_analysis.views.threading") as mock_threading:
+            assert get_partitions("test_type", [1], None, fetch) == {1: ["old"]}
+            assert get_partitions("test_type", [1], None, fetch) == {1: ["old"]}
+
+        # Only one refresh is started while it is running
+        mock_threading.Thread.assert_called_once()
+        assert mock_threading.Thread.call_args.kwargs["args"][1] == [1]
+        fetch.assert_called_once()
+
+    def test_refresh_partitions(self):
+        """Test a background refresh replaces the stale partitions and releases its lock."""
+        from measurement_analysis.views import EMPTY_PARTITION, _refresh_partitions
+
+        cache.set("refresh:key", 1)
+        # The refresh closes the database connection of its thread, which is the test connection here
+        with patch("measurement_analysis.views.connection"):
+            _refresh_partitions("test_type", [1, 2], None, MagicMock(return_value={1: ["new"]}), "refresh:key")
+
+        assert cache.get("test_type:month:1") == ["new"]
+        assert cache.get("test_type:month:2") == EMPTY_PARTITION
+        assert cache.get("test_type:month:1:stale_at") > 0
+        assert cache.get("refresh:key") is None
+
+    def test_past_days_never_become_stale(self):
+        """Test only today and tomorrow of the last 30 days get a soft timeout."""
+        from measurement_analysis.views import cache_partitions, last_30_days
+
+        days = last_30_days()
+        yesterday, today, tomorrow = days[-3:]
+        cache.set(f"test_type:day:{yesterday.isoformat()}:stale_at", 0)
+
+        cache_partitions("test_type", {day: [day.isoformat()] for day in days})
+
+        for day in days[:-2]:
+            assert cache.get(f"test_type:day:{day.isoformat()}") == [day.isoformat()]
+            assert cache.get(f"test_type:day:{day.isoformat()}:stale_at") is None
+        assert cache.get(f"test_type:day:{today.isoformat()}:stale_at") > 0
+        assert cache.get(f"test_type:day:{tomorrow.isoformat()}:stale_at") > 0
+
+    def test_empty_month_is_not_queried_again(self):
+        """Test a request for a month without measurements is served from the cache the second time."""
+        response = self.client.post(
+            "/api/measurements/aggregated/", data=json.dumps({"month": 3}), content_type="application/json"
+        )
+        assert response.json()["count"] == 0
+
+        with self.assertNumQueries(0):
+            response = self.client.post(
+                "/api/measurements/aggregated/", data=json.dumps({"month": 3}), content_type="application/json"
+            )
+        assert response.json()["count"] == 0
+
 
 class ResponseStructureTests(MeasurementAnalysisBaseTest):
     """Test response structure and data format."""
@@ -873,6 +1060,20 @@ class HelperFunctionTests(TestCase):
         assert result is not None
         assert result != queryset
 
+    def test_apply_month_filter_spans_all_years(self):
+        """Test apply_month_filter matches the months in every year present in the data."""
+        from measurements.models import Measurement
+
+        from measurement_analysis.views import apply_month_filter
+
+        dates = ["2023-12-31", "2024-01-15", "2024-02-01", "2025-01-31", "2025-07-01"]
+        for local_date in dates:
+            Measurement.objects.create(location="POINT(1.0 2.0)", local_date=local_date, local_time="12:00:00")
+
+        result = apply_month_filter(Measurement.objects.all(), [12, 1])
+
+        assert sorted(str(m.local_date) for m in result) == ["2023-12-31", "2024-01-15", "2025-01-31"]
+
     def test_build_cache_key_basic(self):
         """Test build_cache_key with basic parameters."""
         from measurement_analysis.views import build_cache_key
@@ -895,58 +1096,63 @@ class HelperFunctionTests(TestCase):
         assert len(parts) == 4  # test_type:month:hash:5
         assert len(parts[2]) == 8  # Hash part should be 8 characters
 
-    def test_build_cache_key_last_30_days(self):
-        """Test build_cache_key for last 30 days (month=0)."""
+    def test_build_cache_key_day(self):
+        """Test build_cache_key for a day of the last 30 days."""
         from measurement_analysis.views import build_cache_key
 
-        with patch("measurement_analysis.views.timezone") as mock_timezone:
-            mock_timezone.now.return_value.date.return_value.isoformat.return_value = "2025-06-15"
+        result = build_cache_key("test_type", datetime(2025, 6, 15, tzinfo=UTC).date())
+        assert result == "test_type:day:2025-06-15"
 
-            result = build_cache_key("test_type", 0)
-            assert result == "test_type:last30days:2025-06-15"
-
-    def test_build_cache_key_last_30_days_with_boundary(self):
-        """Test build_cache_key for last 30 days with boundary."""
+    def test_build_cache_key_day_with_boundary(self):
+        """Test build_cache_key for a day with boundary."""
         from measurement_analysis.views import build_cache_key
 
         boundary = '{"type": "Polygon"}'
 
-        with patch("measurement_analysis.views.timezone") as mock_timezone:
-            mock_timezone.now.return_value.date.return_value.isoformat.return_value = "2025-06-15"
+        result = build_cache_key("test_type", datetime(2025, 6, 15, tzinfo=UTC).date(), boundary)
+        assert "test_type:day:" in result
+        assert result.endswith(":2025-06-15")
 
-            result = build_cache_key("test_type", 0, boundary)
-            assert "test_type:last30days:" in result
-            assert "2025-06-15" in result
+    def test_last_30_days(self):
+        """Test the last 30 days span from the month filter cutoff up to tomorrow."""
+        from measurement_analysis.views import last_30_days
 
-    def test_get_cached_results_for_months_all_cached(self):
-        """Test get_cached_results_for_months when all months are cached."""
-        from measurement_analysis.views import get_cached_results_for_months
+        today = timezone.now().date()
+        days = last_30_days()
+
+        assert days[0] == today - timedelta(days=30)
+        assert days[-1] == today + timedelta(days=1)
+        assert len(days) == len(set(days)) == 32
+
+    def test_get_cached_partitions_all_cached(self):
+        """Test get_cached_partitions when all months are cached."""
+        from measurement_analysis.views import get_cached_partitions
 
         # Mock cache to return data for all months
         with patch("measurement_analysis.views.cache") as mock_cache:
             mock_cache.get.return_value = [{"test": "data"}]
 
-            cached_results, missing_months = get_cached_results_for_months("test_type", [1, 2], None)
+            partitions, missing_months = get_cached_partitions("test_type", [1, 2], None)
 
-            assert len(cached_results) == 2  # Two months worth of data
+            assert partitions == {1: [{"test": "data"}], 2: [{"test": "data"}]}
             assert missing_months == []
 
-    def test_get_cached_results_for_months_none_cached(self):
-        """Test get_cached_results_for_months when nothing is cached."""
-        from measurement_analysis.views import get_cached_results_for_months
+    def test_get_cached_partitions_none_cached(self):
+        """Test get_cached_partitions when nothing is cached."""
+        from measurement_analysis.views import get_cached_partitions
 
         # Mock cache to return None (cache miss)
         with patch("measurement_analysis.views.cache") as mock_cache:
             mock_cache.get.return_value = None
 
-            cached_results, missing_months = get_cached_results_for_months("test_type", [1, 2], None)
+            partitions, missing_months = get_cached_partitions("test_type", [1, 2], None)
 
-            assert cached_results == []
+            assert partitions == {}
             assert missing_months == [1, 2]
 
-    def test_get_cached_results_for_months_partial_cached(self):
-        """Test get_cached_results_for_months with partial cache hits."""
-        from measurement_analysis.views import get_cached_results_for_months
+    def test_get_cached_partitions_partial_cached(self):
+        """Test get_cached_partitions with partial cache hits."""
+        from measurement_analysis.views import get_cached_partitions
 
         # Mock cache to return data for some months
         def mock_cache_get(key):
@@ -957,32 +1163,30 @@ class HelperFunctionTests(TestCase):
         with patch("measurement_analysis.views.cache") as mock_cache:
             mock_cache.get.side_effect = mock_cache_get
 
-            cached_results, missing_months = get_cached_results_for_months("test_type", [1, 2], None)
+            partitions, missing_months = get_cached_partitions("test_type", [1, 2], None)
 
-            assert len(cached_results) == 1  # One month cached
+            assert list(partitions) == [1]  # One month cached
             assert missing_months == [2]  # One month missing
 
-    def test_cache_results_by_month_empty_inputs(self):
-        """Test cache_results_by_month with empty inputs."""
-        from measurement_analysis.views import cache_results_by_month
+    def test_cache_partitions_empty_inputs(self):
+        """Test cache_partitions with empty inputs."""
+        from measurement_analysis.views import cache_partitions
 
         with patch("measurement_analysis.views.cache") as mock_cache:
             # Should not crash with empty inputs
-            cache_results_by_month("test_type", [], [])
-            cache_results_by_month("test_type", [{"test": "data"}], [])
-            cache_results_by_month("test_type", [], [1, 2])
+            cache_partitions("test_type", {})
 
             # Should not have called cache.set
             mock_cache.set.assert_not_called()
 
-    def test_cache_results_by_month_last_30_days(self):
-        """Test cache_results_by_month for last 30 days."""
-        from measurement_analysis.views import cache_results_by_month
+    def test_cache_partitions_last_30_days(self):
+        """Test cache_partitions for last 30 days."""
+        from measurement_analysis.views import cache_partitions
 
         results = [{"test": "data"}]
 
         with patch("measurement_analysis.views.cache") as mock_cache:
-            cache_results_by_month("test_type", results, [0])
+            cache_partitions("test_type", {0: results})
 
             # Should call cache.set once for the last 30 days
             mock_cache.set.assert_called_once()
@@ -990,38 +1194,6 @@ class HelperFunctionTests(TestCase):
             assert "last30days" in call_args[0][0]  # Cache key should contain "last30days"
             assert call_args[0][1] == results  # Should cache the results
 
-    def test_cache_results_by_month_aggregated_measurements(self):
-        """Test cache_results_by_month for aggregated measurements."""
-        from measurement_analysis.views import cache_results_by_month
-
-        results = [
-            {"month": 1, "data": "test1"},
-            {"month": 2, "data": "test2"},
-            {"month": 1, "data": "test3"},  # Another result for month 1
-        ]
-
-        with patch("measurement_analysis.views.cache") as mock_cache:
-            cache_results_by_month("aggregated_measurements", results, [1, 2])
-
-            # Should call cache.set twice (once for each month)
-            assert mock_cache.set.call_count == 2
-
-            # Verify the calls were made with correct data
-            calls = mock_cache.set.call_args_list
-
-            # Check that results were grouped by month
-            cached_data = {}
-            for call in calls:
-                key, data, timeout = call[0]
-                if "month:1" in key:
-                    cached_data[1] = data
-                elif "month:2" in key:
-                    cached_data[2] = data
-
-            # Month 1 should have 2 results, month 2 should have 1
-            assert len(cached_data[1]) == 2
-            assert len(cached_data[2]) == 1
-
 
 class ErrorHandlingTests(MeasurementAnalysisBaseTest):
     """Test error handling in various edge cases."""
@@ -1058,6 +1230,18 @@ class ErrorHandlingTests(MeasurementAnalysisBaseTest):
             data = response.json()
             assert data["error"] == "Internal server error"
 
+    def test_empty_and_collection_boundaries(self):
+        """Test empty and collection boundaries are filtered on instead of failing."""
+        for boundary in ("POLYGON EMPTY", "GEOMETRYCOLLECTION EMPTY", "GEOMETRYCOLLECTION(POINT(1 1), POINT(2 2))"):
+            response = self.client.post(
+                "/api/measurements/aggregated/",
+                data=json.dumps({"boundary_geometry": boundary}),
+                content_type="application/json",
+            )
+
+            assert response.status_code == 200, boundary
+            assert response.json()["status"] == "success"
+
     def test_large_month_parameter_handling(self):
         """Test handling of unusually large month parameters."""
         # Test with very large list of months
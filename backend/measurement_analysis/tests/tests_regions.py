@@ -0,0 +1,130 @@
+"""Test cases for saved regions with precomputed aggregates."""
+
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from measurements.models import Measurement, Temperature
+
+from measurement_analysis.models import Region, RegionAggregate
+from measurement_analysis.regions import get_region_payloads
+
+
+class RegionAggregateTests(TestCase):
+    """Test serving analysis requests for saved regions."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for the test cases."""
+        cls.region = Region.objects.create(
+            name="Square", geometry=MultiPolygon(Polygon(((0, 0), (2, 0), (2, 2), (0, 2), (0, 0))))
+        )
+        for location, local_date, value in (
+            ("POINT(1.0 1.0)", "2025-04-03", 18.0),
+            ("POINT(1.0 1.0)", "2025-04-20", 20.0),
+            ("POINT(1.5 1.5)", "2025-10-02", 22.0),
+            ("POINT(5.0 5.0)", "2025-04-03", 30.0),
+        ):
+            measurement = Measurement.objects.create(location=location, local_date=local_date, local_time="12:00:00")
+            Temperature.objects.create(
+                measurement=measurement, value=value, sensor="Test Sensor", time_waited=timedelta(seconds=1)
+            )
+
+    def setUp(self):
+        """Clear the cache before each test."""
+        cache.clear()
+
+    def _post(self, url, body):
+        return self.client.post(url, data=json.dumps(body), content_type="application/json")
+
+    def test_region_matches_boundary_results(self):
+        region_response = self._post("/api/measurements/aggregated/", {"region": self.region.id, "month": [4, 10]})
+        boundary_response = self._post(
+            "/api/measurements/aggregated/", {"boundary_geometry": self.region.geometry.wkt, "month": [4, 10]}
+        )
+
+        assert region_response.status_code == 200
+        region_rows = sorted(region_response.json()["measurements"], key=lambda r: r["count"])
+        boundary_rows = sorted(boundary_response.json()["measurements"], key=lambda r: r["count"])
+        assert region_rows == boundary_rows
+        assert [r["count"] for r in region_rows] == [1, 2]
+
+    def test_aggregates_are_precomputed_once(self):
+        self._post("/api/measurements/aggregated/", {"region": self.region.id})
+
+        stored = RegionAggregate.objects.filter(region=self.region, kind=RegionAggregate.AGGREGATED_MEASUREMENTS)
+        assert stored.count() == 12
+        assert stored.get(month=4).payload[0]["avg_temperature"] == 19.0
+
+        # Served from the stored aggregates: only the region and aggregate lookups hit the database
+        with self.assertNumQueries(2):
+            response = self._post("/api/measurements/aggregated/", {"region": self.region.id})
+        assert response.json()["count"] == 2
+
+    def test_new_measurement_invalidates_its_month(self):
+        self._post("/api/measurements/aggregated/", {"region": self.region.id})
+
+        measurement = Measurement.objects.create(location="POINT(0.5 0.5)", local_date="2025-04-05")
+        Temperature.objects.create(measurement=measurement, value=25.0, sensor="S", time_waited=timedelta(seconds=1))
+
+        stored = RegionAggregate.objects.filter(region=self.region, payload__isnull=False)
+        months = set(stored.values_list("month", flat=True))
+        assert 4 not in months
+        assert 10 in months
+
+        response = self._post("/api/measurements/aggregated/", {"region": self.region.id, "month": 4})
+        assert sum(r["count"] for r in response.json()["measurements"]) == 3
+
+    def test_moved_measurement_invalidates_its_old_region(self):
+        self._post("/api/measurements/aggregated/", {"region": self.region.id, "month": 10})
+
+        measurement = Measurement.objects.get(local_date="2025-10-02")
+        measurement.location = "POINT(5.0 5.0)"
+        measurement.save()
+
+        response = self._post("/api/measurements/aggregated/", {"region": self.region.id, "month": 10})
+        assert response.json()["count"] == 0
+
+    def test_result_invalidated_while_computing_is_not_stored(self):
+        def compute(months):
+            # A measurement in the region is added while the aggregates are computed
+            Measurement.objects.create(location="POINT(0.5 0.5)", local_date="2025-04-05", local_time="12:00:00")
+            return {month: [] for month in months}
+
+        payloads = get_region_payloads(self.region, RegionAggregate.AGGREGATED_MEASUREMENTS, [4, 10], compute)
+
+        assert payloads == {4: [], 10: []}
+        stored = RegionAggregate.objects.filter(region=self.region, kind=RegionAggregate.AGGREGATED_MEASUREMENTS)
+        assert stored.get(month=4).payload is None
+        assert stored.get(month=10).payload == []
+
+    def test_temperature_values_for_region(self):
+        response = self._post("/api/measurements/temperatures/", {"region": self.region.id})
+        assert sorted(response.json()) == ["18.0", "20.0", "22.0"]
+
+        response = self._post(
+            "/api/measurements/temperatures/", {"region": self.region.id, "month": 4, "mode": "summary"}
+        )
+        assert response.json()["mean"] == 19.0
+
+    def test_unknown_region(self):
+        for url in ("/api/measurements/aggregated/", "/api/measurements/temperatures/"):
+            response = self._post(url, {"region": 999999})
+            assert response.status_code == 400
+
+    def test_region_list(self):
+        response = self.client.get("/api/measurements/aggregated/regions/")
+
+        assert response.status_code == 200
+        assert response.json() == {"regions": [{"id": self.region.id, "name": "Square", "country": None}]}
+
+    def test_refresh_command(self):
+        out = StringIO()
+        call_command("refresh_region_aggregates", stdout=out)
+
+        assert RegionAggregate.objects.filter(region=self.region).count() == 24
+        assert "Region aggregates refreshed." in out.getvalue()
@@ -0,0 +1,60 @@
+"""Test cases for coalescing concurrent cache computations."""
+
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from measurement_analysis.single_flight import single_flight
+
+
+class SingleFlightTests(SimpleTestCase):
+    """Test computing cache entries once across concurrent requests."""
+
+    def setUp(self):
+        """Clear the cache before each test."""
+        cache.clear()
+
+    def test_leader_computes_and_releases_lock(self):
+        """Test the first caller computes the result and releases the lock afterwards."""
+        compute = MagicMock(return_value="result")
+
+        assert single_flight("key", lambda: None, compute) == "result"
+
+        compute.assert_called_once()
+        assert cache.get("lock:key") is None
+
+    def test_leader_rereads_before_computing(self):
+        """Test the result stored by a previous leader is used instead of computing it again."""
+        compute = MagicMock()
+
+        assert single_flight("key", lambda: "stored", compute) == "stored"
+        compute.assert_not_called()
+
+    def test_lock_released_on_error(self):
+        """Test the lock is released when the computation fails."""
+        with self.assertRaises(RuntimeError):
+            single_flight("key", lambda: None, MagicMock(side_effect=RuntimeError))
+
+        assert cache.get("lock:key") is None
+
+    @patch("measurement_analysis.single_flight.POLL_INTERVAL", 0)
+    def test_follower_waits_for_leader(self):
+        """Test a caller finding the lock taken waits for the result instead of computing it."""
+        cache.add("lock:key", "other worker", 30)
+        read = MagicMock(side_effect=[None, None, "result"])
+        compute = MagicMock()
+
+        assert single_flight("key", read, compute) == "result"
+
+        assert read.call_count == 3
+        compute.assert_not_called()
+
+    @patch("measurement_analysis.single_flight.wait_timeout", 0)
+    def test_follower_computes_after_timeout(self):
+        """Test a caller computes the result itself if the leader does not finish in time."""
+        cache.add("lock:key", "other worker", 30)
+
+        assert single_flight("key", lambda: None, lambda: "result") == "result"
+        # The lock of the other worker is left alone
+        assert cache.get("lock:key") == "other worker"
@@ -0,0 +1,126 @@
+"""Test cases for warming the analysis caches."""
+
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.test import TestCase
+from measurements.models import Measurement, Temperature
+
+from measurement_analysis.regions import ALL_MONTHS
+from measurement_analysis.views import build_cache_key
+from measurement_analysis.warming import get_warm_targets, record_request, warm_caches
+
+BOUNDARY = "POLYGON((0 0, 2 0, 2 2, 0 2, 0 0))"
+
+
+class CacheWarmingTests(TestCase):
+    """Test recording request frequencies and precomputing cached results."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for the test cases."""
+        measurement = Measurement.objects.create(location="POINT(1 1)", local_date="2025-04-03", local_time="12:00")
+        Temperature.objects.create(
+            measurement=measurement, value=18.0, sensor="Test Sensor", time_waited=timedelta(seconds=1)
+        )
+
+    def setUp(self):
+        """Clear the caches before each test."""
+        cache.clear()
+        caches["stats_cache"].clear()
+
+    def test_defaults_come_first(self):
+        """Test the map defaults are warmed without any observed requests."""
+        targets = get_warm_targets()
+
+        assert {(t["cache_type"], tuple(t["months"]), t["boundary_geometry"]) for t in targets} == {
+            ("aggregated_measurements", tuple(ALL_MONTHS), None),
+            ("aggregated_measurements", (0,), None),
+            ("temperature_values", tuple(ALL_MONTHS), None),
+            ("temperature_values", (0,), None),
+        }
+
+    def test_observed_requests_ordered_by_frequency(self):
+        """Test observed requests are warmed in order of how often they were made, up to the limit."""
+        record_request("aggregated_measurements", [4], BOUNDARY)
+        for _ in range(3):
+            record_request("temperature_values", [5], BOUNDARY)
+        record_request("aggregated_measurements", [6])
+
+        observed = get_warm_targets(limit=2)[4:]
+
+        assert [(t["cache_type"], t["months"]) for t in observed] == [
+            ("temperature_values", [5]),
+            ("aggregated_measurements", [4]),
+        ]
+
+    def test_concurrent_registrations_are_kept(self):
+        """Test a request registered while another one is being registered is not lost."""
+        stats_cache = caches["stats_cache"]
+        original_set = stats_cache.set
+
+        def set_after_other_worker(*args, **kwargs):
+            # Another worker registers its request before this one writes
+            if set_mock.call_count == 1:
+                record_request("temperature_values", [5])
+            return original_set(*args, **kwargs)
+
+        with patch.object(stats_cache, "set", side_effect=set_after_other_worker) as set_mock:
+            record_request("aggregated_measurements", [4])
+
+        observed = get_warm_targets()[4:]
+        assert {(t["cache_type"], tuple(t["months"])) for t in observed} == {
+            ("aggregated_measurements", (4,)),
+            ("temperature_values", (5,)),
+        }
+
+    def test_number_of_targets_is_limited(self):
+        """Test only the first requests up to the maximum number of targets are tracked."""
+        with patch("measurement_analysis.warming.MAX_TARGETS", 2):
+            for month in (4, 5, 6):
+                record_request("aggregated_measurements", [month])
+            observed = get_warm_targets()[4:]
+
+        assert [t["months"] for t in observed] == [[4], [5]]
+
+    def test_views_record_requests(self):
+        """Test the analysis endpoints record the requests they serve."""
+        self.client.post("/api/measurements/aggregated/", json.dumps({"month": 4}), content_type="application/json")
+        self.client.post(
+            "/api/measurements/temperatures/",
+            json.dumps({"month": 4, "boundary_geometry": BOUNDARY}),
+            content_type="application/json",
+        )
+
+        observed = get_warm_targets()[4:]
+        assert {(t["cache_type"], t["boundary_geometry"]) for t in observed} == {
+            ("aggregated_measurements", None),
+            ("temperature_values", BOUNDARY),
+        }
+
+    def test_warm_caches_fills_the_cache(self):
+        """Test warming makes the next request a cache hit."""
+        record_request("aggregated_measurements", [4], BOUNDARY)
+
+        assert warm_caches() == 5
+        assert cache.get(build_cache_key("aggregated_measurements", 4, BOUNDARY)) is not None
+        assert cache.get(build_cache_key("temperature_values", 4)) is not None
+
+        with self.assertNumQueries(0):
+            response = self.client.post(
+                "/api/measurements/aggregated/",
+                json.dumps({"month": 4, "boundary_geometry": BOUNDARY}),
+                content_type="application/json",
+            )
+        assert response.json()["count"] == 1
+
+    def test_warm_caches_command(self):
+        """Test the management command reports the number of warmed results."""
+        out = StringIO()
+        call_command("warm_caches", "--limit", "0", stdout=out)
+
+        assert "Warmed 4 cached results" in out.getvalue()
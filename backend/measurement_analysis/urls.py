@@ -6,4 +6,5 @@ from . import views
 
 urlpatterns = [
     path("", views.analyzed_measurements_view, name="analyzed_measurements_view"),
+    path("regions/", views.region_list_view, name="region_list"),
 ]
@@ -3,25 +3,47 @@
 import hashlib
 import logging
 import os
-from datetime import timedelta
+import threading
+import time
+from datetime import date, datetime, timedelta
+from urllib.parse import urlencode
 
-from django.contrib.gis.geos import GEOSException, GEOSGeometry
 from django.core.cache import cache
-from django.db.models import Avg, Count, Max, Min
+from django.db import connection
+from django.db.models import Avg, Count, DateField, F, Max, Min, Q, Sum, Value
 from django.db.models.expressions import RawSQL
-from django.http import JsonResponse
+from django.db.models.functions import Least
+from django.http import HttpResponsePermanentRedirect, JsonResponse
 from django.utils import timezone
 from dotenv import load_dotenv
-from measurements.models import Measurement
-from rest_framework.decorators import api_view
-
+from measurements.models import MeasurementMetrics
+from rest_framework.decorators import api_view, authentication_classes
+
+from .boundaries import boundary_cache_key, parse_boundary
+from .conditional import (
+    REGIONS,
+    conditional_view,
+    get_versions,
+    measurement_dataset,
+    query_data,
+    request_parameters,
+)
+from .models import Region, RegionAggregate
+from .regions import ALL_MONTHS, apply_region_filter, get_region, get_region_payloads
 from .serializers import MeasurementAggregatedSerializer
+from .single_flight import lock_timeout, single_flight
+from .warming import record_request
 
 load_dotenv()
 cache_timeout = int(os.getenv("DJANGO_CACHE_TIMEOUT", 300))  # Default to 5 minutes
+# How long partitions older than cache_timeout are still served while they are refreshed
+stale_timeout = int(os.getenv("DJANGO_CACHE_STALE_TIMEOUT", 3600))  # Default to 1 hour
 
 logger = logging.getLogger("WATERWATCH")
 
+# Cached in place of a partition for months without data, so they are not queried again
+EMPTY_PARTITION = "__empty__"
+
 
 def _parse_month_parts(month_param):
     if isinstance(month_param, str):
@@ -105,14 +127,14 @@ def apply_boundary_filter(queryset, boundary_wkt):
     """
     if boundary_wkt:
         try:
-            # Parse WKT into a 4326 GEOSGeometry; frontend must have closed the ring
-            poly = GEOSGeometry(boundary_wkt, srid=4326)
-        except (ValueError, GEOSException) as err:
+            # Parsed once per distinct boundary; the ring must be closed by the frontend
+            boundary = parse_boundary(str(boundary_wkt))
+        except ValueError:
             logger.exception("Invalid boundary_geometry: %s", boundary_wkt)
-            raise ValueError("Invalid boundary_geometry format") from err
+            raise
 
         # Use `coveredby` to include points on the boundary and inside the polygon
-        queryset = queryset.filter(location__coveredby=poly)
+        queryset = queryset.filter(location__coveredby=boundary.geometry)
 
     return queryset
 
@@ -121,6 +143,10 @@ def apply_month_filter(queryset, months):
     """
     Apply month filter to queryset.
 
+    Months of the year are matched against the stored ``local_month`` column, which
+    ``measurement_metrics`` is partitioned by, so only the partitions of the selected
+    months are read.
+
     Parameters
     ----------
     queryset : QuerySet
@@ -138,11 +164,9 @@ def apply_month_filter(queryset, months):
 
     if 0 in months:
         cutoff = timezone.now().date() - timedelta(days=30)
-        queryset = queryset.filter(local_date__gte=cutoff)
-    else:
-        queryset = queryset.filter(local_date__month__in=months)
+        return queryset.filter(local_date__gte=cutoff)
 
-    return queryset
+    return queryset.filter(local_month__in=months)
 
 
 def build_cache_key(cache_type, month, boundary_geometry=None):
@@ -153,37 +177,77 @@ def build_cache_key(cache_type, month, boundary_geometry=None):
     ----------
     cache_type : str
         Type of cache (e.g., 'temperature_values', 'aggregated_measurements')
-    month : int
-        Month number (0 for last 30 days)
+    month : int or datetime.date
+        Month number, or a day of the rolling last 30 days (see ``last_30_days``)
     boundary_geometry : str, optional
-        Boundary geometry string for location-specific caching
+        Boundary geometry string for location-specific caching; equivalent boundaries
+        (see ``parse_boundary``) share a key
 
     Returns
     -------
     str
         Cache key string
     """
-    if boundary_geometry:
-        boundary_hash = hashlib.md5((boundary_geometry or "").encode()).hexdigest()[:8]
-        boundary_part = f"{boundary_hash}"
-    else:
-        boundary_part = ""
-
-    if month == 0:
-        # For last 30 days, include the current date to ensure cache invalidation
-        current_date = timezone.now().date().isoformat()
+    boundary_part = boundary_cache_key(boundary_geometry)[:8] if boundary_geometry else ""
+
+    if isinstance(month, date):
         if boundary_part:
-            return f"{cache_type}:last30days:{boundary_part}:{current_date}"
-        return f"{cache_type}:last30days:{current_date}"
+            return f"{cache_type}:day:{boundary_part}:{month.isoformat()}"
+        return f"{cache_type}:day:{month.isoformat()}"
 
     if boundary_part:
         return f"{cache_type}:month:{boundary_part}:{month}"
     return f"{cache_type}:month:{month}"
 
 
-def get_cached_results_for_months(cache_type, months, boundary_geometry=None):
+def last_30_days():
+    """
+    Get the days making up the last 30 days (month 0), oldest first.
+
+    The last 30 days are cached as one partition per day, so a new day only requires
+    computing that day while the partitions of the previous days are reused. The last day
+    is open-ended (see ``apply_day_filter``), so like ``apply_month_filter`` the days cover
+    every measurement since the cutoff.
+
+    Returns
+    -------
+    list[datetime.date]
+        The days since the cutoff of ``apply_month_filter``, up to and including tomorrow
+        for measurements whose local date is ahead of the server
+    """
+    cutoff = timezone.now().date() - timedelta(days=30)
+    return [cutoff + timedelta(days=n) for n in range(32)]
+
+
+def apply_day_filter(queryset, days):
+    """
+    Filter a queryset on days of the last 30 days and annotate the day each row belongs to.
+
+    Measurements dated after the last day of ``last_30_days``, e.g. by a device with a wrong
+    clock, belong to the last day, so they are not left out of the last 30 days.
+
+    Parameters
+    ----------
+    queryset : QuerySet
+        Django queryset to filter
+    days : list[datetime.date]
+        Days of ``last_30_days``
+
+    Returns
+    -------
+    QuerySet
+        Filtered queryset, with the day of every row as ``day``
+    """
+    last_day = last_30_days()[-1]
+    condition = Q(local_date__in=days)
+    if last_day in days:
+        condition |= Q(local_date__gt=last_day)
+    return queryset.filter(condition).annotate(day=Least("local_date", Value(last_day, output_field=DateField())))
+
+
+def get_cached_partitions(cache_type, months, boundary_geometry=None):
     """
-    Get cached results for multiple months and identify which are missing.
+    Get the cached per-month partitions of a result and identify which months are missing.
 
     Parameters
     ----------
@@ -197,76 +261,237 @@ def get_cached_results_for_months(cache_type, months, boundary_geometry=None):
     Returns
     -------
     tuple
-        (cached_results, missing_months)
+        (dict of month to cached partition, list of missing months). Months cached as
+        empty are neither in the partitions nor missing.
     """
-    cached_results = []
+    partitions = {}
     missing_months = []
 
     for month in months:
-        cache_key = build_cache_key(cache_type, month, boundary_geometry)
-        cached_result = cache.get(cache_key)
-        if cached_result is not None:
-            cached_results.extend(cached_result)
-        else:
+        partition = cache.get(build_cache_key(cache_type, month, boundary_geometry))
+        if partition is None:
             missing_months.append(month)
+        elif partition != EMPTY_PARTITION:
+            partitions[month] = partition
 
-    return cached_results, missing_months
+    return partitions, missing_months
 
 
-def cache_results_by_month(cache_type, results_list, months, boundary_geometry=None):
+def cache_partitions(cache_type, partitions, boundary_geometry=None):
     """
-    Cache results grouped by month.
+    Cache per-month partitions of a result, one cache entry per month.
+
+    Entries become stale after ``cache_timeout`` and expire ``stale_timeout`` later. Days
+    before today only change when measurements are written, which clears the cache, so they
+    never become stale and are kept until they leave the last 30 days.
 
     Parameters
     ----------
     cache_type : str
         Type of cache
-    results_list : list
-        List of results to cache
-    months : list
-        List of months
+    partitions : dict
+        Partition per month or per day of the last 30 days
     boundary_geometry : str, optional
         Boundary geometry for location-specific caching
     """
-    if not results_list or not months:
+    if not partitions:
         return
 
-    if 0 in months:
-        # For last 30 days, cache all results together
-        cache_key = build_cache_key(cache_type, 0, boundary_geometry)
-        cache.set(cache_key, results_list, cache_timeout)
-    else:
-        # Group results by month and cache separately
-        # For aggregated results, we can group by month field
-        if cache_type == "aggregated_measurements":
-            results_by_month = {}
-            for result in results_list:
-                month = result["month"]
-                if month not in results_by_month:
-                    results_by_month[month] = []
-                results_by_month[month].append(result)
-
-            # Cache each month's results
-            for month, month_results in results_by_month.items():
-                cache_key = build_cache_key(cache_type, month, boundary_geometry)
-                cache.set(cache_key, month_results, cache_timeout)
+    # Partitions are kept past their soft timeout so they can be served while being refreshed
+    stale_at = time.time() + cache_timeout
+    today = timezone.now().date()
+    stale_markers = {}
+    past_markers = []
+    for month, partition in partitions.items():
+        cache_key = build_cache_key(cache_type, month, boundary_geometry)
+        if isinstance(month, date) and month < today:
+            cache.set(cache_key, partition, _seconds_in_last_30_days(month))
+            # A day cached as today yesterday may still have a marker
+            past_markers.append(f"{cache_key}:stale_at")
+            continue
+        cache.set(cache_key, partition, cache_timeout + stale_timeout)
+        stale_markers[f"{cache_key}:stale_at"] = stale_at
+    if stale_markers:
+        cache.set_many(stale_markers, cache_timeout + stale_timeout)
+    if past_markers:
+        cache.delete_many(past_markers)
+
+
+def _seconds_in_last_30_days(day):
+    """Get the number of seconds until a day is no longer part of ``last_30_days``."""
+    leaves_at = datetime.combine(day + timedelta(days=31), datetime.min.time(), tzinfo=timezone.get_current_timezone())
+    return max(int((leaves_at - timezone.now()).total_seconds()), 1)
+
+
+def _find_stale_months(cache_type, months, boundary_geometry):
+    """Find the cached months whose soft timeout has passed."""
+    keys = {f"{build_cache_key(cache_type, month, boundary_geometry)}:stale_at": month for month in months}
+    now = time.time()
+    return [keys[key] for key, stale_at in cache.get_many(list(keys)).items() if stale_at <= now]
+
+
+def _fetch_and_cache_partitions(cache_type, months, boundary_geometry, fetch_missing):
+    """Compute the partitions of the given months and cache them, marking months without data as empty."""
+    fetched = fetch_missing(months)
+    cache_partitions(cache_type, {month: fetched.get(month, EMPTY_PARTITION) for month in months}, boundary_geometry)
+    return fetched
+
+
+def _partitions_key(cache_type, months, boundary_geometry):
+    """Build a short key identifying a set of partitions, e.g. all days of the last 30 days."""
+    keys = ",".join(build_cache_key(cache_type, month, boundary_geometry) for month in months)
+    return f"{cache_type}:{hashlib.md5(keys.encode()).hexdigest()}"
+
+
+def _refresh_partitions(cache_type, months, boundary_geometry, fetch_missing, refresh_key):
+    try:
+        _fetch_and_cache_partitions(cache_type, months, boundary_geometry, fetch_missing)
+    except Exception:
+        logger.exception("Refreshing %s for months %s failed", cache_type, months)
+    finally:
+        cache.delete(refresh_key)
+        # Threads get their own database connection which Django does not close for us
+        connection.close()
+
+
+def _schedule_refresh(cache_type, months, boundary_geometry, fetch_missing):
+    """Recompute stale partitions in a background thread, unless another request already does."""
+    refresh_key = f"refresh:{_partitions_key(cache_type, months, boundary_geometry)}"
+    if not cache.add(refresh_key, 1, lock_timeout):
+        return
+    threading.Thread(
+        target=_refresh_partitions,
+        args=(cache_type, months, boundary_geometry, fetch_missing, refresh_key),
+        daemon=True,
+    ).start()
+
+
+def get_partitions(cache_type, months, boundary_geometry, fetch_missing, background=True):
+    """
+    Get the per-month partitions of a result, computing all missing months at once.
+
+    Parameters
+    ----------
+    cache_type : str
+        Type of cache
+    months : list
+        List of months, or of days (see ``last_30_days``)
+    boundary_geometry : str or None
+        Boundary geometry for location-specific caching
+    fetch_missing : Callable[[list], dict]
+        Computes the partitions of the given months with a single grouped query. Months
+        without data may be left out; they are cached as ``EMPTY_PARTITION``. Concurrent
+        calls missing the same months run it only once. Partitions older than
+        ``cache_timeout`` are returned as they are and recomputed in the background; only
+        after another ``stale_timeout`` do they expire and have to be waited for.
+    background : bool, optional
+        Whether to refresh stale partitions in the background, otherwise they are recomputed
+        before returning
+
+    Returns
+    -------
+    dict
+        Partition per month, without months that have no data
+    """
+    partitions, missing_months = get_cached_partitions(cache_type, months, boundary_geometry)
+
+    # Stale partitions are served as they are and refreshed for later requests
+    stale_months = _find_stale_months(cache_type, [m for m in months if m not in missing_months], boundary_geometry)
+    if stale_months and background:
+        _schedule_refresh(cache_type, stale_months, boundary_geometry, fetch_missing)
+    elif stale_months:
+        for month in stale_months:
+            partitions.pop(month, None)
+        partitions.update(_fetch_and_cache_partitions(cache_type, stale_months, boundary_geometry, fetch_missing))
+
+    if not missing_months:
+        return partitions
+
+    def read():
+        cached, still_missing = get_cached_partitions(cache_type, missing_months, boundary_geometry)
+        return None if still_missing else cached
+
+    def compute():
+        return _fetch_and_cache_partitions(cache_type, missing_months, boundary_geometry, fetch_missing)
+
+    # Concurrent requests missing the same months wait for a single computation
+    lock_key = _partitions_key(cache_type, missing_months, boundary_geometry)
+    partitions.update(single_flight(lock_key, read, compute))
+    return partitions
 
 
 # Measurement Analysis specific functions
-def _get_cached_agg_results(months, boundary_geometry=None):
-    """Wrap around the generic cache fetch for aggregated_measurements."""
-    return get_cached_results_for_months("aggregated_measurements", months, boundary_geometry)
+def _fetch_aggregated_partitions(boundary_geometry, months):
+    """Aggregate the measurements of several months with one grouped query, split per month."""
+    queryset = apply_month_filter(apply_boundary_filter(_build_optimized_queryset(), boundary_geometry), months)
 
+    partitions = {}
+    for row in _perform_aggregation(queryset):
+        partitions.setdefault(row["month"], []).append(row)
+    return partitions
 
-def _cache_agg_results(results_list, months, boundary_geometry=None):
-    """Wrap around the generic cache set for aggregated_measurements."""
-    cache_results_by_month("aggregated_measurements", results_list, months, boundary_geometry)
 
+def _fetch_aggregated_day_partitions(boundary_geometry, days):
+    """Aggregate the measurements of several days with one grouped query, split per day.
 
-def _apply_filters(queryset, month_param):
-    """Apply filters to the queryset with proper error handling."""
-    months = parse_month_parameter(month_param)
-    return apply_month_filter(queryset, months)
+    Rows hold sums and counts instead of averages so the days can be merged afterwards.
+    """
+    queryset = apply_day_filter(apply_boundary_filter(_build_optimized_queryset(), boundary_geometry), days)
+    rows = (
+        queryset.annotate(
+            longitude=RawSQL("ST_X(location)", []),
+            latitude=RawSQL("ST_Y(location)", []),
+            month=F("local_month"),
+        )
+        .values("day", "location", "longitude", "latitude", "month")
+        .annotate(
+            count=Count("location"),
+            temperature_count=Count("temperature_value"),
+            temperature_sum=Sum("temperature_value"),
+            min_temperature=Min("temperature_value"),
+            max_temperature=Max("temperature_value"),
+        )
+        .order_by()
+    )
+
+    partitions = {}
+    for row in rows:
+        partitions.setdefault(row.pop("day"), []).append(row)
+    return partitions
+
+
+def _merge_extreme(current, value, pick):
+    if current is None:
+        return value
+    if value is None:
+        return current
+    return pick(current, value)
+
+
+def _merge_day_partitions(partitions):
+    """Merge per-day aggregates into one row per location and month, like ``_perform_aggregation``."""
+    merged = {}
+    for day in sorted(partitions):
+        for row in partitions[day]:
+            key = (row["longitude"], row["latitude"], row["month"])
+            total = merged.get(key)
+            if total is None:
+                merged[key] = dict(row)
+                continue
+            total["count"] += row["count"]
+            total["temperature_count"] += row["temperature_count"]
+            if row["temperature_sum"] is not None:
+                total["temperature_sum"] = (total["temperature_sum"] or 0) + row["temperature_sum"]
+            total["min_temperature"] = _merge_extreme(total["min_temperature"], row["min_temperature"], min)
+            total["max_temperature"] = _merge_extreme(total["max_temperature"], row["max_temperature"], max)
+
+    results = []
+    for total in merged.values():
+        temperature_count = total.pop("temperature_count")
+        temperature_sum = total.pop("temperature_sum")
+        total["avg_temperature"] = temperature_sum / temperature_count if temperature_count else None
+        results.append(total)
+    return results
 
 
 def _perform_aggregation(queryset):
@@ -275,98 +500,309 @@ def _perform_aggregation(queryset):
     queryset = queryset.annotate(
         longitude=RawSQL("ST_X(location)", []),
         latitude=RawSQL("ST_Y(location)", []),
-        month=RawSQL("EXTRACT(month FROM local_date)", []),
+        month=F("local_month"),
     )
 
     # Perform aggregation grouped by location AND month
     return queryset.values("location", "longitude", "latitude", "month").annotate(
         count=Count("location"),
-        avg_temperature=Avg("temperature__value"),
-        min_temperature=Min("temperature__value"),
-        max_temperature=Max("temperature__value"),
+        avg_temperature=Avg("temperature_value"),
+        min_temperature=Min("temperature_value"),
+        max_temperature=Max("temperature_value"),
     )
 
 
 def _build_optimized_queryset():
     """Build an optimized base queryset for aggregation."""
-    # Only select_related the temperature model since that's what we're aggregating
-    return Measurement.objects.select_related("temperature")
+    # The wide metrics table already holds the temperature, so no join is needed
+    return MeasurementMetrics.objects.all()
+
 
+def _optional_float(value):
+    return float(value) if value is not None else None
+
+
+def compute_region_aggregates(region, months):
+    """Aggregate the measurements of a region per month into JSON-serialisable payloads."""
+    queryset = apply_region_filter(_build_optimized_queryset(), region).filter(local_month__in=months)
+
+    payloads = {month: [] for month in months}
+    for row in _perform_aggregation(queryset):
+        payloads[row["month"]].append(
+            {
+                "location": {"latitude": row["latitude"], "longitude": row["longitude"]},
+                "month": row["month"],
+                "count": row["count"],
+                "avg_temperature": _optional_float(row["avg_temperature"]),
+                "min_temperature": _optional_float(row["min_temperature"]),
+                "max_temperature": _optional_float(row["max_temperature"]),
+            }
+        )
+    return payloads
+
+
+def _get_region_results(region, months):
+    """Get the aggregated measurements of a saved region from its precomputed monthly aggregates."""
+    if 0 in months:
+        # The last 30 days move every day, so they are not precomputed
+        queryset = apply_month_filter(apply_region_filter(_build_optimized_queryset(), region), months)
+        return list(_perform_aggregation(queryset))
+
+    payloads = get_region_payloads(
+        region,
+        RegionAggregate.AGGREGATED_MEASUREMENTS,
+        months or ALL_MONTHS,
+        lambda missing_months: compute_region_aggregates(region, missing_months),
+    )
+    return [row for month in sorted(payloads) for row in payloads[month]]
+
+
+def measurement_versions(months):
+    """
+    Get the versions of the measurements read for the given months, for conditional requests.
 
-@api_view(["POST"])
+    Parameters
+    ----------
+    months : list
+        Parsed months, where an empty list means all months and ``[0]`` the last 30 days
+
+    Returns
+    -------
+    dict
+        Version per dataset (see ``get_versions``)
+    """
+    if months == [0]:
+        # Measurements dated after the window are counted in its last day, whatever their month
+        versions = get_versions(measurement_dataset(month) for month in ALL_MONTHS)
+        # The window moves every day, also without changes to the measurements
+        start_of_day = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        versions["last_30_days"] = int(start_of_day.timestamp()) * 1_000_000_000
+        return versions
+    return get_versions(measurement_dataset(month) for month in months or ALL_MONTHS)
+
+
+def analysis_versions(request, parameter_names=()):
+    """
+    Get the dataset versions and parameters of an analysis request, for ``conditional_view``.
+
+    Parameters
+    ----------
+    request : HttpRequest
+        The request
+    parameter_names : tuple[str], optional
+        Names of further parameters that change the response
+
+    Returns
+    -------
+    tuple
+        (dict of dataset versions, dict of canonical request parameters)
+
+    Raises
+    ------
+    ValueError
+        If the request parameters are invalid.
+    """
+    data = request_parameters(request)
+    months = parse_month_parameter(data.get("month"))
+    versions = measurement_versions(months)
+
+    region_id = data.get("region")
+    boundary_geometry = data.get("boundary_geometry")
+    parameters = {name: data.get(name) for name in parameter_names}
+    if region_id is not None:
+        versions.update(get_versions([REGIONS]))
+        parameters["region"] = str(region_id)
+    elif boundary_geometry:
+        # Equivalent boundaries share an ETag like they share cache entries
+        parameters["boundary"] = boundary_cache_key(boundary_geometry)
+    parameters["months"] = months
+    return versions, parameters
+
+
+def read_analysis_request(request):
+    """
+    Get the parameters of an analysis request, from the JSON body of a POST or the query string of a GET.
+
+    Parameters
+    ----------
+    request : Request
+        The DRF request
+
+    Returns
+    -------
+    dict
+        The parameters in the shape of a JSON request body
+    """
+    if request.method == "POST":
+        return request.data or {}
+    return query_data(request.query_params)
+
+
+def canonical_query(data, parameter_names=()):
+    """
+    Build the canonical query string of an analysis request.
+
+    Months are sorted, boundaries are in canonical form (see ``parse_boundary``) and parameters
+    that do not change the response are dropped, so equivalent requests share one URL and one
+    entry in a caching proxy.
+
+    Parameters
+    ----------
+    data : dict
+        Parameters of the request (see ``read_analysis_request``)
+    parameter_names : tuple[str], optional
+        Names of further parameters that change the response
+
+    Returns
+    -------
+    str
+        The query string, with parameters in alphabetical order
+
+    Raises
+    ------
+    ValueError
+        If the months, region or boundary are invalid.
+    """
+    query = {}
+    months = parse_month_parameter(data.get("month"))
+    if months:
+        query["month"] = ",".join(map(str, months))
+
+    region_id = data.get("region")
+    if region_id is not None:
+        query["region"] = str(int(region_id))
+    elif data.get("boundary_geometry"):
+        query["boundary_geometry"] = parse_boundary(str(data["boundary_geometry"])).geometry.wkt
+
+    for name in parameter_names:
+        value = data.get(name)
+        if value is not None:
+            query[name] = ",".join(map(str, value)) if isinstance(value, list) else str(value)
+    return urlencode(sorted(query.items()), safe=",()")
+
+
+def canonical_redirect(request, parameter_names=()):
+    """
+    Redirect a GET analysis request to its canonical URL, if it is not already there.
+
+    Parameters
+    ----------
+    request : Request
+        The DRF request
+    parameter_names : tuple[str], optional
+        Names of further parameters that change the response
+
+    Returns
+    -------
+    HttpResponsePermanentRedirect or None
+        The redirect, or None for canonical, invalid and POST requests, which the view answers
+    """
+    if request.method == "POST":
+        return None
+    try:
+        query = canonical_query(read_analysis_request(request), parameter_names)
+    except (TypeError, ValueError):
+        return None
+    if query == request.META.get("QUERY_STRING", ""):
+        return None
+    return HttpResponsePermanentRedirect(f"{request.path}?{query}" if query else request.path)
+
+
+def _aggregated_response(results):
+    serialized_data = MeasurementAggregatedSerializer(results, many=True).data
+    response_data = {"measurements": serialized_data, "count": len(serialized_data), "status": "success"}
+    return JsonResponse(response_data, safe=True)
+
+
+@conditional_view(analysis_versions, methods=("GET", "HEAD", "POST"))
+@api_view(["GET", "POST"])
+# Public data; not reading the session keeps `Vary: Cookie` off, so a proxy can share responses
+@authentication_classes([])
 def analyzed_measurements_view(request):
     """Export aggregated measurements.
 
     This view exports aggregated measurements with optional filters for month. Uses smart caching.
+    Responses carry an ETag derived from the versions of the months they read, so a client
+    sending it back in ``If-None-Match`` receives a 304 while the data did not change.
+
+    The parameters are sent as a JSON body with POST, or as query parameters with GET, which a
+    caching proxy can store. GET requests are redirected to their canonical URL (see
+    ``canonical_query``) first.
 
     Parameters
     ----------
     request : HttpRequest
         The HTTP request object containing JSON data with optional:
         - month: Month parameter for temporal filtering
-        - boundary_geometry: WKT of a polygon to filter measurements within that area
+        - region: Id of a saved region, served from precomputed aggregates
+        - boundary_geometry: WKT of a polygon to filter measurements within that area, used if no region is given
 
     Returns
     -------
     JsonResponse
         JSON response containing aggregated measurements.
     """
-    data = request.data or {}
+    redirect = canonical_redirect(request)
+    if redirect is not None:
+        return redirect
+
+    data = read_analysis_request(request)
     boundary_geometry = data.get("boundary_geometry", None)
     month_param = data.get("month", None)
+    region_id = data.get("region", None)
 
     try:
         # Parse month parameter
         months = parse_month_parameter(month_param)
 
-        # Try to get cached results
-        if months:
-            cached_results, missing_months = _get_cached_agg_results(months, boundary_geometry)
-
-            # If we have all results cached, return them
-            if not missing_months:
-                serializer = MeasurementAggregatedSerializer(cached_results, many=True)
-                serialized_data = serializer.data
-                response_data = {"measurements": serialized_data, "count": len(serialized_data), "status": "success"}
-                return JsonResponse(response_data, safe=True)
-
-            # Otherwise, we need to fetch missing months
-            months_to_fetch = missing_months
-        else:
-            cached_results = []
-            months_to_fetch = []
-
-        # Build optimized queryset for missing months
-        queryset = _build_optimized_queryset()
-        queryset = apply_boundary_filter(queryset, boundary_geometry)
-
-        # Apply filters only for missing months
-        if months_to_fetch:
-            queryset = _apply_filters(queryset, months_to_fetch)
-            # Perform aggregation
-            new_results = _perform_aggregation(queryset)
-            new_results_list = list(new_results)
-
-            # Cache the new results
-            _cache_agg_results(new_results_list, months_to_fetch, boundary_geometry)
-
-            # Combine with cached results
-            all_results = cached_results + new_results_list
-        else:
-            # If no months specified, get all data without caching
-            queryset = _apply_filters(queryset, month_param)
-            results = _perform_aggregation(queryset)
-            all_results = list(results)
-
-        # Serialize the data
-        serializer = MeasurementAggregatedSerializer(all_results, many=True)
-        serialized_data = serializer.data
+        if region_id is not None:
+            return _aggregated_response(_get_region_results(get_region(region_id), months))
 
-        response_data = {"measurements": serialized_data, "count": len(serialized_data), "status": "success"}
-        return JsonResponse(response_data, safe=True)
+        if not months:
+            # If no months specified, get all data without caching
+            queryset = apply_boundary_filter(_build_optimized_queryset(), boundary_geometry)
+            return _aggregated_response(list(_perform_aggregation(queryset)))
+
+        if months == [0]:
+            # The last 30 days are merged from cached daily aggregates
+            partitions = get_partitions(
+                "aggregated_measurements",
+                last_30_days(),
+                boundary_geometry,
+                lambda missing_days: _fetch_aggregated_day_partitions(boundary_geometry, missing_days),
+            )
+            record_request("aggregated_measurements", months, boundary_geometry)
+            return _aggregated_response(_merge_day_partitions(partitions))
+
+        partitions = get_partitions(
+            "aggregated_measurements",
+            months,
+            boundary_geometry,
+            lambda missing_months: _fetch_aggregated_partitions(boundary_geometry, missing_months),
+        )
+        record_request("aggregated_measurements", months, boundary_geometry)
+        return _aggregated_response([row for month in months for row in partitions.get(month, ())])
 
     except ValueError as e:
         return JsonResponse({"error": str(e)}, status=400)
     except Exception:
         logger.exception("Error in analyzed_measurements_view")
         return JsonResponse({"error": "Internal server error"}, status=500)
+
+
+@api_view(["GET"])
+def region_list_view(_request):
+    """Get the saved regions that can be referenced by id in analysis requests.
+
+    Parameters
+    ----------
+    _request : HttpRequest
+        The HTTP request object.
+
+    Returns
+    -------
+    JsonResponse
+        JSON response with the id, name and country (for country regions) of every region.
+    """
+    regions = Region.objects.values("id", "name", country=F("location__country_name"))
+    return JsonResponse({"regions": list(regions)})
@@ -0,0 +1,208 @@
+"""Precompute the cached analysis results that are requested most often."""
+
+import logging
+import os
+import threading
+import time
+
+from django.core.cache import caches
+from django.db import connection
+from dotenv import load_dotenv
+
+from .boundaries import boundary_cache_key
+from .models import Region, RegionAggregate
+from .regions import ALL_MONTHS, get_region_payloads
+
+load_dotenv()
+# Seconds between two runs of the in-process scheduler, 0 disables it
+warm_interval = int(os.getenv("DJANGO_CACHE_WARM_INTERVAL", 0))
+# Maximum number of observed requests warmed per run, on top of the defaults
+warm_limit = int(os.getenv("DJANGO_CACHE_WARM_LIMIT", 50))
+
+logger = logging.getLogger("WATERWATCH")
+
+CACHE_TYPES = ("aggregated_measurements", "temperature_values")
+# Each observed request gets its own numbered key, so concurrent workers never overwrite each other
+TARGET_COUNT_KEY = "warm:targets"
+SCHEDULER_LOCK_KEY = "warm:scheduler"
+# Upper bound on the number of distinct requests whose frequency is tracked
+MAX_TARGETS = 500
+
+_scheduler_lock = threading.Lock()
+_scheduler_started = False
+
+
+def _signature(cache_type, months, boundary_geometry):
+    boundary_part = boundary_cache_key(boundary_geometry) if boundary_geometry else ""
+    return f"{cache_type}:{','.join(map(str, months))}:{boundary_part}"
+
+
+def _incr(stats_cache, key):
+    """Atomically increment a counter without expiry, creating it at 1 if it does not exist."""
+    try:
+        return stats_cache.incr(key)
+    except ValueError:
+        # add() makes sure only one worker creates the counter
+        if stats_cache.add(key, 1, None):
+            return 1
+        return stats_cache.incr(key)
+
+
+def record_request(cache_type, months, boundary_geometry=None):
+    """Count a request for a cached analysis result, so the most frequent ones are warmed first.
+
+    Parameters
+    ----------
+    cache_type : str
+        Type of cache, one of ``CACHE_TYPES``
+    months : list[int]
+        Parsed months of the request
+    boundary_geometry : str, optional
+        Boundary of the request
+    """
+    stats_cache = caches["stats_cache"]
+    signature = _signature(cache_type, months, boundary_geometry)
+    if _incr(stats_cache, f"warm:hits:{signature}") != 1:
+        return
+
+    # First request for this target, registered in the next free slot
+    slot = _incr(stats_cache, TARGET_COUNT_KEY)
+    if slot <= MAX_TARGETS:
+        target = {"cache_type": cache_type, "months": months, "boundary_geometry": boundary_geometry}
+        stats_cache.set(f"warm:target:{slot}", target, None)
+
+
+def get_warm_targets(limit=None):
+    """Get the requests to warm, in order of priority.
+
+    The map defaults (all months and the last 30 days without a boundary) come first, followed
+    by the observed requests ordered by how often they were made.
+
+    Parameters
+    ----------
+    limit : int, optional
+        Maximum number of observed requests, defaults to ``DJANGO_CACHE_WARM_LIMIT``
+
+    Returns
+    -------
+    list[dict]
+        Targets with ``cache_type``, ``months`` and ``boundary_geometry``
+    """
+    limit = warm_limit if limit is None else limit
+    targets = {
+        _signature(cache_type, months, None): {"cache_type": cache_type, "months": months, "boundary_geometry": None}
+        for cache_type in CACHE_TYPES
+        for months in (ALL_MONTHS, [0])
+    }
+
+    stats_cache = caches["stats_cache"]
+    count = min(stats_cache.get(TARGET_COUNT_KEY, 0), MAX_TARGETS)
+    slots = stats_cache.get_many([f"warm:target:{slot}" for slot in range(1, count + 1)])
+    observed = {
+        _signature(target["cache_type"], target["months"], target["boundary_geometry"]): target
+        for target in slots.values()
+    }
+    hits = stats_cache.get_many([f"warm:hits:{signature}" for signature in observed])
+    ranked = sorted(observed, key=lambda signature: hits.get(f"warm:hits:{signature}", 0), reverse=True)
+    for signature in ranked[:limit]:
+        targets.setdefault(signature, observed[signature])
+    return list(targets.values())
+
+
+def _partition_request(cache_type, months, boundary_geometry):
+    """Get the partitions and the fetch function the views use for a request."""
+    # Import here to avoid circular imports
+    from measurements.views import _fetch_temperature_day_sketches, _fetch_temperature_sketches
+
+    from .views import _fetch_aggregated_day_partitions, _fetch_aggregated_partitions, last_30_days
+
+    aggregated = cache_type == "aggregated_measurements"
+    if months == [0]:
+        # The last 30 days are cached per day
+        fetch = _fetch_aggregated_day_partitions if aggregated else _fetch_temperature_day_sketches
+        return last_30_days(), lambda days: fetch(boundary_geometry, days)
+
+    fetch = _fetch_aggregated_partitions if aggregated else _fetch_temperature_sketches
+    return months, lambda missing_months: fetch(boundary_geometry, missing_months)
+
+
+def warm_caches(limit=None):
+    """Compute the missing and stale cache entries of the most requested analysis results.
+
+    Saved regions are warmed as well by computing their missing precomputed aggregates.
+
+    Parameters
+    ----------
+    limit : int, optional
+        Maximum number of observed requests, defaults to ``DJANGO_CACHE_WARM_LIMIT``
+
+    Returns
+    -------
+    int
+        Number of requests and regions warmed
+    """
+    from .views import get_partitions
+
+    warmed = 0
+    for target in get_warm_targets(limit):
+        cache_type, months, boundary_geometry = target["cache_type"], target["months"], target["boundary_geometry"]
+        try:
+            partitions, fetch_missing = _partition_request(cache_type, months, boundary_geometry)
+            get_partitions(cache_type, partitions, boundary_geometry, fetch_missing, background=False)
+        except ValueError:
+            logger.warning("Skipping cache warming of invalid %s request %s", cache_type, target)
+            continue
+        warmed += 1
+
+    # Import here to avoid circular imports
+    from measurements.views import compute_region_temperature_payloads
+
+    from .views import compute_region_aggregates
+
+    for region in Region.objects.all():
+        get_region_payloads(
+            region,
+            RegionAggregate.AGGREGATED_MEASUREMENTS,
+            ALL_MONTHS,
+            lambda months, region=region: compute_region_aggregates(region, months),
+        )
+        get_region_payloads(
+            region,
+            RegionAggregate.TEMPERATURE_VALUES,
+            ALL_MONTHS,
+            lambda months, region=region: compute_region_temperature_payloads(region, months),
+        )
+        warmed += 1
+
+    return warmed
+
+
+def _run_scheduler():
+    while True:
+        # Only one worker warms the caches per interval
+        if caches["stats_cache"].add(SCHEDULER_LOCK_KEY, 1, warm_interval):
+            try:
+                started = time.monotonic()
+                warmed = warm_caches()
+                logger.info("Warmed %d cached results in %.1fs", warmed, time.monotonic() - started)
+            except Exception:
+                logger.exception("Cache warming failed")
+            finally:
+                # Threads get their own database connection which Django does not close for us
+                connection.close()
+        time.sleep(warm_interval)
+
+
+def start_scheduler(**_kwargs):
+    """Start the in-process cache warming scheduler once per process, if it is enabled.
+
+    Connected to ``request_started`` so the scheduler only runs in processes serving requests.
+    """
+    global _scheduler_started
+    if not warm_interval or _scheduler_started:
+        return
+    with _scheduler_lock:
+        if _scheduler_started:
+            return
+        _scheduler_started = True
+    threading.Thread(target=_run_scheduler, daemon=True).start()
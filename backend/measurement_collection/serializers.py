@@ -5,7 +5,8 @@ from datetime import datetime
 
 from campaigns.views import find_matching_campaigns
 from django.contrib.gis.geos import Point
-from measurements.metrics import METRIC_MODELS
+from django.db import transaction
+from measurements.metrics import METRICS
 from measurements.models import Measurement, Temperature
 from rest_framework import serializers
 from rest_framework_gis.serializers import GeoFeatureModelSerializer
@@ -74,14 +75,7 @@ class MeasurementSerializer(GeoFeatureModelSerializer):
             The validated data.
         """
         # Check if at least one metric is provided
-        has_metrics = False
-        for metric_cls in METRIC_MODELS:
-            attr = metric_cls.__name__.lower()
-            if data.get(attr):
-                has_metrics = True
-                break
-
-        if not has_metrics:
+        if not any(data.get(metric_type.name) for metric_type in METRICS):
             raise serializers.ValidationError("At least one metric must be provided with the measurement.")
 
         # Set flag if temperature is out of range
@@ -112,13 +106,15 @@ class MeasurementSerializer(GeoFeatureModelSerializer):
             The created Measurement object.
         """
         temperature_data = validated_data.pop("temperature", None)
-        measurement = Measurement.objects.create(**validated_data)
-        timestamp_local = datetime.combine(measurement.local_date, measurement.local_time)
-        active_campaigns = find_matching_campaigns(
-            timestamp_local, str(measurement.location.y), str(measurement.location.x)
-        )
-        measurement.campaigns.add(*active_campaigns)
-        if temperature_data:
-            Temperature.objects.create(measurement=measurement, **temperature_data)
+        # Campaign statistics are updated by signals, in the same transaction as the measurement
+        with transaction.atomic():
+            measurement = Measurement.objects.create(**validated_data)
+            if temperature_data:
+                Temperature.objects.create(measurement=measurement, **temperature_data)
+            timestamp_local = datetime.combine(measurement.local_date, measurement.local_time)
+            active_campaigns = find_matching_campaigns(
+                timestamp_local, str(measurement.location.y), str(measurement.location.x)
+            )
+            measurement.campaigns.add(*active_campaigns)
 
         return measurement
@@ -0,0 +1,125 @@
+"""Column-wise transformation of exported measurements, one database batch at a time.
+
+Rows are fetched from the database cursor as tuples and transposed into columns, so flag
+inversion, metric assembly and the encoding of nested values are done per column instead of
+per row dictionary, and the format writers turn each batch into one buffer of output.
+"""
+
+import json
+from itertools import islice
+
+DEFAULT_BATCH_SIZE = 500
+
+# Reused encoders, as json.dumps builds a new encoder on every call that passes options
+encode_cell = json.JSONEncoder(default=str).encode
+encode_indented = json.JSONEncoder(indent=2, default=str).encode
+
+# Columns holding lists, written as JSON in flat formats
+NESTED_COLUMNS = ("metrics", "campaigns")
+
+
+class ColumnBatch:
+    """A batch of exported measurements, stored as one list per column.
+
+    Parameters
+    ----------
+    names : tuple[str]
+        Column names, in output order
+    columns : list[list]
+        Values of each column, in the order of ``names``
+    """
+
+    def __init__(self, names, columns):
+        self.names = names
+        self.columns = columns
+
+    def __len__(self):
+        """Get the number of rows in the batch."""
+        return len(self.columns[0])
+
+    def rows(self):
+        """Iterate over the rows of the batch as tuples."""
+        return zip(*self.columns, strict=True)
+
+    def records(self):
+        """Get the rows of the batch as dictionaries."""
+        names = self.names
+        return [dict(zip(names, row, strict=True)) for row in self.rows()]
+
+
+def batched(rows, batch_size):
+    """Split an iterable of rows into lists of at most ``batch_size`` rows.
+
+    Parameters
+    ----------
+    rows : Iterable
+        The rows
+    batch_size : int
+        Maximum number of rows per list
+
+    Yields
+    ------
+    list
+        The next non-empty batch of rows
+    """
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+def transform_batch(rows, fields, metric_types):
+    """Transpose fetched rows into the columns of an export.
+
+    Parameters
+    ----------
+    rows : list[tuple]
+        Fetched rows holding ``fields``, then the lookups of each metric type, then the campaign names
+    fields : tuple[str]
+        Names of the measurement columns, including ``flag``
+    metric_types : list[MetricType]
+        The included metric types
+
+    Returns
+    -------
+    ColumnBatch
+        The measurement columns with the flag inverted, followed by ``metrics`` and ``campaigns``
+    """
+    columns = list(zip(*rows, strict=True))
+    output = [list(column) for column in columns[: len(fields)]]
+
+    # Flags are stored as "valid" and exported as "flagged"
+    flag = fields.index("flag")
+    output[flag] = [not value for value in output[flag]]
+
+    position = len(fields)
+    per_type = []
+    for metric_type in metric_types:
+        end = position + len(metric_type.lookups)
+        per_type.append(metric_type.metrics_from_columns(columns[position:end]))
+        position = end
+    if per_type:
+        output.append([[metric for metric in metrics if metric] for metrics in zip(*per_type, strict=True)])
+    else:
+        output.append([[] for _ in rows])
+
+    output.append(list(columns[position]))
+    return ColumnBatch((*fields, *NESTED_COLUMNS), output)
+
+
+def encode_nested_columns(batch):
+    """Get the columns of a batch with the nested columns encoded as JSON, for flat formats.
+
+    Parameters
+    ----------
+    batch : ColumnBatch
+        The batch
+
+    Returns
+    -------
+    list[list]
+        The columns, in the order of ``batch.names``
+    """
+    return [
+        list(map(encode_cell, column)) if name in NESTED_COLUMNS else column
+        for name, column in zip(batch.names, batch.columns, strict=True)
+    ]
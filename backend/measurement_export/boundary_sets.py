@@ -0,0 +1,155 @@
+"""Cached measurement ID sets of boundaries, reused for boundaries drawn inside a cached one."""
+
+import logging
+import os
+
+import numpy as np
+import shapely
+from django.core.cache import cache
+from django.db.models.expressions import RawSQL
+from dotenv import load_dotenv
+from measurement_analysis.boundaries import parse_boundary
+from measurement_analysis.single_flight import single_flight
+from measurements.models import MeasurementMetrics
+
+load_dotenv()
+cache_timeout = int(os.getenv("DJANGO_CACHE_TIMEOUT", 300))  # Default to 5 minutes
+# Filtering cached coordinates costs about 60 ns per measurement and caching them 24 bytes, so
+# a superset of 250,000 measurements is filtered in about 15 ms from a 6 MB entry. Boundaries
+# with more measurements only cache their ids and are never used as a superset.
+superset_max_size = int(os.getenv("DJANGO_BOUNDARY_SUPERSET_MAX_SIZE", 250000))
+
+logger = logging.getLogger("WATERWATCH")
+
+INDEX_KEY = "ids:boundary:index"
+INDEX_COUNTER_KEY = f"{INDEX_KEY}:next"
+# Number of cached boundaries considered as a superset of a new boundary
+MAX_INDEXED_BOUNDARIES = 32
+
+
+def _entry_key(boundary):
+    return f"ids:boundary:{boundary.key[:16]}"
+
+
+def _index_slot_key(slot):
+    return f"{INDEX_KEY}:{slot % MAX_INDEXED_BOUNDARIES}"
+
+
+def _indexed_boundaries():
+    """Get the boundaries whose cached entries keep the coordinates of their measurements."""
+    slot_keys = [_index_slot_key(slot) for slot in range(MAX_INDEXED_BOUNDARIES)]
+    return list(cache.get_many(slot_keys).values())
+
+
+def _query_entry(boundary, max_size=None):
+    """Query the ids and coordinates of the measurements covered by a boundary.
+
+    The coordinates are only kept when there are at most ``max_size`` measurements,
+    defaulting to ``DJANGO_BOUNDARY_SUPERSET_MAX_SIZE``; pass ``0`` to always keep them.
+    """
+    max_size = superset_max_size if max_size is None else max_size
+    rows = (
+        MeasurementMetrics.objects.filter(location__coveredby=boundary.geometry)
+        .annotate(x=RawSQL("ST_X(location)", []), y=RawSQL("ST_Y(location)", []))
+        .values_list("id", "x", "y")
+    )
+    # Coordinates are kept as columns, which are compact to cache and filtered all at once
+    columns = np.fromiter(rows, dtype=[("id", np.int64), ("x", np.float64), ("y", np.float64)])
+    if max_size and len(columns) > max_size:
+        return {"ids": columns["id"].copy()}
+    return {"ids": columns["id"].copy(), "x": columns["x"].copy(), "y": columns["y"].copy()}
+
+
+def _filter_entry(entry, boundary):
+    """Select the measurements of a cached superset entry that a boundary covers, without a query."""
+    xs, ys = entry["x"], entry["y"]
+    xmin, ymin, xmax, ymax = boundary.extent
+    # Cheap bounding box check over the coordinate columns first
+    candidates = np.flatnonzero((xs >= xmin) & (xs <= xmax) & (ys >= ymin) & (ys <= ymax))
+    geometry = shapely.from_wkb(bytes(boundary.geometry.wkb))
+    shapely.prepare(geometry)
+    # A point intersects a geometry exactly when it is covered by it, as with `location__coveredby`
+    selected = candidates[shapely.intersects_xy(geometry, xs[candidates], ys[candidates])]
+    return {"ids": entry["ids"][selected], "x": xs[selected], "y": ys[selected]}
+
+
+def _find_covering_entry(boundary, index):
+    """Find the smallest cached entry whose boundary covers the given boundary."""
+    if boundary.extent is None:
+        return None
+    xmin, ymin, xmax, ymax = boundary.extent
+    best = None
+    for geometry_hex in index:
+        candidate = parse_boundary(geometry_hex)
+        cxmin, cymin, cxmax, cymax = candidate.extent
+        if xmin < cxmin or ymin < cymin or xmax > cxmax or ymax > cymax:
+            continue
+        if not candidate.prepared.covers(boundary.geometry):
+            continue
+        entry = cache.get(_entry_key(candidate))
+        # The entry may have expired before the index did
+        if entry is not None and "x" in entry and (best is None or len(entry["ids"]) < len(best["ids"])):
+            best = entry
+    return best
+
+
+def _remember_boundary(boundary, entry, index):
+    """Add a boundary to the index of cached boundaries, replacing the oldest one.
+
+    The index is a ring of slots, and each boundary claims its own slot with an atomic
+    increment, so concurrent workers never overwrite each other's additions.
+    """
+    geometry_hex = boundary.geometry.hexewkb.decode()
+    # An empty boundary covers nothing, and an entry without coordinates cannot be filtered
+    if boundary.extent is None or "x" not in entry or geometry_hex in index:
+        return
+    cache.add(INDEX_COUNTER_KEY, 0, None)
+    cache.set(_index_slot_key(cache.incr(INDEX_COUNTER_KEY)), geometry_hex, cache_timeout)
+
+
+def get_boundary_ids(boundary_geometry):
+    """Get the ids of the measurements covered by a boundary.
+
+    Cached entries of boundaries with at most ``DJANGO_BOUNDARY_SUPERSET_MAX_SIZE``
+    measurements keep their coordinates as columns, and the cache keeps an index of these
+    boundaries. A boundary drawn inside one of them, e.g. a city after its country, is
+    therefore answered by filtering the cached coordinate columns in-process, with a
+    vectorised point-in-polygon test, instead of by a new spatial query.
+
+    Parameters
+    ----------
+    boundary_geometry : str
+        The boundary as sent by the client
+
+    Returns
+    -------
+    set[int]
+        Ids of the measurements inside or on the boundary
+
+    Raises
+    ------
+    ValueError
+        If the boundary cannot be parsed.
+    """
+    boundary = parse_boundary(str(boundary_geometry))
+    key = _entry_key(boundary)
+    entry = cache.get(key)
+    if entry is not None:
+        return set(np.asarray(entry["ids"]).tolist())
+
+    def compute():
+        index = _indexed_boundaries()
+        superset = _find_covering_entry(boundary, index)
+        if superset is not None:
+            computed = _filter_entry(superset, boundary)
+            logger.debug("Boundary %s answered from a cached enclosing boundary", boundary.key)
+        else:
+            computed = _query_entry(boundary)
+
+        cache.set(key, computed, cache_timeout)
+        _remember_boundary(boundary, computed, index)
+        return computed
+
+    # Concurrent requests for the same boundary wait for a single computation
+    entry = single_flight(key, lambda: cache.get(key), compute)
+    return set(np.asarray(entry["ids"]).tolist())
@@ -0,0 +1,122 @@
+"""Change log of measurements and the incremental change feed read from it."""
+
+from django.db import connection
+from django.db.models import Q, Subquery
+from django.db.models.expressions import RawSQL
+from measurements.models import Measurement
+
+from .models import MeasurementChange
+from .views import apply_location_annotations, build_base_queryset, prepare_measurement_data
+
+# Change IDs are assigned when a row is inserted, but the row only becomes visible when its
+# transaction commits, which can be much later. Only changes of transactions older than the
+# oldest one still running are read: those transactions have all ended, so no change of theirs
+# can appear later. A transaction also sees its own changes.
+_VISIBLE_CHANGES = Q(
+    transaction_id__lt=RawSQL("pg_snapshot_xmin(pg_current_snapshot())::text::bigint", []),
+) | Q(
+    transaction_id=RawSQL("pg_current_xact_id_if_assigned()::text::bigint", []),
+)
+
+
+def log_changes(measurement_ids, operation):
+    """Append changes of measurements to the change log.
+
+    Parameters
+    ----------
+    measurement_ids : Iterable[int]
+        IDs of the changed measurements
+    operation : str
+        One of the ``MeasurementChange`` operations
+    """
+    MeasurementChange.objects.bulk_create(
+        MeasurementChange(measurement_id=measurement_id, operation=operation) for measurement_id in measurement_ids
+    )
+
+
+def log_campaign_members(campaign_id):
+    """Log the measurements of a campaign as updated, e.g. because the campaign was renamed.
+
+    The members are selected and logged in one statement, without loading them.
+
+    Parameters
+    ----------
+    campaign_id : int
+        ID of the campaign
+    """
+    sql = f"""
+        INSERT INTO {MeasurementChange._meta.db_table} (measurement_id, operation, changed_at)
+        SELECT measurement_id, %s, now() FROM {Measurement.campaigns.through._meta.db_table}
+        WHERE campaign_id = %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [MeasurementChange.UPDATE, campaign_id])
+
+
+def _final_operations(changes):
+    """Reduce a sequence of changes to one operation per measurement.
+
+    A measurement inserted and then updated within the changes is still new to the reader, and a
+    deleted measurement is deleted whatever happened to it before.
+    """
+    operations = {}
+    for measurement_id, operation in changes:
+        if operation == MeasurementChange.DELETE or operations.get(measurement_id) != MeasurementChange.INSERT:
+            operations[measurement_id] = operation
+    return operations
+
+
+def get_changes(cursor, limit):
+    """Get the measurements inserted, updated or deleted after a cursor.
+
+    Each measurement is returned once, in its current state, however often it changed.
+
+    Parameters
+    ----------
+    cursor : int
+        ID of the last change already read (``next_cursor``), 0 to read from the start of the log
+    limit : int
+        Maximum number of changes to read
+
+    Returns
+    -------
+    dict
+        The inserted and updated measurements with their metrics and campaigns, the IDs of the
+        deleted measurements, the cursor to continue from and whether more changes are available
+
+    Raises
+    ------
+    ValueError
+        If the cursor is not the ID of a change in the log
+    """
+    queryset = MeasurementChange.objects.filter(_VISIBLE_CHANGES)
+    if cursor:
+        # Continue after the cursor in the (transaction, ID) order of the log. The change of the
+        # cursor itself is read as well, first, to tell an unknown cursor from no new changes.
+        position = Subquery(MeasurementChange.objects.filter(id=cursor).values("transaction_id"))
+        queryset = queryset.filter(Q(transaction_id__gt=position) | Q(transaction_id=position, id__gte=cursor))
+    rows = queryset.order_by("transaction_id", "id").values_list("id", "measurement_id", "operation")
+    changes = list(rows[: limit + 1 + bool(cursor)])
+    if cursor:
+        if not changes or changes[0][0] != cursor:
+            raise ValueError("Unknown cursor, read the change log again from cursor 0")
+        changes = changes[1:]
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    operations = _final_operations((measurement_id, operation) for _, measurement_id, operation in changes)
+    live_ids = [m_id for m_id, operation in operations.items() if operation != MeasurementChange.DELETE]
+    qs = apply_location_annotations(build_base_queryset(ordered=True)).filter(id__in=live_ids)
+
+    inserted, updated = [], []
+    # Measurements deleted after these changes are missing here, and reported with their deletion
+    for row in prepare_measurement_data(qs):
+        (inserted if operations[row["id"]] == MeasurementChange.INSERT else updated).append(row)
+
+    return {
+        "inserted": inserted,
+        "updated": updated,
+        "deleted": sorted(m_id for m_id, operation in operations.items() if operation == MeasurementChange.DELETE),
+        "next_cursor": changes[-1][0] if changes else cursor,
+        "has_more": has_more,
+    }
@@ -0,0 +1,76 @@
+"""Compare answering a boundary from a cached enclosing boundary with querying the database."""
+
+import pickle
+import time
+
+from django.core.management.base import BaseCommand
+from measurement_analysis.boundaries import parse_boundary
+
+from measurement_export.boundary_sets import _filter_entry, _query_entry, superset_max_size
+
+
+class Command(BaseCommand):
+    """Management command to benchmark the in-process filtering of cached boundary sets.
+
+    Queries the measurements of an enclosing boundary once, then times answering an inner
+    boundary with the spatial query and by filtering the enclosing boundary's coordinates
+    in-process. Use it on production-sized data to choose ``DJANGO_BOUNDARY_SUPERSET_MAX_SIZE``.
+
+    Usage:
+    python manage.py benchmark_boundary_sets --outer WKT --inner WKT [--repeat N]
+    """
+
+    help = "Compare the in-process filtering of a cached enclosing boundary with the spatial query"
+
+    def add_arguments(self, parser):
+        """Add command line arguments for the management command.
+
+        Parameters
+        ----------
+        parser : ArgumentParser
+            The argument parser to which the command line arguments will be added.
+        """
+        parser.add_argument("--outer", required=True, help="Enclosing boundary as WKT or GeoJSON")
+        parser.add_argument("--inner", required=True, help="Boundary inside the enclosing one")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per path; the fastest counts (default: 5)")
+
+    def handle(self, *_args, **options):
+        """Handle the command execution.
+
+        Parameters
+        ----------
+        *_args : tuple
+            Positional arguments passed to the command.
+        **options : dict
+            Keyword arguments passed to the command.
+        """
+        outer = parse_boundary(options["outer"])
+        inner = parse_boundary(options["inner"])
+        superset = _query_entry(outer, max_size=0)
+        # The cached entry is unpickled on every request, so that is part of the in-process cost
+        pickled = pickle.dumps(superset)
+
+        timings = {
+            "query": self._time(lambda: _query_entry(inner, max_size=0), options["repeat"]),
+            "in-process": self._time(lambda: _filter_entry(pickle.loads(pickled), inner), options["repeat"]),
+        }
+        size = len(superset["ids"])
+        self.stdout.write(
+            f"Enclosing boundary: {size:,} measurements, {len(pickled):,} bytes cached (limit: {superset_max_size:,})"
+        )
+        for name, seconds in timings.items():
+            self.stdout.write(f"{name:>10}: {seconds * 1000:>10.1f} ms")
+
+        if timings["in-process"] < timings["query"]:
+            self.stdout.write(self.style.SUCCESS("In-process filtering is faster for this boundary"))
+        else:
+            self.stdout.write(self.style.WARNING("The spatial query is faster for this boundary"))
+
+    def _time(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,201 @@
+"""Measure the throughput of the row transformation of the streaming exports."""
+
+import random
+import time
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import models
+from measurements.metrics import METRICS
+from measurements.models import Measurement
+
+from measurement_export.batches import DEFAULT_BATCH_SIZE
+from measurement_export.factories import get_strategy
+from measurement_export.views import MEASUREMENT_FIELDS, MeasurementRows, apply_location_annotations
+
+
+class _BaselineSource:
+    """Hands rows to the strategies like the export did before rows were assembled in one query.
+
+    Rows only held the measurement columns, and the metrics and campaigns were handed over as
+    ``extra_data``, built from a separate metric query and campaign query.
+    """
+
+    def __init__(self, measurement_rows, rows):
+        self.measurement_rows = measurement_rows
+        self.rows = rows
+
+    def extra_data(self):
+        metric_types = self.measurement_rows.metric_types
+        lookups = [lookup for metric in metric_types for lookup in metric.lookups]
+        start = len(MEASUREMENT_FIELDS)
+        metrics, campaigns = {}, {}
+        for row in self.rows:
+            # The metric query returned the id and the metric lookups of every measurement
+            metric_row = dict(zip(("id", *lookups), (row[0], *row[start:-1]), strict=True))
+            row_metrics = [metric for metric in (metric.pop_from_row(metric_row) for metric in metric_types) if metric]
+            if row_metrics:
+                metrics[row[0]] = row_metrics
+            for name in row[-1]:
+                campaigns.setdefault(row[0], []).append(name)
+        return {"metrics": metrics, "campaigns": campaigns}
+
+    def iterator(self, chunk_size=None):  # noqa: ARG002
+        count = len(MEASUREMENT_FIELDS)
+        return (dict(zip(MEASUREMENT_FIELDS, row[:count], strict=True)) for row in self.rows)
+
+
+class _RowSource:
+    """Hands rows to the per-row path of the strategies, like a values queryset."""
+
+    def __init__(self, measurement_rows, rows):
+        self.measurement_rows = measurement_rows
+        self.rows = rows
+
+    def iterator(self, chunk_size=None):  # noqa: ARG002
+        names = self.measurement_rows.names
+        # A values queryset builds a dictionary per fetched row
+        return (self.measurement_rows._assemble(dict(zip(names, row, strict=True))) for row in self.rows)
+
+
+class _BatchSource:
+    """Hands rows to the column batch path of the strategies."""
+
+    def __init__(self, measurement_rows, rows, batch_size):
+        self.measurement_rows = measurement_rows
+        self.rows = rows
+        self.batch_size = batch_size
+
+    def batches(self):
+        return self.measurement_rows.transform_batches(self.rows, self.batch_size)
+
+
+def _synthetic_value(field, rng, i):
+    """Build a value of a metric field, based on the type of the field."""
+    if field.primary_key:
+        return i
+    if isinstance(field, models.DecimalField):
+        return Decimal(rng.randint(1, 10 ** (field.max_digits - 1) - 1)).scaleb(-field.decimal_places)
+    if isinstance(field, models.DurationField):
+        return timedelta(seconds=rng.randint(0, 300))
+    if isinstance(field, models.FloatField):
+        return rng.uniform(0, 100)
+    if isinstance(field, models.BooleanField):
+        return rng.random() > 0.5
+    if isinstance(field, models.IntegerField):
+        return rng.randint(0, 1000)
+    return f"{field.name} {i % 10}"
+
+
+def _synthetic_rows(count):
+    """Build rows shaped like the fetched rows of ``MeasurementRows``, with all registered metrics."""
+    rng = random.Random(0)
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    metric_fields = [[metric.model._meta.get_field(column) for column in metric.columns] for metric in METRICS]
+    rows = []
+    for i in range(1, count + 1):
+        timestamp = start + timedelta(minutes=i)
+        measurement = (
+            i,
+            timestamp,
+            date(2025, timestamp.month, timestamp.day),
+            timestamp.time(),
+            rng.random() > 0.05,
+            rng.choice(["network", "well", "rooftop tank"]),
+            rng.randint(1, 100),
+            "Netherlands",
+            "Europe",
+            rng.uniform(-90, 90),
+            rng.uniform(-180, 180),
+        )
+        metrics = []
+        for fields in metric_fields:
+            # Some measurements do not have every metric, all of its columns are null then
+            present = rng.random() > 0.05
+            metrics.extend(_synthetic_value(field, rng, i) if present else None for field in fields)
+        rows.append((*measurement, *metrics, ["Summer campaign"] if i % 3 == 0 else []))
+    return rows
+
+
+class Command(BaseCommand):
+    """Management command to benchmark the row transformation of the streaming exports.
+
+    Streams synthetic measurements, shaped like the rows the database returns and with the
+    columns of every registered metric, through three paths of an export format, and reports
+    the rows per second of each:
+
+    - baseline: measurement rows completed from ``extra_data``, as before rows were assembled
+      in one query, including building ``extra_data`` from the metric and campaign rows
+    - per-row: rows assembled by ``MeasurementRows``
+    - batches: the column batches of ``MeasurementRows``
+
+    Only the transformation and writing is measured; no database is needed.
+
+    Usage:
+    python manage.py benchmark_export [--rows N] [--batch-size N] [--format csv|json|geojson] [--repeat N]
+    """
+
+    help = "Compare the rows per second of the baseline, per-row and column batch export paths"
+
+    def add_arguments(self, parser):
+        """Add command line arguments for the management command.
+
+        Parameters
+        ----------
+        parser : ArgumentParser
+            The argument parser to which the command line arguments will be added.
+        """
+        parser.add_argument("--rows", type=int, default=50000, help="Number of measurements (default: 50000)")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Rows per batch (default: {DEFAULT_BATCH_SIZE})",
+        )
+        parser.add_argument("--format", choices=["csv", "json", "geojson"], default="csv", help="Export format")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per path; the fastest counts (default: 3)")
+
+    def handle(self, *_args, **options):
+        """Handle the command execution.
+
+        Parameters
+        ----------
+        *_args : tuple
+            Positional arguments passed to the command.
+        **options : dict
+            Keyword arguments passed to the command.
+        """
+        count = options["rows"]
+        rows = _synthetic_rows(count)
+        # Building the queryset does not query the database
+        measurement_rows = MeasurementRows(apply_location_annotations(Measurement.objects.all()))
+        strategy = get_strategy(options["format"])
+
+        sources = {
+            "baseline": lambda: _BaselineSource(measurement_rows, rows),
+            "per-row": lambda: _RowSource(measurement_rows, rows),
+            "batches": lambda: _BatchSource(measurement_rows, rows, options["batch_size"]),
+        }
+        rates = {}
+        for name, source in sources.items():
+            best = min(self._time(strategy, source()) for _ in range(options["repeat"]))
+            rates[name] = count / best
+            self.stdout.write(f"{name:>8}: {rates[name]:>12,.0f} rows/s")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Speedup over baseline: {rates['per-row'] / rates['baseline']:.2f}x per-row, "
+                f"{rates['batches'] / rates['baseline']:.2f}x batches"
+            )
+        )
+
+    def _time(self, strategy, source):
+        started = time.perf_counter()
+        if isinstance(source, _BaselineSource):
+            response = strategy.export(source, extra_data=source.extra_data())
+        else:
+            response = strategy.export(source)
+        for _ in response.streaming_content:
+            pass
+        return time.perf_counter() - started
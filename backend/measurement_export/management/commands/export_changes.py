@@ -0,0 +1,80 @@
+"""Export the measurements changed since a cursor of the change log."""
+
+import json
+from contextlib import nullcontext
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from measurement_export.changes import get_changes
+
+DEFAULT_PAGE_SIZE = 5000
+
+
+class Command(BaseCommand):
+    """Management command to export the changes to measurements as newline-delimited JSON.
+
+    Writes one line per changed measurement, with its operation ("insert", "update" or
+    "delete") and for inserts and updates the measurement with its metrics and campaigns. The
+    change log is read in pages until it is exhausted, and the cursor to pass on the next run
+    is printed to stderr. Cursor 0 exports all measurements.
+
+    Usage:
+    python manage.py export_changes [--cursor ID] [--page-size N] [--output FILE]
+    """
+
+    help = "Export the measurements changed since a cursor as NDJSON"
+
+    def add_arguments(self, parser):
+        """Add command line arguments for the management command.
+
+        Parameters
+        ----------
+        parser : ArgumentParser
+            The argument parser to which the command line arguments will be added.
+        """
+        parser.add_argument("--cursor", type=int, default=0, help="Cursor printed by the previous run (default: 0)")
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=DEFAULT_PAGE_SIZE,
+            help=f"Number of changes read per query (default: {DEFAULT_PAGE_SIZE})",
+        )
+        parser.add_argument("--output", default=None, help="File to write to (default: stdout)")
+
+    def handle(self, *_args, **options):
+        """Handle the command execution.
+
+        Parameters
+        ----------
+        *_args : tuple
+            Positional arguments passed to the command.
+        **options : dict
+            Keyword arguments passed to the command.
+        """
+        cursor = options["cursor"]
+        exported = 0
+        with Path(options["output"]).open("w") if options["output"] else nullcontext(self.stdout) as out:
+            while True:
+                try:
+                    changes = get_changes(cursor, options["page_size"])
+                except ValueError as err:
+                    raise CommandError(err) from None
+                exported += self._write(out, changes)
+                cursor = changes["next_cursor"]
+                if not changes["has_more"]:
+                    break
+
+        # Keep stdout for the data
+        self.stderr.write(self.style.SUCCESS(f"Exported {exported} changed measurements. Next cursor: {cursor}"))
+
+    def _write(self, out, changes):
+        lines = [
+            *({"operation": "insert", "measurement": row} for row in changes["inserted"]),
+            *({"operation": "update", "measurement": row} for row in changes["updated"]),
+            *({"operation": "delete", "measurement": {"id": m_id}} for m_id in changes["deleted"]),
+        ]
+        for line in lines:
+            out.write(json.dumps(line, cls=DjangoJSONEncoder) + "\n")
+        return len(lines)
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-19 07:48
+
+from django.db import migrations, models
+
+# Log the existing measurements as inserted, so reading the change feed from cursor 0 is a full sync
+SEED_SQL = """
+INSERT INTO measurement_export_measurementchange (measurement_id, operation, changed_at)
+SELECT id, 'insert', now() FROM measurements_measurement ORDER BY id;
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('measurement_export', '0006_create_location_table'),
+        ('measurements', '0013_measurementmetrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeasurementChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('measurement_id', models.BigIntegerField()),
+                ('operation', models.CharField(choices=[('insert', 'Insert'), ('update', 'Update'), ('delete', 'Delete')], max_length=6)),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunSQL(SEED_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 08:12
+
+import measurement_export.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('measurement_export', '0007_measurementchange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='measurementchange',
+            name='transaction_id',
+            field=models.BigIntegerField(db_default=measurement_export.models.CurrentTransactionId()),
+        ),
+        migrations.AddIndex(
+            model_name='measurementchange',
+            index=models.Index(fields=['transaction_id', 'id'], name='measurement_transac_0be29a_idx'),
+        ),
+    ]
@@ -63,3 +63,44 @@ class Preset(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class CurrentTransactionId(models.Func):
+    """ID of the current database transaction, as a bigint."""
+
+    template = "pg_current_xact_id()::text::bigint"
+    output_field = models.BigIntegerField()
+
+
+class MeasurementChange(models.Model):
+    """Append-only log of changes to measurements, read by the change feed.
+
+    Rows are written by signal handlers whenever a measurement, one of its metrics or its
+    campaign membership changes, and are never updated. The feed reads changes ordered by the
+    ID of the transaction that logged them and then by their own ID, and the ID of the last
+    change read is its cursor. There is no foreign key, so changes outlive deleted measurements.
+
+    Attributes
+    ----------
+    measurement_id : int
+        ID of the changed measurement
+    operation : str
+        Whether the measurement was inserted, updated or deleted
+    changed_at : datetime
+        Datetime for when the change was logged
+    transaction_id : int
+        ID of the transaction that logged the change
+    """
+
+    INSERT = "insert"
+    UPDATE = "update"
+    DELETE = "delete"
+    OPERATION_CHOICES = [(INSERT, "Insert"), (UPDATE, "Update"), (DELETE, "Delete")]
+
+    measurement_id = models.BigIntegerField()
+    operation = models.CharField(max_length=6, choices=OPERATION_CHOICES)
+    changed_at = models.DateTimeField(auto_now_add=True)
+    transaction_id = models.BigIntegerField(db_default=CurrentTransactionId())
+
+    class Meta:
+        indexes = [models.Index(fields=["transaction_id", "id"])]
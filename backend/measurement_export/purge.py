@@ -0,0 +1,74 @@
+"""Purge the cached responses of changed datasets from a caching proxy in front of the API."""
+
+import logging
+import os
+import threading
+import urllib.error
+import urllib.request
+
+from django.db import transaction
+from dotenv import load_dotenv
+from measurement_analysis.conditional import CAMPAIGNS, LOCATIONS, PRESETS
+
+load_dotenv()
+# Base URLs of the caching proxies to send PURGE requests to, comma-separated; empty disables purging
+purge_urls = [url.strip().rstrip("/") for url in os.getenv("DJANGO_PROXY_PURGE_URLS", "").split(",") if url.strip()]
+PURGE_TIMEOUT = 5
+
+logger = logging.getLogger("WATERWATCH")
+
+# Endpoints built from the measurements of any month and from saved regions
+ANALYSIS_PATHS = ("/api/measurements/aggregated/", "/api/measurements/temperatures/")
+DATASET_PATHS = {
+    LOCATIONS: ("/api/locations/",),
+    PRESETS: ("/api/presets/",),
+    CAMPAIGNS: ("/api/campaigns/active/",),
+}
+
+
+def dataset_paths(datasets):
+    """Get the endpoints whose responses are built from the given datasets.
+
+    Parameters
+    ----------
+    datasets : Iterable[str]
+        Dataset names (see ``measurement_analysis.conditional``)
+
+    Returns
+    -------
+    list[str]
+        Endpoint paths, sorted
+    """
+    return sorted({path for dataset in datasets for path in DATASET_PATHS.get(dataset, ANALYSIS_PATHS)})
+
+
+def _send_purges(paths):
+    for base_url in purge_urls:
+        for path in paths:
+            # A trailing wildcard purges the responses for all query strings of the endpoint
+            request = urllib.request.Request(f"{base_url}{path}*", method="PURGE")
+            try:
+                urllib.request.urlopen(request, timeout=PURGE_TIMEOUT).close()
+            except urllib.error.HTTPError as err:
+                # Proxies answer 404 when nothing was cached for the path
+                if err.code != 404:
+                    logger.warning("Purging %s from %s failed with status %d", path, base_url, err.code)
+            except OSError as err:
+                logger.warning("Purging %s from %s failed: %s", path, base_url, err)
+
+
+def purge_datasets(datasets):
+    """Purge the responses built from changed datasets from the configured caching proxies.
+
+    The requests are sent from a background thread once the current transaction commits, so the
+    proxy cannot fetch and cache the old data again, and saving a model never waits on the proxy.
+
+    Parameters
+    ----------
+    datasets : Iterable[str]
+        Names of the changed datasets
+    """
+    if not purge_urls:
+        return
+    paths = dataset_paths(datasets)
+    transaction.on_commit(lambda: threading.Thread(target=_send_purges, args=(paths,), daemon=True).start())
@@ -2,9 +2,8 @@
 
 import logging
 from datetime import UTC
-from decimal import Decimal
 
-from measurements.metrics import METRIC_MODELS
+from measurements.metrics import get_metric_types
 from measurements.models import Measurement
 from rest_framework import serializers
 
@@ -177,9 +176,9 @@ class MeasurementSerializer(serializers.ModelSerializer):
     def get_metrics(self, obj):
         """Get all metrics associated with the measurement.
 
-        Iterates through all subclasses of the Metric model and collects
-        their data if they are related to the current measurement instance.
-        Optimized for performance with better type handling.
+        Iterates through the registered metric types and collects their data if
+        they are related to the current measurement instance, converted with the
+        converters the registry precomputed for their fields.
 
         Parameters
         ----------
@@ -193,40 +192,14 @@ class MeasurementSerializer(serializers.ModelSerializer):
             A list of dictionaries, each containing the metric type and its associated data.
             Each dictionary corresponds to a related Metric instance.
         """
-        metrics_data = []
         included_metrics = self.context.get("included_metrics", [])
 
-        for metric_cls in METRIC_MODELS:
-            attr = metric_cls.__name__.lower()
-            if attr not in included_metrics:
-                continue
-
+        metrics_data = []
+        for metric_type in get_metric_types(included_metrics):
             # Use getattr with None default to avoid attribute errors
-            inst = getattr(obj, attr, None)
-            if not inst:
-                continue
-
-            data = {"metric_type": attr}
-
-            # Get all field values efficiently
-            for field in metric_cls._meta.fields:
-                name = field.name
-                if name in ("id", "measurement"):
-                    continue
-
-                value = getattr(inst, name, None)
-
-                # Optimize type conversions
-                if value is None:
-                    data[name] = None
-                elif isinstance(value, Decimal):
-                    data[name] = float(value)
-                elif hasattr(value, "total_seconds"):  # Duration
-                    data[name] = value.total_seconds()
-                else:
-                    data[name] = value
-
-            metrics_data.append(data)
+            inst = getattr(obj, metric_type.relation, None)
+            if inst:
+                metrics_data.append(metric_type.serialize(inst))
 
         return metrics_data
 
@@ -1,15 +1,21 @@
-"""Signal handlers to clear the cache when certain models are saved or deleted."""
+"""Signal handlers to clear the cache and log changes when certain models are saved or deleted."""
 
 import logging
 
 from campaigns.models import Campaign
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
-from django.db.models.signals import post_delete, post_save
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from measurement_analysis.conditional import CAMPAIGNS, LOCATIONS, PRESETS, REGIONS, bump_versions, measurement_dataset
+from measurement_analysis.models import Region
+from measurement_analysis.regions import ALL_MONTHS
 from measurements.metrics import METRIC_MODELS
 from measurements.models import Measurement
 
-from measurement_export.models import Location
+from measurement_export.changes import log_campaign_members, log_changes
+from measurement_export.models import Location, MeasurementChange, Preset
+from measurement_export.purge import purge_datasets
 
 logger = logging.getLogger("WATERWATCH")
 User = get_user_model()
@@ -23,11 +29,17 @@ MODELS_TO_INVALIDATE_DEFAULT_CACHE.extend(METRIC_MODELS)
 # Models that should trigger clearing the location cache
 MODELS_TO_INVALIDATE_LOCATION_CACHE = [Location]
 
+# Versioned datasets of the models whose changes must change the ETags of the read endpoints
+MODEL_DATASETS = {Location: LOCATIONS, Preset: PRESETS, Campaign: CAMPAIGNS, Region: REGIONS}
+
 
 def clear_default_cache(sender, **_kwargs):  # noqa: ARG001
-    """Signal handler to clear the default cache.
+    """Signal handler to clear the default cache once the change commits.
 
     This function is connected to the post_save and post_delete signals of specified models.
+    Until the commit, other requests still read the old data; clearing the cache earlier would
+    let them cache results of the old data that outlive the commit. Callbacks run in the order
+    they were added, so the cache is cleared before the dataset versions are bumped.
 
     Parameters
     ----------
@@ -36,7 +48,7 @@ def clear_default_cache(sender, **_kwargs):  # noqa: ARG001
     **_kwargs : dict
         Additional keyword arguments provided by the signal.
     """
-    cache.clear()
+    transaction.on_commit(cache.clear)
 
 
 def clear_location_cache_signal(sender, **_kwargs):  # noqa: ARG001
@@ -57,6 +69,159 @@ def clear_location_cache_signal(sender, **_kwargs):  # noqa: ARG001
     clear_location_cache()
 
 
+def _datasets_changed(datasets):
+    """Change the ETags of the responses built from datasets and purge them from caching proxies.
+
+    Both wait for the transaction to commit, after ``clear_default_cache`` cleared the results
+    cached from the old data in the meantime, so the new ETag is never given to old data.
+    """
+    datasets = list(datasets)
+    transaction.on_commit(lambda: bump_versions(datasets))
+    purge_datasets(datasets)
+
+
+def bump_measurement_versions(sender, instance, created=True, **_kwargs):  # noqa: ARG001
+    """Signal handler to change the ETags of responses built from the month of a changed measurement.
+
+    A new or deleted measurement only affects its own month. An edited measurement may have
+    moved to another month, so all months are bumped.
+
+    Parameters
+    ----------
+    sender : Model
+        The model class that triggered the signal.
+    instance : Measurement
+        The measurement that was saved or deleted.
+    created : bool, optional
+        Whether the measurement was created; not passed for deletions.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    months = [instance.local_month] if created else ALL_MONTHS
+    _datasets_changed(measurement_dataset(month) for month in months)
+
+
+def bump_metric_versions(sender, instance, **_kwargs):  # noqa: ARG001
+    """Signal handler to change the ETags of responses built from the month of a changed metric.
+
+    Parameters
+    ----------
+    sender : Model
+        The model class that triggered the signal.
+    instance : Model
+        The metric that was saved or deleted.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    month = Measurement.objects.filter(id=instance.measurement_id).values_list("local_month", flat=True).first()
+    _datasets_changed(measurement_dataset(month) for month in ([month] if month is not None else ALL_MONTHS))
+
+
+def bump_model_versions(sender, **_kwargs):
+    """Signal handler to change the ETags of responses built from a changed table.
+
+    Parameters
+    ----------
+    sender : Model
+        The model class that triggered the signal.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    _datasets_changed([MODEL_DATASETS[sender]])
+
+
+def log_measurement_save(sender, instance, created, **_kwargs):  # noqa: ARG001
+    """Signal handler to log a saved measurement in the change log.
+
+    Parameters
+    ----------
+    sender : Model
+        The model class that triggered the signal.
+    instance : Measurement
+        The measurement that was saved.
+    created : bool
+        Whether the measurement was created.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    log_changes([instance.pk], MeasurementChange.INSERT if created else MeasurementChange.UPDATE)
+
+
+def log_measurement_delete(sender, instance, **_kwargs):  # noqa: ARG001
+    """Signal handler to log a deleted measurement in the change log.
+
+    Parameters
+    ----------
+    sender : Model
+        The model class that triggered the signal.
+    instance : Measurement
+        The measurement that was deleted.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    log_changes([instance.pk], MeasurementChange.DELETE)
+
+
+def log_metric_change(sender, instance, **_kwargs):  # noqa: ARG001
+    """Signal handler to log the measurement of a saved or deleted metric as updated.
+
+    Parameters
+    ----------
+    sender : Model
+        The model class that triggered the signal.
+    instance : Model
+        The metric that was saved or deleted.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    log_changes([instance.measurement_id], MeasurementChange.UPDATE)
+
+
+def log_membership_change(sender, instance, action, reverse, pk_set, **_kwargs):
+    """Signal handler to log measurements added to or removed from campaigns as updated.
+
+    Parameters
+    ----------
+    sender : Model
+        The through model of ``Measurement.campaigns``.
+    instance : Measurement | Campaign
+        The measurement, or for changes made from the campaign side the campaign.
+    action : str
+        The kind of change; the members of a cleared campaign are logged before they are removed.
+    reverse : bool
+        Whether the change was made from the campaign side.
+    pk_set : set[int] | None
+        IDs of the added or removed campaigns, or measurements if reversed.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    if action in ("post_add", "post_remove") and pk_set:
+        log_changes(pk_set if reverse else [instance.pk], MeasurementChange.UPDATE)
+    elif action == "pre_clear":
+        if reverse:
+            members = sender.objects.filter(campaign_id=instance.pk).values_list("measurement_id", flat=True)
+            log_changes(list(members), MeasurementChange.UPDATE)
+        else:
+            log_changes([instance.pk], MeasurementChange.UPDATE)
+
+
+def log_campaign_change(sender, instance, **_kwargs):  # noqa: ARG001
+    """Signal handler to log the members of a saved or deleted campaign as updated.
+
+    Connected to pre_delete, as the memberships are deleted with the campaign.
+
+    Parameters
+    ----------
+    sender : Model
+        The model class that triggered the signal.
+    instance : Campaign
+        The campaign that was saved or is being deleted.
+    **_kwargs : dict
+        Additional keyword arguments provided by the signal.
+    """
+    log_campaign_members(instance.pk)
+
+
 # Connect signals for default cache invalidation
 for model in MODELS_TO_INVALIDATE_DEFAULT_CACHE:
     post_save.connect(clear_default_cache, sender=model)
@@ -66,3 +231,23 @@ for model in MODELS_TO_INVALIDATE_DEFAULT_CACHE:
 for model in MODELS_TO_INVALIDATE_LOCATION_CACHE:
     post_save.connect(clear_location_cache_signal, sender=model)
     post_delete.connect(clear_location_cache_signal, sender=model)
+
+# Connect signals for the dataset versions behind conditional requests and proxy purges
+post_save.connect(bump_measurement_versions, sender=Measurement)
+post_delete.connect(bump_measurement_versions, sender=Measurement)
+for model in METRIC_MODELS:
+    post_save.connect(bump_metric_versions, sender=model)
+    post_delete.connect(bump_metric_versions, sender=model)
+for model in MODEL_DATASETS:
+    post_save.connect(bump_model_versions, sender=model)
+    post_delete.connect(bump_model_versions, sender=model)
+
+# Connect signals for the change log behind the change feed
+post_save.connect(log_measurement_save, sender=Measurement)
+post_delete.connect(log_measurement_delete, sender=Measurement)
+for model in METRIC_MODELS:
+    post_save.connect(log_metric_change, sender=model)
+    post_delete.connect(log_metric_change, sender=model)
+m2m_changed.connect(log_membership_change, sender=Measurement.campaigns.through)
+post_save.connect(log_campaign_change, sender=Campaign)
+pre_delete.connect(log_campaign_change, sender=Campaign)
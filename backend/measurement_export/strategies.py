@@ -1,6 +1,7 @@
 """Strategies for exporting measurements in different formats."""
 
 import csv
+import io
 import json
 import logging
 import xml.etree.ElementTree as ET
@@ -11,6 +12,8 @@ from django.db.models import Avg, Count, Max, Min
 from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from measurement_analysis.serializers import MeasurementAggregatedSerializer
 
+from .batches import encode_indented, encode_nested_columns
+
 logger = logging.getLogger("WATERWATCH")
 
 
@@ -39,7 +42,8 @@ class ExportStrategy(ABC):
         Parameters
         ----------
         data : QuerySet or iterable
-            The main data to be exported.
+            The main data to be exported. Rows that already hold 'metrics' and
+            'campaigns', e.g. from ``MeasurementRows``, are exported as they are.
         extra_data : dict, optional
             A dictionary containing supplementary data. For measurements, this is
             expected to hold a 'metrics' key with a dictionary mapping
@@ -90,6 +94,8 @@ class CsvExport(ExportStrategy):
         HttpResponse or StreamingHttpResponse
             The response containing the exported CSV data.
         """
+        if hasattr(data, "batches"):
+            return self._stream_csv_batches(data.batches())
         if hasattr(data, "iterator") and callable(data.iterator):
             return self._stream_csv(data, extra_data)
         return self._build_csv(list(data), extra_data)
@@ -118,8 +124,8 @@ class CsvExport(ExportStrategy):
         for row in rows:
             # Invert flag attribute
             self._invert_flag(row)
-            row["metrics"] = self._get_metrics_for_row(row.get("id"), metrics_dict)
-            row["campaigns"] = self._get_campaigns_for_row(row.get("id"), campaigns_dict)
+            row.setdefault("metrics", self._get_metrics_for_row(row.get("id"), metrics_dict))
+            row.setdefault("campaigns", self._get_campaigns_for_row(row.get("id"), campaigns_dict))
 
         # Write header and rows
         writer.writerow(rows[0].keys())
@@ -145,8 +151,8 @@ class CsvExport(ExportStrategy):
                 # Invert flag attribute
                 self._invert_flag(row)
                 # Add metrics to the row dictionary
-                row["metrics"] = self._get_metrics_for_row(row.get("id"), metrics_dict)
-                row["campaigns"] = self._get_campaigns_for_row(row.get("id"), campaigns_dict)
+                row.setdefault("metrics", self._get_metrics_for_row(row.get("id"), metrics_dict))
+                row.setdefault("campaigns", self._get_campaigns_for_row(row.get("id"), campaigns_dict))
 
                 if first:
                     yield writer.writerow(row.keys())
@@ -158,6 +164,24 @@ class CsvExport(ExportStrategy):
 
         return StreamingHttpResponse(rowgen(), content_type="text/csv")
 
+    def _stream_csv_batches(self, batches):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def batchgen():
+            first = True
+            for batch in batches:
+                if first:
+                    writer.writerow(batch.names)
+                    first = False
+                writer.writerows(zip(*encode_nested_columns(batch), strict=True))
+                # One chunk of the response per batch
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        return StreamingHttpResponse(batchgen(), content_type="text/csv")
+
 
 class JsonExport(ExportStrategy):
     """Exports measurement data in JSON format, supporting both streaming and non-streaming responses.
@@ -191,6 +215,8 @@ class JsonExport(ExportStrategy):
         HttpResponse or StreamingHttpResponse
             The response containing the exported JSON data.
         """
+        if hasattr(data, "batches"):
+            return self._stream_json_batches(data.batches())
         if hasattr(data, "iterator") and callable(data.iterator):
             return self._stream_json(data, extra_data)
 
@@ -201,8 +227,8 @@ class JsonExport(ExportStrategy):
         for obj in full_data:
             # Invert flag attribute
             self._invert_flag(obj)
-            obj["metrics"] = metrics_dict.get(obj.get("id"), [])
-            obj["campaigns"] = campaigns_dict.get(obj.get("id"), [])
+            obj.setdefault("metrics", metrics_dict.get(obj.get("id"), []))
+            obj.setdefault("campaigns", campaigns_dict.get(obj.get("id"), []))
         return JsonResponse(full_data, safe=False, json_dumps_params={"indent": 2})
 
     def _stream_json(self, qs, extra_data=None):
@@ -219,8 +245,8 @@ class JsonExport(ExportStrategy):
                 # Invert flag attribute
                 self._invert_flag(obj)
                 # Add metrics to the object before serializing
-                obj["metrics"] = metrics_dict.get(obj.get("id"), [])
-                obj["campaigns"] = campaigns_dict.get(obj.get("id"), [])
+                obj.setdefault("metrics", metrics_dict.get(obj.get("id"), []))
+                obj.setdefault("campaigns", campaigns_dict.get(obj.get("id"), []))
 
                 yield json.dumps(obj, indent=2, default=str)
                 first = False
@@ -228,6 +254,17 @@ class JsonExport(ExportStrategy):
 
         return StreamingHttpResponse(gen(), content_type="application/json")
 
+    def _stream_json_batches(self, batches):
+        def batchgen():
+            yield "[\n"
+            separator = ""
+            for batch in batches:
+                yield separator + ",\n".join(map(encode_indented, batch.records()))
+                separator = ",\n"
+            yield "\n]\n"
+
+        return StreamingHttpResponse(batchgen(), content_type="application/json")
+
 
 class GeoJsonExport(ExportStrategy):
     """Exports measurement data in GeoJSON format, supporting both streaming and non-streaming responses.
@@ -261,6 +298,8 @@ class GeoJsonExport(ExportStrategy):
         HttpResponse or StreamingHttpResponse
             The response containing the exported GeoJSON data.
         """
+        if hasattr(data, "batches"):
+            return self._stream_geojson_batches(data.batches())
         if hasattr(data, "iterator") and callable(data.iterator):
             return self._stream_geojson(data, extra_data)
 
@@ -270,8 +309,8 @@ class GeoJsonExport(ExportStrategy):
         for item in data:
             # Invert flag attribute
             self._invert_flag(item)
-            item["metrics"] = metrics_dict.get(item.get("id"), [])
-            item["campaigns"] = campaigns_dict.get(item.get("id"), [])
+            item.setdefault("metrics", metrics_dict.get(item.get("id"), []))
+            item.setdefault("campaigns", campaigns_dict.get(item.get("id"), []))
             features.append(self._feature(item))
 
         geojson = {"type": "FeatureCollection", "features": [f for f in features if f]}
@@ -306,8 +345,8 @@ class GeoJsonExport(ExportStrategy):
                 # Invert flag attribute
                 self._invert_flag(item)
                 # Add metrics before creating the feature
-                item["metrics"] = metrics_dict.get(item.get("id"), [])
-                item["campaigns"] = campaigns_dict.get(item.get("id"), [])
+                item.setdefault("metrics", metrics_dict.get(item.get("id"), []))
+                item.setdefault("campaigns", campaigns_dict.get(item.get("id"), []))
 
                 feature = self._feature(item)
                 if feature is None:
@@ -324,6 +363,21 @@ class GeoJsonExport(ExportStrategy):
         resp["Content-Disposition"] = 'attachment; filename="measurements.geojson"'
         return resp
 
+    def _stream_geojson_batches(self, batches):
+        def batchgen():
+            yield '{"type":"FeatureCollection","features":[\n'
+            separator = ""
+            for batch in batches:
+                features = [feature for feature in map(self._feature, batch.records()) if feature]
+                if features:
+                    yield separator + ",\n".join(map(encode_indented, features))
+                    separator = ",\n"
+            yield "\n]}\n"
+
+        resp = StreamingHttpResponse(batchgen(), content_type="application/geo+json")
+        resp["Content-Disposition"] = 'attachment; filename="measurements.geojson"'
+        return resp
+
 
 class XmlExport(ExportStrategy):
     """Exports measurement data in XML format, supporting both streaming and non-streaming responses.
@@ -367,8 +421,8 @@ class XmlExport(ExportStrategy):
             self._invert_flag(item)
             # inject metrics & campaigns lists
             item_id = item.get("id")
-            item["metrics"] = metrics_dict.get(item_id, [])
-            item["campaigns"] = campaigns_dict.get(item_id, [])
+            item.setdefault("metrics", metrics_dict.get(item_id, []))
+            item.setdefault("campaigns", campaigns_dict.get(item_id, []))
 
             meas_elem = ET.SubElement(root, "measurement")
             self._append_measurement(meas_elem, item)
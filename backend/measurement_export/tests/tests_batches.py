@@ -0,0 +1,153 @@
+"""Test cases for the column batch transformation of exports."""
+
+from datetime import UTC, date, datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from measurements.metrics import get_metric_types
+from measurements.models import Measurement
+
+from measurement_export.batches import batched, transform_batch
+from measurement_export.factories import get_strategy
+from measurement_export.views import MEASUREMENT_FIELDS, MeasurementRows, apply_location_annotations
+
+ROWS = [
+    (
+        1,
+        datetime(2025, 5, 1, 12, tzinfo=UTC),
+        date(2025, 5, 1),
+        time(14),
+        True,
+        "network",
+        3,
+        "Netherlands",
+        "Europe",
+        52.0,
+        4.5,
+        10,
+        "Probe",
+        Decimal("18.5"),
+        timedelta(seconds=30),
+        ["Campaign"],
+    ),
+    # A measurement without a temperature or location
+    (
+        2,
+        datetime(2025, 5, 2, tzinfo=UTC),
+        date(2025, 5, 2),
+        time(2),
+        False,
+        "well",
+        *[None] * 9,
+        [],
+    ),
+    (
+        3,
+        datetime(2025, 5, 3, tzinfo=UTC),
+        date(2025, 5, 3),
+        time(3),
+        True,
+        "well",
+        4,
+        "Belgium",
+        "Europe",
+        50.8,
+        4.4,
+        11,
+        "",
+        Decimal("41.0"),
+        timedelta(),
+        ["A", "B"],
+    ),
+]
+
+
+class _RowSource:
+    """Hands ``ROWS`` to the per-row path of the strategies, like a values queryset."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def iterator(self, chunk_size=None):  # noqa: ARG002
+        return (self.rows._assemble(dict(zip(self.rows.names, row, strict=True))) for row in ROWS)
+
+
+class _BatchSource:
+    """Hands ``ROWS`` to the column batch path of the strategies."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def batches(self):
+        return self.rows.transform_batches(ROWS, batch_size=2)
+
+
+class ColumnBatchTests(SimpleTestCase):
+    """Test the batch path produces the same exports as the per-row path."""
+
+    def setUp(self):
+        """Build the row source; building its queryset does not query the database."""
+        self.rows = MeasurementRows(apply_location_annotations(Measurement.objects.all()))
+
+    def test_batched(self):
+        """Test rows are split into batches of at most the batch size."""
+        assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+    def test_transform_batch(self):
+        """Test the flag is inverted and metrics and campaigns are built per row."""
+        batch = transform_batch(ROWS[:2], MEASUREMENT_FIELDS, get_metric_types())
+
+        assert len(batch) == 2
+        assert batch.names == (*MEASUREMENT_FIELDS, "metrics", "campaigns")
+        records = batch.records()
+        assert [record["flag"] for record in records] == [False, True]
+        assert records[0]["metrics"] == [
+            {
+                "id": 10,
+                "sensor": "Probe",
+                "value": Decimal("18.5"),
+                "time_waited": timedelta(seconds=30),
+                "metric_type": "temperature",
+            }
+        ]
+        assert records[1]["metrics"] == []
+        assert [record["campaigns"] for record in records] == [["Campaign"], []]
+
+    def test_exports_match_per_row_path(self):
+        """Test every format writes the same bytes from batches as from single rows."""
+        for fmt in ("csv", "json", "geojson"):
+            with self.subTest(fmt=fmt):
+                strategy = get_strategy(fmt)
+                per_row = b"".join(strategy.export(_RowSource(self.rows)).streaming_content)
+                batches = b"".join(strategy.export(_BatchSource(self.rows)).streaming_content)
+                assert batches == per_row
+
+    def test_benchmark_command(self):
+        """Test the benchmark command reports the rows per second of the baseline and both paths."""
+        out = StringIO()
+        call_command("benchmark_export", "--rows", "100", "--repeat", "1", stdout=out)
+
+        assert out.getvalue().count("rows/s") == 3
+        assert "Speedup over baseline" in out.getvalue()
+
+    def test_benchmark_paths_export_the_same_data(self):
+        """Test the synthetic rows of all registered metrics export the same through every path."""
+        from measurement_export.management.commands.benchmark_export import (
+            _BaselineSource,
+            _BatchSource,
+            _RowSource,
+            _synthetic_rows,
+        )
+
+        rows = _synthetic_rows(50)
+        measurement_rows = MeasurementRows(apply_location_annotations(Measurement.objects.all()))
+        strategy = get_strategy("json")
+        baseline = _BaselineSource(measurement_rows, rows)
+        outputs = [
+            b"".join(strategy.export(baseline, extra_data=baseline.extra_data()).streaming_content),
+            b"".join(strategy.export(_RowSource(measurement_rows, rows)).streaming_content),
+            b"".join(strategy.export(_BatchSource(measurement_rows, rows, 20)).streaming_content),
+        ]
+        assert outputs[0] == outputs[1] == outputs[2]
@@ -0,0 +1,133 @@
+"""Test cases for the cached measurement ID sets of boundaries."""
+
+from unittest.mock import patch
+
+import numpy as np
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from measurement_analysis.boundaries import parse_boundary
+from measurements.models import Measurement
+
+from measurement_export.boundary_sets import _filter_entry, _indexed_boundaries, get_boundary_ids
+
+COUNTRY = "POLYGON((0 0, 10 0, 10 10, 0 10, 0 0))"
+CITY = "POLYGON((1 1, 3 1, 3 3, 1 3, 1 1))"
+
+
+class BoundarySetTests(TestCase):
+    """Test answering boundaries from cached enclosing boundaries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for the test cases."""
+        cls.ids = {}
+        for name, location in (
+            ("inside", "POINT(2 2)"),
+            ("edge", "POINT(3 2)"),
+            ("country", "POINT(5 5)"),
+            ("outside", "POINT(20 20)"),
+        ):
+            measurement = Measurement.objects.create(location=location, local_date="2025-04-03", local_time="12:00")
+            cls.ids[name] = measurement.id
+
+    def setUp(self):
+        """Clear the cache before each test."""
+        cache.clear()
+
+    def test_boundary_ids_are_queried_and_cached(self):
+        """Test the first request queries the database and the second is served from the cache."""
+        with self.assertNumQueries(1):
+            ids = get_boundary_ids(COUNTRY)
+        with self.assertNumQueries(0):
+            assert get_boundary_ids(COUNTRY) == ids
+
+        assert ids == {self.ids["inside"], self.ids["edge"], self.ids["country"]}
+        assert len(_indexed_boundaries()) == 1
+
+    def test_contained_boundary_uses_cached_superset(self):
+        """Test a boundary inside a cached one is answered without a query, including its edge."""
+        get_boundary_ids(COUNTRY)
+
+        with self.assertNumQueries(0):
+            ids = get_boundary_ids(CITY)
+
+        assert ids == {self.ids["inside"], self.ids["edge"]}
+
+    def test_overlapping_boundary_is_queried(self):
+        """Test a boundary only partly inside a cached one still queries the database."""
+        get_boundary_ids(CITY)
+
+        with self.assertNumQueries(1):
+            ids = get_boundary_ids(COUNTRY)
+
+        assert self.ids["country"] in ids
+
+    @patch("measurement_export.boundary_sets.superset_max_size", 2)
+    def test_large_boundary_is_not_a_superset(self):
+        """Test a boundary with more measurements than the limit only caches its ids."""
+        get_boundary_ids(COUNTRY)
+        assert not _indexed_boundaries()
+
+        with self.assertNumQueries(1):
+            ids = get_boundary_ids(CITY)
+
+        assert ids == {self.ids["inside"], self.ids["edge"]}
+        assert len(_indexed_boundaries()) == 1
+
+    def test_index_keeps_every_boundary(self):
+        """Test boundaries added to the index do not replace each other."""
+        get_boundary_ids(COUNTRY)
+        get_boundary_ids("POLYGON((4 4, 6 4, 6 6, 4 6, 4 4))")
+        get_boundary_ids("POLYGON((15 15, 25 15, 25 25, 15 25, 15 15))")
+
+        assert len(_indexed_boundaries()) == 3
+
+    def test_empty_boundary_is_cached(self):
+        """Test a boundary without measurements is not queried again."""
+        empty = "POLYGON((30 30, 31 30, 31 31, 30 31, 30 30))"
+        assert get_boundary_ids(empty) == set()
+
+        with self.assertNumQueries(0):
+            assert get_boundary_ids(empty) == set()
+
+    def test_empty_and_collection_boundaries(self):
+        """Test empty boundaries match nothing and collections are matched by their members."""
+        assert get_boundary_ids("POLYGON EMPTY") == set()
+        assert get_boundary_ids("GEOMETRYCOLLECTION EMPTY") == set()
+        assert not _indexed_boundaries()
+
+        collection = f"GEOMETRYCOLLECTION({CITY}, POINT(20 20))"
+        assert get_boundary_ids(collection) == {self.ids["inside"], self.ids["edge"], self.ids["outside"]}
+
+    def test_invalid_boundary(self):
+        """Test an invalid boundary raises a ValueError."""
+        with self.assertRaises(ValueError):
+            get_boundary_ids("XYZ")
+
+
+class FilterEntryTests(SimpleTestCase):
+    """Test the in-process filtering of the cached coordinates of a superset."""
+
+    def test_matches_covered_by(self):
+        """Test the vectorised filter selects the same points as a covered-by check, including edges and holes."""
+        rng = np.random.default_rng(0)
+        xs = np.concatenate([rng.uniform(-1, 11, 2000), [1, 3, 2, 5, 4, 0.5]])
+        ys = np.concatenate([rng.uniform(-1, 11, 2000), [2, 3, 1, 5, 4.5, 0.5]])
+        entry = {"ids": np.arange(len(xs)), "x": xs, "y": ys}
+
+        for wkt in (
+            CITY,
+            "POLYGON((0 0, 10 0, 10 10, 0 10, 0 0), (4 4, 6 4, 6 6, 4 6, 4 4))",
+            f"GEOMETRYCOLLECTION({CITY}, POINT(0.5 0.5))",
+        ):
+            with self.subTest(wkt=wkt):
+                boundary = parse_boundary(wkt)
+                expected = [
+                    i for i, (x, y) in enumerate(zip(xs, ys, strict=True)) if boundary.prepared.covers(Point(x, y))
+                ]
+
+                filtered = _filter_entry(entry, boundary)
+
+                assert filtered["ids"].tolist() == expected
+                assert filtered["x"].tolist() == xs[expected].tolist()
@@ -0,0 +1,155 @@
+"""Test cases for the measurement change log and change feed."""
+
+import json
+from datetime import UTC, datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from campaigns.backfill import run_backfill
+from campaigns.models import Campaign
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.core.management import call_command
+from django.db.models import Q
+from django.test import TestCase
+from measurements.models import Measurement, Temperature
+from rest_framework.test import APIClient
+
+from measurement_export.changes import get_changes
+from measurement_export.models import CurrentTransactionId, MeasurementChange
+
+
+def _create_measurement(value=18.0):
+    measurement = Measurement.objects.create(location="POINT(0.5 0.5)", local_date="2025-05-15", local_time="12:00")
+    Temperature.objects.create(
+        measurement=measurement, value=value, sensor="Test Sensor", time_waited=timedelta(seconds=1)
+    )
+    return measurement
+
+
+def _latest_cursor():
+    return MeasurementChange.objects.order_by("id").values_list("id", flat=True).last()
+
+
+class ChangeFeedTests(TestCase):
+    """Test logging changes to measurements and reading them back since a cursor."""
+
+    def test_inserted_updated_and_deleted(self):
+        """Test each kind of change is reported once, with the current state of the measurement."""
+        measurement = _create_measurement()
+        other = _create_measurement()
+
+        changes = get_changes(0, 100)
+        assert [row["id"] for row in changes["inserted"]] == [measurement.id, other.id]
+        assert changes["inserted"][0]["metrics"][0]["value"] == 18.0
+        assert changes["updated"] == changes["deleted"] == []
+        assert not changes["has_more"]
+
+        measurement.temperature.value = 21.0
+        measurement.temperature.save()
+        other.delete()
+
+        changes = get_changes(changes["next_cursor"], 100)
+        assert [row["id"] for row in changes["updated"]] == [measurement.id]
+        assert changes["updated"][0]["metrics"][0]["value"] == 21.0
+        assert changes["deleted"] == [other.id]
+        assert changes["inserted"] == []
+
+    def test_nothing_changed(self):
+        """Test reading past the last change returns nothing and keeps the cursor."""
+        _create_measurement()
+        cursor = _latest_cursor()
+
+        with self.assertNumQueries(1):
+            changes = get_changes(cursor, 100)
+        assert changes == {"inserted": [], "updated": [], "deleted": [], "next_cursor": cursor, "has_more": False}
+
+    def test_unknown_cursor(self):
+        """Test a cursor that is not a change of the log is rejected instead of reading nothing."""
+        _create_measurement()
+        cursor = _latest_cursor()
+
+        with self.assertRaises(ValueError):
+            get_changes(cursor + 1000, 100)
+        MeasurementChange.objects.filter(id=cursor).delete()
+        with self.assertRaises(ValueError):
+            get_changes(cursor, 100)
+
+    def test_pages(self):
+        """Test the log is read in pages of at most the limit."""
+        first = _create_measurement()
+        second = _create_measurement()
+
+        # Inserting a measurement and its temperature logs two changes
+        page = get_changes(0, 2)
+        assert [row["id"] for row in page["inserted"]] == [first.id]
+        assert page["has_more"]
+
+        page = get_changes(page["next_cursor"], 2)
+        assert [row["id"] for row in page["inserted"]] == [second.id]
+        assert not page["has_more"]
+
+    def test_changes_of_running_transactions_are_not_read(self):
+        """Test changes are only read once every transaction that may have logged earlier changes ended."""
+        _create_measurement()
+
+        # Changes of this test's own transaction are visible to it, unlike those of other transactions
+        with patch("measurement_export.changes._VISIBLE_CHANGES", Q(transaction_id__lt=CurrentTransactionId())):
+            assert get_changes(0, 100)["inserted"] == []
+        assert get_changes(0, 100)["inserted"] != []
+
+    def test_campaign_membership_changes(self):
+        """Test joining, renaming and backfilling campaigns logs their measurements as updated."""
+        measurement = _create_measurement()
+        campaign = Campaign.objects.create(
+            name="Campaign",
+            description="Test campaign",
+            start_time=datetime(2025, 5, 14, tzinfo=UTC),
+            end_time=datetime(2025, 5, 16, tzinfo=UTC),
+            region=MultiPolygon(Polygon(((0, 0), (1, 0), (1, 1), (0, 1), (0, 0)))),
+        )
+
+        cursor = _latest_cursor()
+        measurement.campaigns.add(campaign)
+        assert [row["campaigns"] for row in get_changes(cursor, 100)["updated"]] == [["Campaign"]]
+
+        cursor = _latest_cursor()
+        campaign.name = "Renamed"
+        campaign.save()
+        assert [row["campaigns"] for row in get_changes(cursor, 100)["updated"]] == [["Renamed"]]
+
+        measurement.campaigns.clear()
+        cursor = _latest_cursor()
+        run_backfill(campaign.id)
+        assert [row["id"] for row in get_changes(cursor, 100)["updated"]] == [measurement.id]
+
+    def test_endpoint(self):
+        """Test the change feed endpoint is restricted to users who may export."""
+        measurement = _create_measurement()
+        client = APIClient()
+
+        assert client.get("/api/measurements/changes/").status_code == 403
+
+        client.force_authenticate(get_user_model().objects.create_user("s", "s@x", "p", is_staff=True))
+        response = client.get("/api/measurements/changes/?cursor=0")
+        assert response.status_code == 200
+        assert [row["id"] for row in response.json()["inserted"]] == [measurement.id]
+
+        response = client.get(f"/api/measurements/changes/?cursor={_latest_cursor() + 1000}")
+        assert response.status_code == 400
+        assert client.get("/api/measurements/changes/?cursor=x").status_code == 400
+
+    def test_export_changes_command(self):
+        """Test the management command writes one NDJSON line per changed measurement and page."""
+        measurement = _create_measurement()
+        out, err = StringIO(), StringIO()
+
+        call_command("export_changes", "--page-size", "1", stdout=out, stderr=err)
+
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        # The measurement and its temperature were logged as separate changes, read in separate pages
+        assert [(line["operation"], line["measurement"]["id"]) for line in lines] == [
+            ("insert", measurement.id),
+            ("update", measurement.id),
+        ]
+        assert f"Next cursor: {_latest_cursor()}" in err.getvalue()
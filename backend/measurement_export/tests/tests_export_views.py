@@ -1,5 +1,8 @@
+import csv
+import io
 import json
 from datetime import date, time, timedelta
+from decimal import Decimal
 
 from campaigns.models import Campaign
 from django.contrib.auth import get_user_model
@@ -8,15 +11,17 @@ from django.contrib.gis.geos import Point, Polygon
 from django.core.cache import cache
 from django.db import connection
 from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from measurements.models import Measurement, Temperature
 from rest_framework.test import APIClient
 
+from measurement_export.factories import get_strategy
 from measurement_export.views import (
+    MeasurementRows,
+    _build_month_set,
     apply_location_annotations,
     build_base_queryset,
-    fetch_campaigns_for_measurements,
-    fetch_metrics_for_measurements,
     prepare_measurement_data,
 )
 
@@ -88,7 +93,8 @@ class EndpointTests(TestCase):
         self.client.force_authenticate(user=self.staff)
         r = self.client.get("/api/measurements/", user=self.staff)
         assert r.status_code == 200
-        arr = r.json()
+        assert r.json()["next_cursor"] is None
+        arr = r.json()["results"]
         assert {m["id"] for m in arr} == {self.inside.id, self.outside.id}
         for field in (
             "id",
@@ -107,6 +113,25 @@ class EndpointTests(TestCase):
         ):
             assert field in arr[0]
 
+    def test_get_all_measurements_pages(self):
+        self.client.force_authenticate(user=self.staff)
+        first = self.client.get("/api/measurements/?page_size=1").json()
+        assert [m["id"] for m in first["results"]] == [self.inside.id]
+        assert first["next_cursor"] == self.inside.id
+
+        second = self.client.get(f"/api/measurements/?page_size=1&cursor={first['next_cursor']}").json()
+        assert [m["id"] for m in second["results"]] == [self.outside.id]
+        assert second["results"][0]["metrics"][0]["value"] == "22.2"
+        assert second["next_cursor"] is None
+
+    def test_get_all_measurements_ndjson(self):
+        self.client.force_authenticate(user=self.staff)
+        r = self.client.get("/api/measurements/?stream=true&page_size=1")
+        assert r["Content-Type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in b"".join(r.streaming_content).decode().splitlines()]
+        assert [m["id"] for m in rows] == [self.inside.id, self.outside.id]
+        assert rows[0]["metrics"][0]["value"] == "11.1"
+
     def test_search_not_authorized(self):
         r = self.client.post("/api/measurements/search/", "", content_type="application/json")
         assert r.status_code == 403
@@ -137,7 +162,7 @@ class EndpointTests(TestCase):
 
 
 class HelperFunctionTests(TestCase):
-    """Test build_base_queryset, annotations, fetchers, and preparer."""
+    """Test build_base_queryset, annotations, filter sets, and preparer."""
 
     @classmethod
     def setUpTestData(cls):
@@ -211,18 +236,12 @@ class HelperFunctionTests(TestCase):
         for fld in ("country", "continent", "latitude", "longitude"):
             assert hasattr(m, fld)
 
-    def test_fetch_metrics(self):
-        ids = [self.m1.id, self.m2.id]
-        allm = fetch_metrics_for_measurements(ids)
-        assert set(allm.keys()) == set(ids)
-        # filtered out
-        empty = fetch_metrics_for_measurements(ids, included_metrics=[])
-        assert empty == {}
-
-    def test_fetch_campaigns(self):
-        camps = fetch_campaigns_for_measurements([self.m1.id, self.m2.id])
-        assert camps[self.m1.id] == ["C1"]
-        assert set(camps[self.m2.id]) == {"C1", "C2"}
+    def test_month_set_reads_measurement_metrics(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            assert _build_month_set({"month": "1"}) == [{self.m1.id}]
+        # measurement_metrics is partitioned by local_month
+        assert any('FROM "measurement_metrics"' in query["sql"] for query in queries.captured_queries)
 
     def test_prepare_measurement_data(self):
         qs = apply_location_annotations(build_base_queryset().filter(id__in=[self.m1.id, self.m2.id]))
@@ -232,6 +251,35 @@ class HelperFunctionTests(TestCase):
             assert "metrics" in rec
             assert "campaigns" in rec
 
+    def test_prepare_measurement_data_single_query(self):
+        qs = apply_location_annotations(build_base_queryset(ordered=True).filter(id__in=[self.m1.id, self.m2.id]))
+        with self.assertNumQueries(1):
+            data = prepare_measurement_data(qs)
+
+        assert [rec["campaigns"] for rec in data] == [["C1"], ["C1", "C2"]]
+        assert data[0]["metrics"] == [
+            {
+                "id": self.m1.temperature.id,
+                "sensor": "",
+                "value": Decimal("1.1"),
+                "time_waited": timedelta(),
+                "metric_type": "temperature",
+            }
+        ]
+        assert data[0]["country"] == "Zed"
+
+        # Excluded metrics are not selected
+        assert [rec["metrics"] for rec in prepare_measurement_data(qs, included_metrics=[])] == [[], []]
+
+    def test_export_single_query(self):
+        qs = apply_location_annotations(build_base_queryset(ordered=True))
+        with self.assertNumQueries(1):
+            response = get_strategy("csv").export(MeasurementRows(qs))
+            rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+
+        assert [json.loads(row["campaigns"]) for row in rows] == [["C1"], ["C1", "C2"]]
+        assert json.loads(rows[1]["metrics"])[0]["value"] == "2.2"
+
 
 class ErrorHandlingTests(TransactionTestCase):
     """Ensure invalid filters don't 500 out /search/."""
@@ -0,0 +1,54 @@
+"""Test cases for purging changed endpoints from a caching proxy."""
+
+import urllib.error
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+
+from measurement_export.models import Preset
+from measurement_export.purge import ANALYSIS_PATHS, _send_purges, dataset_paths
+
+
+class ProxyPurgeTests(TestCase):
+    """Test the purge hook fired from the invalidation signals."""
+
+    def test_dataset_paths(self):
+        """Test datasets map to the endpoints built from them."""
+        assert dataset_paths(["presets"]) == ["/api/presets/"]
+        assert dataset_paths(["measurements:4", "regions"]) == sorted(ANALYSIS_PATHS)
+
+    @patch("measurement_export.purge.purge_urls", [])
+    @patch("measurement_export.purge.threading")
+    def test_disabled_without_urls(self, mock_threading):
+        """Test nothing is purged when no proxy is configured."""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Preset.objects.create(name="Preset")
+
+        # Only the ETag versions are bumped
+        assert len(callbacks) == 1
+        mock_threading.Thread.assert_not_called()
+
+    @patch("measurement_export.purge.purge_urls", ["http://proxy"])
+    @patch("measurement_export.purge.threading")
+    def test_signal_purges_after_commit(self, mock_threading):
+        """Test a change purges the affected endpoints once its transaction commits."""
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Preset.objects.create(name="Preset")
+            mock_threading.Thread.assert_not_called()
+
+        for callback in callbacks:
+            callback()
+        assert mock_threading.Thread.call_args.kwargs["args"] == (["/api/presets/"],)
+
+    @patch("measurement_export.purge.purge_urls", ["http://proxy"])
+    @patch("measurement_export.purge.urllib.request.urlopen")
+    def test_send_purges(self, mock_urlopen):
+        """Test a PURGE request is sent per endpoint and a missing cache entry is not an error."""
+        mock_urlopen.side_effect = [MagicMock(), urllib.error.HTTPError("url", 404, "Not Found", {}, None)]
+
+        with self.assertNoLogs("WATERWATCH", level="WARNING"):
+            _send_purges(["/api/locations/", "/api/presets/"])
+
+        request = mock_urlopen.call_args_list[0].args[0]
+        assert request.full_url == "http://proxy/api/locations/*"
+        assert request.get_method() == "PURGE"
@@ -8,6 +8,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.gis.geos import Point
 from django.test import TestCase
 from django.utils import timezone
+from measurements.metrics import MetricType
 from measurements.models import Measurement, Temperature
 
 from measurement_export.serializers import MeasurementSerializer
@@ -172,8 +173,8 @@ class TestMeasurementSerializer(TestCase):
 
     def test_get_metrics_with_specific_included_metric(self):
         """Test get_metrics serializes data for an included metric."""
-        # Mock METRIC_MODELS to ensure test isolation
-        with patch("measurement_export.serializers.METRIC_MODELS", [Temperature]):
+        # Mock the metric registry to ensure test isolation
+        with patch("measurements.metrics.METRICS", (MetricType(Temperature),)):
             context = {"included_metrics": ["temperature"]}
             serializer = MeasurementSerializer(instance=self.measurement1, context=context)
             metrics_data = serializer.data["metrics"]
@@ -190,7 +191,7 @@ class TestMeasurementSerializer(TestCase):
 
     def test_get_metrics_handles_measurement_with_no_metrics(self):
         """Test get_metrics returns empty list for a measurement with no metrics attached."""
-        with patch("measurement_export.serializers.METRIC_MODELS", [Temperature]):
+        with patch("measurements.metrics.METRICS", (MetricType(Temperature),)):
             context = {"included_metrics": ["temperature"]}
             # self.measurement2 has no temperature object attached
             serializer = MeasurementSerializer(instance=self.measurement2, context=context)
@@ -189,7 +189,7 @@ def filter_by_water_sources(qs, data):
     return qs
 
 
-def filter_measurement_by_temperature(qs, data):
+def filter_measurement_by_temperature(qs, data, value_field="temperature__value"):
     """Filter the queryset by temperature range.
 
     This function filters measurements based on a temperature range provided in the request.
@@ -200,6 +200,8 @@ def filter_measurement_by_temperature(qs, data):
         The initial queryset of measurements to filter.
     data : dict
         The request data containing filter parameters.
+    value_field : str, optional
+        Lookup path of the temperature value, e.g. ``temperature_value`` for MeasurementMetrics.
 
     Returns
     -------
@@ -211,9 +213,9 @@ def filter_measurement_by_temperature(qs, data):
 
     try:
         if temp_from_str:
-            qs = qs.filter(temperature__value__gte=float(temp_from_str))
+            qs = qs.filter(**{f"{value_field}__gte": float(temp_from_str)})
         if temp_to_str:
-            qs = qs.filter(temperature__value__lte=float(temp_to_str))
+            qs = qs.filter(**{f"{value_field}__lte": float(temp_to_str)})
     except ValueError as e:
         logger.warning("Invalid temperature value: %s. From: '%s', To: '%s'", e, temp_from_str, temp_to_str)
     return qs
@@ -5,20 +5,24 @@ import json
 import logging
 import os
 
-from campaigns.models import Campaign
 from django.contrib.gis.geos.error import GEOSException
+from django.contrib.postgres.expressions import ArraySubquery
 from django.core.cache import cache
 from django.db import models
-from django.db.models import Avg, Count
+from django.db.models import Avg, Count, OuterRef
 from django.db.models.expressions import RawSQL
 from django.http import HttpResponse, JsonResponse
 from django.utils import timezone
 from dotenv import load_dotenv
-from measurement_analysis.views import apply_boundary_filter, apply_month_filter, parse_month_parameter
-from measurements.metrics import METRIC_MODELS
-from measurements.models import Measurement
+from measurement_analysis.conditional import LOCATIONS, PRESETS, conditional_view, get_versions
+from measurement_analysis.single_flight import single_flight
+from measurement_analysis.views import apply_month_filter, parse_month_parameter
+from measurements.metrics import METRICS, get_metric_types
+from measurements.models import Measurement, MeasurementMetrics
 from rest_framework.decorators import api_view
 
+from .batches import DEFAULT_BATCH_SIZE, batched, transform_batch
+from .boundary_sets import get_boundary_ids
 from .factories import get_strategy
 from .models import Location, Preset
 from .serializers import PresetSerializer
@@ -35,11 +39,33 @@ cache_timeout = int(os.getenv("DJANGO_CACHE_TIMEOUT", 300))  # Default to 5 minu
 
 logger = logging.getLogger("WATERWATCH")
 
+# Columns of a measurement in exports and listings, in output order
+MEASUREMENT_FIELDS = (
+    "id",
+    "timestamp",
+    "local_date",
+    "local_time",
+    "flag",
+    "water_source",
+    "user_id",
+    "country",
+    "continent",
+    "latitude",
+    "longitude",
+)
+
+
+def _location_versions(_request):
+    return get_versions([LOCATIONS]), None
 
+
+@conditional_view(_location_versions)
 @api_view(["GET"])
 def location_list(_request):
     """Get a list of countries by continent.
 
+    Supports conditional requests with an ETag that changes with the Location table.
+
     Returns JSON of:
     {
       "Africa":   ["Algeria", "Egypt", …],
@@ -64,10 +90,17 @@ def location_list(_request):
     return JsonResponse(result)
 
 
+def _preset_versions(_request):
+    return get_versions([PRESETS]), None
+
+
+@conditional_view(_preset_versions)
 @api_view(["GET"])
 def preset_list(_self):
     """Get a list of all presets.
 
+    Supports conditional requests with an ETag that changes with the Preset table.
+
     Returns JSON of:
     {
       "presets": [
@@ -101,14 +134,15 @@ def preset_list(_self):
 
 
 def build_base_queryset(ordered=False):
-    """Build the base queryset with all necessary select_related and prefetch_related operations.
+    """Build the base queryset of measurements with their metrics joined.
 
-    This function creates the foundation queryset that both views need, including:
-    - Related fields for all metric models
-    - User relationship
-    - Campaign prefetch for efficient loading
+    This function creates the foundation queryset that the views need, including:
+    - Related fields for all metric models, read by the analysis format
     - Optional ordering by ID for consistent results (when needed)
 
+    Exports and listings select their columns with ``MeasurementRows``, which ignores the
+    related objects, so no other relations are loaded.
+
     Parameters
     ----------
     ordered : bool, optional
@@ -120,8 +154,7 @@ def build_base_queryset(ordered=False):
     QuerySet
         A queryset with all base optimizations applied
     """
-    related_fields = [model.__name__.lower() for model in METRIC_MODELS]
-    qs = Measurement.objects.select_related("user", "location_ref", *related_fields).prefetch_related("campaigns")
+    qs = Measurement.objects.select_related(*(metric.relation for metric in METRICS))
 
     if ordered:
         qs = qs.order_by("id")
@@ -155,77 +188,59 @@ def apply_location_annotations(queryset):
     )
 
 
-def fetch_metrics_for_measurements(measurement_ids, included_metrics=None):
-    """Fetch all metrics for the given measurement IDs efficiently.
+class MeasurementRows:
+    """Measurements with their metrics and campaign names, read with a single query.
 
-    This function solves the N+1 query problem by fetching all metrics in separate
-    queries (one per metric type) rather than doing individual lookups. It groups
-    metrics by measurement ID for easy lookup.
+    Metric columns are selected through joins and campaign names with an array subquery, so the
+    rows are complete when the database returns them. Rows have the shape built by
+    ``prepare_measurement_data``. Like a values queryset, it can be iterated or streamed with
+    ``iterator``, so it can be handed to the export strategies, which stream it with
+    ``batches`` when they can write column batches.
 
     Parameters
     ----------
-    measurement_ids : list
-        List of measurement IDs to fetch metrics for
+    queryset : QuerySet
+        Filtered measurement queryset with location annotations
     included_metrics : list, optional
         List of metric types to include. If None, includes all metrics.
-
-    Returns
-    -------
-    dict
-        Dictionary mapping measurement_id -> list of metric dictionaries
-        Each metric dict includes a 'metric_type' field for identification
     """
-    if included_metrics is None:
-        included_metrics = [model.__name__.lower() for model in METRIC_MODELS]
-
-    all_metrics = {}
-    for metric_cls in METRIC_MODELS:
-        name = metric_cls.__name__.lower()
-        if name not in included_metrics:
-            continue
-
-        # Fetch all metrics of this type for our measurements in one query
-        metrics_qs = metric_cls.objects.filter(measurement_id__in=measurement_ids).values()
-        for metric in metrics_qs:
-            measurement_id = metric.pop("measurement_id")
-            metric["metric_type"] = name  # Add type identifier for client use
-            all_metrics.setdefault(measurement_id, []).append(metric)
-
-    return all_metrics
-
-
-def fetch_campaigns_for_measurements(measurement_ids):
-    """Fetch campaign names for the given measurement IDs efficiently.
 
-    This function handles the many-to-many relationship between measurements and campaigns.
-    It uses the through table to get associations, then fetches campaign names in bulk
-    to avoid N+1 queries.
+    def __init__(self, queryset, included_metrics=None):
+        self.metric_types = get_metric_types(included_metrics)
+        through = Measurement.campaigns.through
+        campaign_names = ArraySubquery(
+            through.objects.filter(measurement_id=OuterRef("id")).order_by("id").values("campaign__name")
+        )
+        lookups = [lookup for metric in self.metric_types for lookup in metric.lookups]
+        self.names = (*MEASUREMENT_FIELDS, *lookups, "campaign_names")
+        self.queryset = queryset.annotate(campaign_names=campaign_names).values(*self.names)
 
-    Parameters
-    ----------
-    measurement_ids : list
-        List of measurement IDs to fetch campaigns for
+    def _assemble(self, row):
+        metrics = [metric_type.pop_from_row(row) for metric_type in self.metric_types]
+        row["metrics"] = [metric for metric in metrics if metric]
+        row["campaigns"] = row.pop("campaign_names")
+        return row
 
-    Returns
-    -------
-    dict
-        Dictionary mapping measurement_id -> list of campaign names
-    """
-    through = Measurement.campaigns.through
+    def __iter__(self):
+        """Iterate over the measurements, fetching them all at once."""
+        return map(self._assemble, self.queryset)
 
-    # Get all (measurement_id, campaign_id) pairs for our measurements
-    pairs = through.objects.filter(measurement_id__in=measurement_ids).values_list("measurement_id", "campaign_id")
+    def iterator(self, chunk_size=None):
+        """Stream the measurements, fetching them in chunks from a server-side cursor."""
+        return map(self._assemble, self.queryset.iterator(chunk_size=chunk_size))
 
-    # Extract unique campaign IDs and fetch their names in one query
-    campaign_ids = {camp_id for _, camp_id in pairs}
-    id_to_name = dict(Campaign.objects.filter(id__in=campaign_ids).values_list("id", "name"))
+    def batches(self, batch_size=DEFAULT_BATCH_SIZE):
+        """Stream the measurements as column batches, the input of the batch export writers.
 
-    # Build the final mapping: measurement_id -> [campaign_names]
-    campaigns_map = {}
-    for m_id, camp_id in pairs:
-        campaigns_map.setdefault(m_id, []).append(id_to_name[camp_id])
+        Rows are fetched as tuples from a server-side cursor, in chunks of ``batch_size``.
+        """
+        rows = self.queryset.values_list(*self.names).iterator(chunk_size=batch_size)
+        return self.transform_batches(rows, batch_size)
 
-    return campaigns_map
+    def transform_batches(self, rows, batch_size=DEFAULT_BATCH_SIZE):
+        """Transform fetched rows, tuples of the values of ``names``, into column batches."""
+        for batch in batched(rows, batch_size):
+            yield transform_batch(batch, MEASUREMENT_FIELDS, self.metric_types)
 
 
 def prepare_measurement_data(queryset, included_metrics=None):
@@ -233,7 +248,7 @@ def prepare_measurement_data(queryset, included_metrics=None):
 
     This is the main coordination function that ties together all the data fetching
     operations. It takes a filtered queryset and returns fully populated measurement
-    data ready for export or API response.
+    data ready for export or API response, read with a single query.
 
     Parameters
     ----------
@@ -247,37 +262,7 @@ def prepare_measurement_data(queryset, included_metrics=None):
     list
         List of measurement dictionaries with metrics and campaigns included
     """
-    # Get the list of measurement IDs to work with
-    measurement_ids = list(queryset.values_list("id", flat=True))
-
-    # Fetch related data efficiently
-    all_metrics = fetch_metrics_for_measurements(measurement_ids, included_metrics)
-    campaigns_map = fetch_campaigns_for_measurements(measurement_ids)
-
-    # Convert queryset to flat dictionaries with only the fields we need
-    flat_measurements = queryset.values(
-        "id",
-        "timestamp",
-        "local_date",
-        "local_time",
-        "flag",
-        "water_source",
-        "user_id",
-        "country",
-        "continent",
-        "latitude",
-        "longitude",
-    )
-
-    # Combine measurement data with metrics and campaigns
-    data = []
-    for row in flat_measurements:
-        m_id = row["id"]
-        row["metrics"] = all_metrics.get(m_id, [])
-        row["campaigns"] = campaigns_map.get(m_id, [])
-        data.append(row)
-
-    return data
+    return list(MeasurementRows(queryset, included_metrics))
 
 
 def search_measurements_view(request):
@@ -348,40 +333,20 @@ def search_measurements_view(request):
             logger.warning("measurements_included was not a list: %s", included_metrics)
             included_metrics = []
 
-        # Prepare data for export
-        qs = apply_location_annotations(qs)
-
-        # Get measurement IDs and fetch related data
-        measurement_ids = list(qs.values_list("id", flat=True))
-        all_metrics = fetch_metrics_for_measurements(measurement_ids, included_metrics)
-        campaigns_map = fetch_campaigns_for_measurements(measurement_ids)
-
-        # Flatten queryset for export
-        qs = qs.values(
-            "id",
-            "timestamp",
-            "local_date",
-            "local_time",
-            "flag",
-            "water_source",
-            "user_id",
-            "country",
-            "continent",
-            "latitude",
-            "longitude",
-        )
+        # Prepare data for export, read in one query while the response is written
+        rows = MeasurementRows(apply_location_annotations(qs), included_metrics)
 
         # Use strategy pattern for different export formats
         strategy = get_strategy(fmt)
-        exported = strategy.export(qs, extra_data={"metrics": all_metrics, "campaigns": campaigns_map})
+        exported = strategy.export(rows)
         if not isinstance(exported, HttpResponse):
             return HttpResponse(exported)
         return exported
 
-    # For non-export requests, return summary statistics
-    stats = qs.aggregate(
+    # For non-export requests, return summary statistics from the wide metrics table
+    stats = MeasurementMetrics.objects.filter(id__in=final_ids).aggregate(
         count=Count("id"),
-        avgTemp=Avg("temperature__value"),
+        avgTemp=Avg("temperature_value"),
     )
 
     return JsonResponse(
@@ -393,11 +358,20 @@ def search_measurements_view(request):
 
 
 def _get_or_build_id_list(cache_key, compute_qs):
-    """Return a list of IDs from cache if present, otherwise cache and return qs."""
+    """Return a list of IDs from cache if present, otherwise cache and return qs.
+
+    Empty lists are cached as well, so filters without matches are not queried again.
+    """
     ids = cache.get(cache_key)
     if ids is None:
-        ids = list(compute_qs().values_list("id", flat=True))
-        cache.set(cache_key, ids, cache_timeout)
+
+        def compute():
+            computed = list(compute_qs().values_list("id", flat=True))
+            cache.set(cache_key, computed, cache_timeout)
+            return computed
+
+        # Concurrent requests for the same filter wait for a single query
+        ids = single_flight(cache_key, lambda: cache.get(cache_key), compute)
     return set(ids)
 
 
@@ -424,15 +398,8 @@ def _build_boundary_geometry_set(data):
     sets = []
     boundary_geometry = data.get("boundary_geometry")
     if boundary_geometry:
-        boundary_hash = hashlib.md5(str(boundary_geometry).encode()).hexdigest()[:16]
-        key = f"ids:boundary:{boundary_hash}"
-
-        def qs_boundary():
-            qs = Measurement.objects.all()
-            return apply_boundary_filter(qs, boundary_geometry)
-
         try:
-            sets.append(_get_or_build_id_list(key, qs_boundary))
+            sets.append(get_boundary_ids(boundary_geometry))
         except (GEOSException, ValueError, TypeError) as e:
             logger.warning(
                 "Skipping invalid boundary geometry filter. Input: %s. Error: %s",
@@ -461,7 +428,8 @@ def _build_month_set(data):
                     key = f"ids:month:{months_str}"
 
                 def qs_month():
-                    qs = Measurement.objects.all()
+                    # measurement_metrics is partitioned by local_month, so only the selected months are read
+                    qs = MeasurementMetrics.objects.all()
                     return apply_month_filter(qs, months)
 
                 sets.append(_get_or_build_id_list(key, qs_month))
@@ -491,8 +459,8 @@ def _build_temperature_set(data):
         key = f"ids:temp:{data.get('measurements[temperature][from]')}_{data.get('measurements[temperature][to]')}"
 
         def qs_temp():
-            qs = Measurement.objects.all()
-            return filter_measurement_by_temperature(qs, data)
+            qs = MeasurementMetrics.objects.all()
+            return filter_measurement_by_temperature(qs, data, value_field="temperature_value")
 
         sets.append(_get_or_build_id_list(key, qs_temp))
     return sets
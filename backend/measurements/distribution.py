@@ -0,0 +1,201 @@
+"""Summaries of temperature distributions computed on the server."""
+
+import math
+from bisect import bisect_right
+from decimal import Decimal
+from itertools import accumulate
+
+DEFAULT_BINS = 20
+MAX_BINS = 200
+DEFAULT_QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+
+def parse_summary_options(data):
+    """Parse the histogram and quantile options of a summary request.
+
+    Parameters
+    ----------
+    data : dict
+        The request data, with optional ``bins`` (int) and ``quantiles`` (list of floats in [0, 1])
+
+    Returns
+    -------
+    tuple[int, list[float]]
+        The number of histogram bins and the requested quantiles
+
+    Raises
+    ------
+    ValueError
+        If the number of bins or a quantile is invalid.
+    """
+    try:
+        bins = int(data.get("bins", DEFAULT_BINS))
+        quantiles = [float(q) for q in data.get("quantiles", DEFAULT_QUANTILES)]
+    except (TypeError, ValueError) as err:
+        raise ValueError("Invalid summary parameters; bins must be an integer and quantiles a list of numbers") from err
+
+    if not 1 <= bins <= MAX_BINS:
+        raise ValueError(f"bins must be between 1 and {MAX_BINS}")
+    if any(not 0 <= q <= 1 for q in quantiles):
+        raise ValueError("quantiles must be between 0 and 1")
+
+    return bins, quantiles
+
+
+class TemperatureSketch:
+    """Mergeable summary of a set of temperature values.
+
+    Temperatures are stored with one decimal, so the sketch keeps an exact count per tenth of a
+    degree together with the count, sum, sum of squares, minimum and maximum. Its size is bounded
+    by the number of distinct values (at most 1000 between 0 and 100 degrees) regardless of how
+    many measurements it summarizes, and merging two sketches gives exactly the sketch of the
+    combined values.
+
+    Attributes
+    ----------
+    counts : dict[int, int]
+        Number of values per temperature in tenths of a degree
+    count : int
+        Number of values
+    total : int
+        Sum of the values in tenths of a degree
+    total_sq : int
+        Sum of the squared values in hundredths of a degree squared
+    min : int or None
+        Smallest value in tenths of a degree
+    max : int or None
+        Largest value in tenths of a degree
+    """
+
+    __slots__ = ("count", "counts", "max", "min", "total", "total_sq")
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.total_sq = 0
+        self.min = None
+        self.max = None
+
+    @classmethod
+    def from_values(cls, values):
+        """Build a sketch from individual temperature values."""
+        sketch = cls()
+        for value in values:
+            sketch.add(value)
+        return sketch
+
+    @classmethod
+    def from_value_counts(cls, value_counts):
+        """Build a sketch from (temperature, number of occurrences) pairs, e.g. a grouped query."""
+        sketch = cls()
+        for value, n in value_counts:
+            sketch.add(value, n)
+        return sketch
+
+    @classmethod
+    def from_payload(cls, payload):
+        """Build a sketch from the JSON representation returned by ``to_payload``."""
+        sketch = cls()
+        for tenths, n in payload.items():
+            sketch._add_tenths(int(tenths), n)
+        return sketch
+
+    @classmethod
+    def merged(cls, sketches):
+        """Merge several sketches into a new one."""
+        result = cls()
+        for sketch in sketches:
+            result.merge(sketch)
+        return result
+
+    def add(self, value, n=1):
+        """Add ``n`` occurrences of a temperature value."""
+        tenths = round(Decimal(str(value)) * 10)
+        self._add_tenths(tenths, n)
+
+    def _add_tenths(self, tenths, n):
+        self.counts[tenths] = self.counts.get(tenths, 0) + n
+        self.count += n
+        self.total += tenths * n
+        self.total_sq += tenths * tenths * n
+        self.min = tenths if self.min is None else min(self.min, tenths)
+        self.max = tenths if self.max is None else max(self.max, tenths)
+
+    def merge(self, other):
+        """Add all values of another sketch to this one."""
+        for tenths, n in other.counts.items():
+            self._add_tenths(tenths, n)
+        return self
+
+    def to_payload(self):
+        """Get a JSON-serialisable representation of the sketch: the count per tenth of a degree."""
+        return {str(tenths): n for tenths, n in self.counts.items()}
+
+    def values(self):
+        """Get the individual values in ascending order, as decimals with one decimal place."""
+        return [Decimal(tenths).scaleb(-1) for tenths in sorted(self.counts) for _ in range(self.counts[tenths])]
+
+    def summary(self, bins=DEFAULT_BINS, quantiles=None):
+        """Summarize the values into moments, quantiles and a histogram.
+
+        Parameters
+        ----------
+        bins : int, optional
+            Number of equal-width histogram bins
+        quantiles : list[float], optional
+            Quantiles to compute, defaults to ``DEFAULT_QUANTILES``
+
+        Returns
+        -------
+        dict
+            Dictionary with count, mean, std (population), min, max, quantiles and histogram.
+            All statistics are ``None`` and the histogram is empty when there are no values.
+        """
+        quantiles = DEFAULT_QUANTILES if quantiles is None else quantiles
+        if not self.count:
+            return {
+                "count": 0,
+                "mean": None,
+                "std": None,
+                "min": None,
+                "max": None,
+                "quantiles": {str(q): None for q in quantiles},
+                "histogram": {"edges": [], "counts": []},
+            }
+
+        # Exact integer arithmetic in tenths, converted to degrees at the end
+        variance = (self.total_sq * self.count - self.total * self.total) / (self.count * self.count) / 100
+        keys = sorted(self.counts)
+        cumulative = list(accumulate(self.counts[k] for k in keys))
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count / 10, 4),
+            "std": round(math.sqrt(variance), 4),
+            "min": self.min / 10,
+            "max": self.max / 10,
+            "quantiles": {str(q): round(self._quantile(keys, cumulative, q), 4) for q in quantiles},
+            "histogram": self._histogram(keys, bins),
+        }
+
+    @staticmethod
+    def _quantile(keys, cumulative, q):
+        """Compute a quantile with linear interpolation between the closest ranks."""
+        position = (cumulative[-1] - 1) * q
+        lower = keys[bisect_right(cumulative, math.floor(position))] / 10
+        upper = keys[bisect_right(cumulative, math.ceil(position))] / 10
+        return lower + (upper - lower) * (position - math.floor(position))
+
+    def _histogram(self, keys, bins):
+        """Count values in equal-width bins between the minimum and maximum; the last bin is closed."""
+        low, high = self.min / 10, self.max / 10
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+
+        width = (high - low) / bins
+        edges = [low + i * width for i in range(bins)] + [high]
+        counts = [0] * bins
+        for tenths in keys:
+            counts[min(int((tenths / 10 - low) / width), bins - 1)] += self.counts[tenths]
+
+        return {"edges": [round(e, 4) for e in edges], "counts": counts}
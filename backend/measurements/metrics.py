@@ -1,7 +1,136 @@
-"""Contains the metric models for the measurements app."""
+"""Contains the metric models for the measurements app and a registry of their columns."""
+
+from django.db import models
 
 from .models import Temperature
 
 METRIC_MODELS = [
     Temperature,
 ]
+
+
+def _total_seconds(value):
+    return value.total_seconds()
+
+
+# Conversions of metric values to JSON-friendly types, by field class
+_CONVERTERS = {
+    models.DecimalField: float,
+    models.DurationField: _total_seconds,
+}
+
+
+class MetricType:
+    """Columns, lookups and converters of a metric model, computed once when it is registered.
+
+    Metrics are one-to-one with their measurement, so the columns of all metrics can be selected
+    together with the measurement through joins, in one query, without repeating measurements.
+
+    Parameters
+    ----------
+    model : Model
+        The metric model, with a one-to-one ``measurement`` field
+
+    Attributes
+    ----------
+    name : str
+        Name of the metric type, as used in ``metric_type`` and ``measurements_included``
+    relation : str
+        Name of the relation from a measurement to the metric
+    columns : tuple[str]
+        Attribute names of the metric's columns, except its measurement
+    lookups : tuple[str]
+        Lookups selecting the columns from a measurement queryset
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.name = model.__name__.lower()
+        self.relation = model._meta.get_field("measurement").related_query_name()
+        fields = [field for field in model._meta.concrete_fields if field.attname != "measurement_id"]
+        self.columns = tuple(field.attname for field in fields)
+        self.lookups = tuple(f"{self.relation}__{column}" for column in self.columns)
+        self._pairs = tuple(zip(self.columns, self.lookups, strict=True))
+        self._pk_index = self.columns.index(model._meta.pk.attname)
+        self._converters = tuple(
+            (field.attname, _CONVERTERS.get(type(field))) for field in fields if not field.primary_key
+        )
+
+    def pop_from_row(self, row):
+        """Take the metric's columns out of a row selected with ``lookups``.
+
+        Parameters
+        ----------
+        row : dict
+            A row of a values queryset; the metric's lookups are removed from it
+
+        Returns
+        -------
+        dict | None
+            The metric's columns and its ``metric_type``, or None if the measurement does not have it
+        """
+        metric = {column: row.pop(lookup) for column, lookup in self._pairs}
+        # All columns are null if the measurement does not have this metric
+        if metric[self.columns[self._pk_index]] is None:
+            return None
+        metric["metric_type"] = self.name
+        return metric
+
+    def metrics_from_columns(self, columns):
+        """Build the metric of every row of a batch stored as columns.
+
+        Parameters
+        ----------
+        columns : Sequence[Sequence]
+            The values of ``lookups``, one sequence per column
+
+        Returns
+        -------
+        list[dict | None]
+            Per row, the metric as returned by ``pop_from_row``
+        """
+        names = self.columns
+        pk = self._pk_index
+        name = self.name
+        return [
+            None if values[pk] is None else {**dict(zip(names, values, strict=True)), "metric_type": name}
+            for values in zip(*columns, strict=True)
+        ]
+
+    def serialize(self, instance):
+        """Convert a metric instance to JSON-friendly values, with Decimals as floats and durations in seconds.
+
+        Parameters
+        ----------
+        instance : Model
+            An instance of the metric model
+
+        Returns
+        -------
+        dict
+            The ``metric_type`` and the values of the metric's fields, except its ID
+        """
+        data = {"metric_type": self.name}
+        for column, convert in self._converters:
+            value = getattr(instance, column)
+            data[column] = convert(value) if convert is not None and value is not None else value
+        return data
+
+
+METRICS = tuple(MetricType(model) for model in METRIC_MODELS)
+
+
+def get_metric_types(included_metrics=None):
+    """Get the registered metric types, optionally only the included ones.
+
+    Parameters
+    ----------
+    included_metrics : list[str], optional
+        Names of the metric types to include. If None, includes all metrics.
+
+    Returns
+    -------
+    list[MetricType]
+        The metric types, in registration order
+    """
+    return [metric for metric in METRICS if included_metrics is None or metric.name in included_metrics]
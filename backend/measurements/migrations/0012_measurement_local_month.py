@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-19 07:11
+
+import django.db.models.functions.comparison
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+# Adding a stored generated column rewrites measurements_measurement and holds an ACCESS
+# EXCLUSIVE lock on it while doing so, which blocks all reads and writes of measurements
+# until the migration commits. Run it in a maintenance window on large databases.
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('measurements', '0011_remove_temperature_temperature_value_greater_than_zero_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='measurement',
+            name='local_month',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Cast(django.db.models.functions.datetime.ExtractMonth('local_date'), models.SmallIntegerField()), output_field=models.SmallIntegerField()),
+        ),
+        migrations.AddIndex(
+            model_name='measurement',
+            index=models.Index(fields=['local_month', 'location'], name='measurement_local_m_66dbe8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='temperature',
+            index=models.Index(fields=['measurement'], include=('value',), name='temperature_measurement_value'),
+        ),
+    ]
@@ -0,0 +1,150 @@
+# Generated by Django 5.2 on 2026-10-19 07:13
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations, models
+
+# measurement_metrics holds one row per measurement with the measurement columns and the
+# values of all metrics, so read paths do not have to join the metric tables. It is kept
+# current by the triggers below and must not be written to by the application.
+CREATE_SQL = """
+CREATE TABLE measurement_metrics (
+    id bigint PRIMARY KEY,
+    local_date date NOT NULL,
+    local_month smallint NOT NULL,
+    local_time time NOT NULL,
+    location geometry(Point, 4326) NOT NULL,
+    water_source varchar(255) NOT NULL,
+    flag boolean NOT NULL,
+    location_ref_id bigint NULL,
+    user_id integer NULL,
+    temperature_value numeric(4, 1) NULL,
+    temperature_sensor varchar(255) NULL,
+    temperature_time_waited interval NULL
+);
+
+CREATE INDEX measurement_metrics_location_idx ON measurement_metrics USING gist (location);
+CREATE INDEX measurement_metrics_month_location_idx ON measurement_metrics (local_month, location);
+CREATE INDEX measurement_metrics_local_date_idx ON measurement_metrics (local_date);
+CREATE INDEX measurement_metrics_water_source_idx ON measurement_metrics (water_source);
+CREATE INDEX measurement_metrics_location_ref_idx ON measurement_metrics (location_ref_id);
+CREATE INDEX measurement_metrics_temperature_value_idx ON measurement_metrics (temperature_value);
+
+CREATE FUNCTION measurement_metrics_sync_measurement() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM measurement_metrics WHERE id = OLD.id;
+        RETURN OLD;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO measurement_metrics (
+            id, local_date, local_month, local_time, location, water_source, flag, location_ref_id, user_id
+        )
+        VALUES (
+            NEW.id, NEW.local_date, NEW.local_month, NEW.local_time, NEW.location, NEW.water_source, NEW.flag,
+            NEW.location_ref_id, NEW.user_id
+        )
+        ON CONFLICT (id) DO UPDATE SET
+            local_date = EXCLUDED.local_date,
+            local_month = EXCLUDED.local_month,
+            local_time = EXCLUDED.local_time,
+            location = EXCLUDED.location,
+            water_source = EXCLUDED.water_source,
+            flag = EXCLUDED.flag,
+            location_ref_id = EXCLUDED.location_ref_id,
+            user_id = EXCLUDED.user_id,
+            temperature_value = NULL,
+            temperature_sensor = NULL,
+            temperature_time_waited = NULL;
+    ELSE
+        UPDATE measurement_metrics SET
+            id = NEW.id,
+            local_date = NEW.local_date,
+            local_month = NEW.local_month,
+            local_time = NEW.local_time,
+            location = NEW.location,
+            water_source = NEW.water_source,
+            flag = NEW.flag,
+            location_ref_id = NEW.location_ref_id,
+            user_id = NEW.user_id
+        WHERE id = OLD.id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER measurement_metrics_sync
+AFTER INSERT OR UPDATE OR DELETE ON measurements_measurement
+FOR EACH ROW EXECUTE FUNCTION measurement_metrics_sync_measurement();
+
+CREATE FUNCTION measurement_metrics_sync_temperature() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE measurement_metrics SET
+            temperature_value = NULL,
+            temperature_sensor = NULL,
+            temperature_time_waited = NULL
+        WHERE id = OLD.measurement_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE measurement_metrics SET
+            temperature_value = NEW.value,
+            temperature_sensor = NEW.sensor,
+            temperature_time_waited = NEW.time_waited
+        WHERE id = NEW.measurement_id;
+        RETURN NEW;
+    END IF;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER measurement_metrics_sync
+AFTER INSERT OR UPDATE OR DELETE ON measurements_temperature
+FOR EACH ROW EXECUTE FUNCTION measurement_metrics_sync_temperature();
+
+INSERT INTO measurement_metrics
+SELECT
+    m.id, m.local_date, m.local_month, m.local_time, m.location, m.water_source, m.flag, m.location_ref_id,
+    m.user_id, t.value, t.sensor, t.time_waited
+FROM measurements_measurement m
+LEFT JOIN measurements_temperature t ON t.measurement_id = m.id;
+"""
+
+DROP_SQL = """
+DROP TRIGGER IF EXISTS measurement_metrics_sync ON measurements_temperature;
+DROP TRIGGER IF EXISTS measurement_metrics_sync ON measurements_measurement;
+DROP FUNCTION IF EXISTS measurement_metrics_sync_temperature();
+DROP FUNCTION IF EXISTS measurement_metrics_sync_measurement();
+DROP TABLE IF EXISTS measurement_metrics;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('measurements', '0012_measurement_local_month'),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=CREATE_SQL, reverse_sql=DROP_SQL),
+        migrations.CreateModel(
+            name='MeasurementMetrics',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('local_date', models.DateField()),
+                ('local_month', models.SmallIntegerField()),
+                ('local_time', models.TimeField()),
+                ('location', django.contrib.gis.db.models.fields.PointField(srid=4326)),
+                ('water_source', models.CharField(max_length=255)),
+                ('flag', models.BooleanField()),
+                ('temperature_value', models.DecimalField(decimal_places=1, max_digits=4, null=True)),
+                ('temperature_sensor', models.CharField(max_length=255, null=True)),
+                ('temperature_time_waited', models.DurationField(null=True)),
+            ],
+            options={
+                'db_table': 'measurement_metrics',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-19 08:14
+
+from django.db import migrations
+
+# Month filters and aggregations read measurement_metrics, which has its own local_month
+# index and carries the temperature value, so these indexes are no longer used. This
+# includes the month ID set of the export filters (_build_month_set), which used to filter
+# measurements_measurement by local_month and must be deployed with or before this migration.
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('measurements', '0013_measurementmetrics'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='measurement',
+            name='measurement_local_m_66dbe8_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='temperature',
+            name='temperature_measurement_value',
+        ),
+    ]
@@ -0,0 +1,228 @@
+# Generated by Django 5.2 on 2026-10-19 08:30
+
+from django.db import migrations
+
+# measurement_metrics is list-partitioned by local_month, one partition per month of the
+# year, so month filters only read the partitions of the selected months. Months of the
+# year are a fixed set, so no partitions have to be created ahead of time.
+#
+# The rows are copied into the partitioned table while measurement and temperature writes
+# are blocked by a SHARE lock; reads keep being served until the tables are swapped.
+PARTITION_SQL = """
+LOCK TABLE measurements_measurement, measurements_temperature IN SHARE MODE;
+
+CREATE TABLE measurement_metrics_partitioned (
+    id bigint NOT NULL,
+    local_date date NOT NULL,
+    local_month smallint NOT NULL,
+    local_time time NOT NULL,
+    location geometry(Point, 4326) NOT NULL,
+    water_source varchar(255) NOT NULL,
+    flag boolean NOT NULL,
+    location_ref_id bigint NULL,
+    user_id integer NULL,
+    temperature_value numeric(4, 1) NULL,
+    temperature_sensor varchar(255) NULL,
+    temperature_time_waited interval NULL,
+    PRIMARY KEY (id, local_month)
+) PARTITION BY LIST (local_month);
+
+DO $$
+BEGIN
+    FOR m IN 1..12 LOOP
+        EXECUTE format(
+            'CREATE TABLE measurement_metrics_m%s PARTITION OF measurement_metrics_partitioned FOR VALUES IN (%s)',
+            lpad(m::text, 2, '0'), m
+        );
+    END LOOP;
+END;
+$$;
+
+INSERT INTO measurement_metrics_partitioned SELECT * FROM measurement_metrics;
+DROP TABLE measurement_metrics;
+ALTER TABLE measurement_metrics_partitioned RENAME TO measurement_metrics;
+ALTER INDEX measurement_metrics_partitioned_pkey RENAME TO measurement_metrics_pkey;
+
+CREATE INDEX measurement_metrics_location_idx ON measurement_metrics USING gist (location);
+CREATE INDEX measurement_metrics_local_date_idx ON measurement_metrics (local_date);
+CREATE INDEX measurement_metrics_water_source_idx ON measurement_metrics (water_source);
+CREATE INDEX measurement_metrics_location_ref_idx ON measurement_metrics (location_ref_id);
+CREATE INDEX measurement_metrics_temperature_value_idx ON measurement_metrics (temperature_value);
+
+-- Rows are matched on their partition key as well, so a write only touches one partition
+CREATE OR REPLACE FUNCTION measurement_metrics_sync_measurement() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM measurement_metrics WHERE id = OLD.id AND local_month = OLD.local_month;
+        RETURN OLD;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO measurement_metrics (
+            id, local_date, local_month, local_time, location, water_source, flag, location_ref_id, user_id
+        )
+        VALUES (
+            NEW.id, NEW.local_date, NEW.local_month, NEW.local_time, NEW.location, NEW.water_source, NEW.flag,
+            NEW.location_ref_id, NEW.user_id
+        )
+        ON CONFLICT (id, local_month) DO UPDATE SET
+            local_date = EXCLUDED.local_date,
+            local_time = EXCLUDED.local_time,
+            location = EXCLUDED.location,
+            water_source = EXCLUDED.water_source,
+            flag = EXCLUDED.flag,
+            location_ref_id = EXCLUDED.location_ref_id,
+            user_id = EXCLUDED.user_id,
+            temperature_value = NULL,
+            temperature_sensor = NULL,
+            temperature_time_waited = NULL;
+    ELSE
+        -- A changed local_month moves the row to the partition of its new month
+        UPDATE measurement_metrics SET
+            id = NEW.id,
+            local_date = NEW.local_date,
+            local_month = NEW.local_month,
+            local_time = NEW.local_time,
+            location = NEW.location,
+            water_source = NEW.water_source,
+            flag = NEW.flag,
+            location_ref_id = NEW.location_ref_id,
+            user_id = NEW.user_id
+        WHERE id = OLD.id AND local_month = OLD.local_month;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION measurement_metrics_sync_temperature() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE measurement_metrics SET
+            temperature_value = NULL,
+            temperature_sensor = NULL,
+            temperature_time_waited = NULL
+        WHERE id = OLD.measurement_id
+            AND local_month = (SELECT local_month FROM measurements_measurement WHERE id = OLD.measurement_id);
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE measurement_metrics SET
+            temperature_value = NEW.value,
+            temperature_sensor = NEW.sensor,
+            temperature_time_waited = NEW.time_waited
+        WHERE id = NEW.measurement_id
+            AND local_month = (SELECT local_month FROM measurements_measurement WHERE id = NEW.measurement_id);
+        RETURN NEW;
+    END IF;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+UNPARTITION_SQL = """
+LOCK TABLE measurements_measurement, measurements_temperature IN SHARE MODE;
+
+CREATE TABLE measurement_metrics_plain (
+    id bigint PRIMARY KEY,
+    local_date date NOT NULL,
+    local_month smallint NOT NULL,
+    local_time time NOT NULL,
+    location geometry(Point, 4326) NOT NULL,
+    water_source varchar(255) NOT NULL,
+    flag boolean NOT NULL,
+    location_ref_id bigint NULL,
+    user_id integer NULL,
+    temperature_value numeric(4, 1) NULL,
+    temperature_sensor varchar(255) NULL,
+    temperature_time_waited interval NULL
+);
+
+INSERT INTO measurement_metrics_plain SELECT * FROM measurement_metrics;
+DROP TABLE measurement_metrics;
+ALTER TABLE measurement_metrics_plain RENAME TO measurement_metrics;
+ALTER INDEX measurement_metrics_plain_pkey RENAME TO measurement_metrics_pkey;
+
+CREATE INDEX measurement_metrics_location_idx ON measurement_metrics USING gist (location);
+CREATE INDEX measurement_metrics_month_location_idx ON measurement_metrics (local_month, location);
+CREATE INDEX measurement_metrics_local_date_idx ON measurement_metrics (local_date);
+CREATE INDEX measurement_metrics_water_source_idx ON measurement_metrics (water_source);
+CREATE INDEX measurement_metrics_location_ref_idx ON measurement_metrics (location_ref_id);
+CREATE INDEX measurement_metrics_temperature_value_idx ON measurement_metrics (temperature_value);
+
+CREATE OR REPLACE FUNCTION measurement_metrics_sync_measurement() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM measurement_metrics WHERE id = OLD.id;
+        RETURN OLD;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO measurement_metrics (
+            id, local_date, local_month, local_time, location, water_source, flag, location_ref_id, user_id
+        )
+        VALUES (
+            NEW.id, NEW.local_date, NEW.local_month, NEW.local_time, NEW.location, NEW.water_source, NEW.flag,
+            NEW.location_ref_id, NEW.user_id
+        )
+        ON CONFLICT (id) DO UPDATE SET
+            local_date = EXCLUDED.local_date,
+            local_month = EXCLUDED.local_month,
+            local_time = EXCLUDED.local_time,
+            location = EXCLUDED.location,
+            water_source = EXCLUDED.water_source,
+            flag = EXCLUDED.flag,
+            location_ref_id = EXCLUDED.location_ref_id,
+            user_id = EXCLUDED.user_id,
+            temperature_value = NULL,
+            temperature_sensor = NULL,
+            temperature_time_waited = NULL;
+    ELSE
+        UPDATE measurement_metrics SET
+            id = NEW.id,
+            local_date = NEW.local_date,
+            local_month = NEW.local_month,
+            local_time = NEW.local_time,
+            location = NEW.location,
+            water_source = NEW.water_source,
+            flag = NEW.flag,
+            location_ref_id = NEW.location_ref_id,
+            user_id = NEW.user_id
+        WHERE id = OLD.id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION measurement_metrics_sync_temperature() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE measurement_metrics SET
+            temperature_value = NULL,
+            temperature_sensor = NULL,
+            temperature_time_waited = NULL
+        WHERE id = OLD.measurement_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE measurement_metrics SET
+            temperature_value = NEW.value,
+            temperature_sensor = NEW.sensor,
+            temperature_time_waited = NEW.time_waited
+        WHERE id = NEW.measurement_id;
+        RETURN NEW;
+    END IF;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('measurements', '0014_remove_unused_month_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=PARTITION_SQL, reverse_sql=UNPARTITION_SQL),
+    ]
@@ -4,6 +4,7 @@ from campaigns.models import Campaign
 from django.contrib.auth.models import User
 from django.contrib.gis.db import models as geomodels
 from django.db import models
+from django.db.models.functions import Cast, ExtractMonth
 from django.utils import timezone
 
 
@@ -17,6 +18,9 @@ class Measurement(models.Model):
         Dictionary defining the possible water source types
     timestamp : datetime.datetime
         Datetime for when the measurement was taken
+    local_month : int
+        Month of ``local_date``, stored by the database and copied to ``measurement_metrics``,
+        where month filters read it
     location : Point
         Point containing the latitude and longitude of where the measurement was taken
     location_ref : Location, optional
@@ -40,6 +44,11 @@ class Measurement(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
     local_date = models.DateField(default=timezone.now)
     local_time = models.TimeField(default=timezone.now)
+    local_month = models.GeneratedField(
+        expression=Cast(ExtractMonth("local_date"), models.SmallIntegerField()),
+        output_field=models.SmallIntegerField(),
+        db_persist=True,
+    )
     location = geomodels.PointField(srid=4326)
     location_ref = models.ForeignKey(
         "measurement_export.Location",
@@ -142,3 +151,64 @@ class Temperature(models.Model):
 
     def __str__(self):
         return f"Temperature: {self.value} - {self.sensor} - {self.time_waited}"
+
+
+class MeasurementMetrics(models.Model):
+    """Read-optimised copy of a measurement together with all of its metric values.
+
+    The table is maintained by database triggers on the measurement and metric tables, so
+    aggregations and filters can read measurement columns and metric values without joins.
+    It must never be written to directly. The table is partitioned by ``local_month``, so
+    month filters only read the rows of the selected months.
+
+    Attributes
+    ----------
+    id : int
+        Id of the measurement
+    local_date : datetime.date
+        Local date of the measurement
+    local_month : int
+        Month of ``local_date``
+    local_time : datetime.time
+        Local time of the measurement
+    location : Point
+        Location of the measurement
+    water_source : str
+        Water source of the measurement
+    flag : bool
+        Flag of the measurement
+    location_ref : Location, optional
+        Location containing the measurement point
+    user : User, optional
+        User that took the measurement
+    temperature_value : decimal.Decimal, optional
+        Recorded temperature, if the measurement has one
+    temperature_sensor : str, optional
+        Sensor used to record the temperature
+    temperature_time_waited : datetime.timedelta, optional
+        Time waited before reading the temperature
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    local_date = models.DateField()
+    local_month = models.SmallIntegerField()
+    local_time = models.TimeField()
+    location = geomodels.PointField(srid=4326)
+    water_source = models.CharField(max_length=255)
+    flag = models.BooleanField()
+    location_ref = models.ForeignKey(
+        "measurement_export.Location", on_delete=models.DO_NOTHING, null=True, db_constraint=False, related_name="+"
+    )
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, null=True, db_constraint=False, related_name="+")
+    temperature_value = models.DecimalField(max_digits=4, decimal_places=1, null=True)
+    temperature_sensor = models.CharField(max_length=255, null=True)  # noqa: DJ001 - NULL without a temperature
+    temperature_time_waited = models.DurationField(null=True)
+
+    class Meta:
+        """Meta class for MeasurementMetrics model."""
+
+        managed = False
+        db_table = "measurement_metrics"
+
+    def __str__(self):
+        return f"MeasurementMetrics: {self.id} - {self.local_date} - {self.temperature_value}"
@@ -0,0 +1,88 @@
+"""Tests for the temperature distribution summaries."""
+
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from measurements.distribution import TemperatureSketch, parse_summary_options
+
+
+class TemperatureSummaryTest(SimpleTestCase):
+    """Test cases for TemperatureSketch.summary."""
+
+    def test_moments_and_extremes(self):
+        summary = TemperatureSketch.from_values(
+            [Decimal("10.0"), Decimal("20.0"), Decimal("30.0"), Decimal("40.0")]
+        ).summary()
+
+        assert summary["count"] == 4
+        assert summary["mean"] == 25.0
+        assert summary["std"] == 11.1803
+        assert summary["min"] == 10.0
+        assert summary["max"] == 40.0
+
+    def test_quantiles_interpolate(self):
+        summary = TemperatureSketch.from_values([10, 20, 30, 40]).summary(quantiles=[0, 0.5, 0.9, 1])
+
+        assert summary["quantiles"] == {"0": 10.0, "0.5": 25.0, "0.9": 37.0, "1": 40.0}
+
+    def test_histogram_includes_maximum_in_last_bin(self):
+        summary = TemperatureSketch.from_values([0, 1, 2, 3, 4]).summary(bins=2)
+
+        assert summary["histogram"] == {"edges": [0.0, 2.0, 4.0], "counts": [2, 3]}
+
+    def test_histogram_of_equal_values(self):
+        summary = TemperatureSketch.from_values([20, 20]).summary(bins=1)
+
+        assert summary["histogram"] == {"edges": [19.5, 20.5], "counts": [2]}
+
+    def test_empty_values(self):
+        summary = TemperatureSketch.from_values([]).summary(quantiles=[0.5])
+
+        assert summary["count"] == 0
+        assert summary["mean"] is None
+        assert summary["quantiles"] == {"0.5": None}
+        assert summary["histogram"] == {"edges": [], "counts": []}
+
+
+class TemperatureSketchTest(SimpleTestCase):
+    """Test cases for TemperatureSketch."""
+
+    def test_merge_equals_sketch_of_combined_values(self):
+        first = [Decimal("20.1"), Decimal("22.0"), Decimal("22.0")]
+        second = [Decimal("18.5"), Decimal("22.0")]
+
+        merged = TemperatureSketch.merged([TemperatureSketch.from_values(first), TemperatureSketch.from_values(second)])
+        combined = TemperatureSketch.from_values(first + second)
+
+        assert merged.counts == combined.counts == {185: 1, 201: 1, 220: 3}
+        assert (merged.count, merged.total, merged.total_sq) == (combined.count, combined.total, combined.total_sq)
+        assert (merged.min, merged.max) == (185, 220)
+        assert merged.summary() == combined.summary()
+
+    def test_from_value_counts(self):
+        sketch = TemperatureSketch.from_value_counts([(Decimal("25.5"), 2), (Decimal("30.0"), 1)])
+
+        assert sketch.values() == [Decimal("25.5"), Decimal("25.5"), Decimal("30.0")]
+        assert sketch.summary(quantiles=[0.5])["quantiles"] == {"0.5": 25.5}
+
+    def test_size_independent_of_volume(self):
+        sketch = TemperatureSketch.from_value_counts([(Decimal("21.3"), 100000)])
+
+        assert sketch.counts == {213: 100000}
+        assert sketch.summary()["mean"] == 21.3
+
+
+class ParseSummaryOptionsTest(SimpleTestCase):
+    """Test cases for parse_summary_options."""
+
+    def test_defaults(self):
+        bins, quantiles = parse_summary_options({})
+
+        assert bins == 20
+        assert quantiles == [0.05, 0.25, 0.5, 0.75, 0.95]
+
+    def test_invalid_options(self):
+        for data in ({"bins": "many"}, {"bins": 0}, {"bins": 1000}, {"quantiles": [1.5]}, {"quantiles": 3}):
+            with self.assertRaises(ValueError):
+                parse_summary_options(data)
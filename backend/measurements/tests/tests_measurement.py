@@ -54,3 +54,13 @@ class MeasurementTest(TestCase):
         retrieved_meas1 = Measurement.objects.get(id=self.timezone1.id)
 
         assert retrieved_meas1.timestamp == self.timezone1.timestamp
+
+    def test_measurement_local_month(self):
+        """Test the stored local month follows the local date."""
+        measurement = Measurement.objects.create(location=Point(4, 4), local_date="2024-12-31", water_source="well")
+        assert measurement.local_month == 12
+
+        measurement.local_date = "2025-01-01"
+        measurement.save()
+        measurement.refresh_from_db()
+        assert measurement.local_month == 1
@@ -0,0 +1,79 @@
+"""Tests for the MeasurementMetrics table."""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.gis.geos import Point
+from django.db import connection
+from django.test import TestCase
+
+from measurements.models import Measurement, MeasurementMetrics, Temperature
+
+
+class MeasurementMetricsTest(TestCase):
+    """Test cases for the trigger-maintained MeasurementMetrics table."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data for the test cases."""
+        cls.measurement = Measurement.objects.create(
+            location=Point(1, 1), local_date="2025-03-14", local_time="09:30:00", water_source="well"
+        )
+
+    def test_row_created_with_measurement(self):
+        """Test a row with the measurement columns is added when a measurement is created."""
+        metrics = MeasurementMetrics.objects.get(id=self.measurement.id)
+
+        assert metrics.local_date.isoformat() == "2025-03-14"
+        assert metrics.local_month == 3
+        assert metrics.location == self.measurement.location
+        assert metrics.water_source == "well"
+        assert metrics.temperature_value is None
+
+    def test_temperature_is_copied(self):
+        """Test temperature inserts, updates and deletes are reflected in the row."""
+        temperature = Temperature.objects.create(
+            measurement=self.measurement, sensor="Sensor", value=21.5, time_waited=timedelta(minutes=1)
+        )
+        metrics = MeasurementMetrics.objects.get(id=self.measurement.id)
+        assert metrics.temperature_value == Decimal("21.5")
+        assert metrics.temperature_sensor == "Sensor"
+        assert metrics.temperature_time_waited == timedelta(minutes=1)
+
+        temperature.value = 22.0
+        temperature.save()
+        assert MeasurementMetrics.objects.get(id=self.measurement.id).temperature_value == Decimal("22.0")
+
+        temperature.delete()
+        assert MeasurementMetrics.objects.get(id=self.measurement.id).temperature_value is None
+
+    def test_measurement_update_and_delete(self):
+        """Test measurement updates and deletes are reflected in the table."""
+        self.measurement.flag = False
+        self.measurement.local_date = "2025-07-01"
+        self.measurement.save()
+
+        metrics = MeasurementMetrics.objects.get(id=self.measurement.id)
+        assert not metrics.flag
+        assert metrics.local_month == 7
+
+        measurement_id = self.measurement.id
+        self.measurement.delete()
+        assert not MeasurementMetrics.objects.filter(id=measurement_id).exists()
+
+    def test_rows_are_stored_in_their_month_partition(self):
+        """Test a row is kept in the partition of its month, also after the month changes."""
+
+        def partition():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT tableoid::regclass::text FROM measurement_metrics WHERE id = %s", [self.measurement.id]
+                )
+                return cursor.fetchone()[0]
+
+        assert partition() == "measurement_metrics_m03"
+
+        self.measurement.local_date = "2025-11-02"
+        self.measurement.save()
+        assert partition() == "measurement_metrics_m11"
+        assert MeasurementMetrics.objects.filter(id=self.measurement.id).count() == 1
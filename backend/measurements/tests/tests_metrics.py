@@ -0,0 +1,62 @@
+"""Tests for the metric registry."""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from measurements.metrics import METRICS, get_metric_types
+from measurements.models import Temperature
+
+
+class MetricRegistryTest(SimpleTestCase):
+    """Test cases for the precomputed columns and converters of metric types."""
+
+    def test_temperature_columns(self):
+        temperature = get_metric_types(["temperature"])[0]
+
+        assert temperature.relation == "temperature"
+        assert temperature.columns == ("id", "sensor", "value", "time_waited")
+        assert temperature.lookups == (
+            "temperature__id",
+            "temperature__sensor",
+            "temperature__value",
+            "temperature__time_waited",
+        )
+
+    def test_get_metric_types(self):
+        assert get_metric_types() == list(METRICS)
+        assert get_metric_types([]) == []
+
+    def test_serialize_converts_values(self):
+        temperature = get_metric_types(["temperature"])[0]
+        instance = Temperature(id=1, sensor="Probe", value=Decimal("21.5"), time_waited=timedelta(seconds=30))
+
+        assert temperature.serialize(instance) == {
+            "metric_type": "temperature",
+            "sensor": "Probe",
+            "value": 21.5,
+            "time_waited": 30.0,
+        }
+
+    def test_pop_from_row(self):
+        temperature = get_metric_types(["temperature"])[0]
+        row = {
+            "id": 7,
+            "temperature__id": 3,
+            "temperature__sensor": "Probe",
+            "temperature__value": Decimal("21.5"),
+            "temperature__time_waited": timedelta(seconds=30),
+        }
+
+        assert temperature.pop_from_row(row) == {
+            "id": 3,
+            "sensor": "Probe",
+            "value": Decimal("21.5"),
+            "time_waited": timedelta(seconds=30),
+            "metric_type": "temperature",
+        }
+        assert row == {"id": 7}
+
+        missing = dict.fromkeys(temperature.lookups)
+        assert temperature.pop_from_row(missing) is None
@@ -12,6 +12,7 @@ from django.test import Client, TestCase
 from django.utils import timezone
 from rest_framework.test import APIClient
 
+from measurements.distribution import TemperatureSketch
 from measurements.models import Measurement, Temperature
 
 
@@ -92,11 +93,19 @@ class GetAllMeasurementsTest(TestCase):
         # Verify function calls
         mock_build.assert_called_once_with(ordered=True)
         mock_annotate.assert_called_once_with(mock_queryset)
-        mock_prepare.assert_called_once_with(mock_annotated_qs)
+        mock_annotated_qs.filter.assert_called_once_with(id__gt=0)
+        mock_prepare.assert_called_once_with(mock_annotated_qs.filter.return_value.__getitem__.return_value)
 
         # Verify response
         assert response.status_code == 200
-        assert json.loads(response.content) == mock_data
+        assert json.loads(response.content) == {"results": mock_data, "next_cursor": None}
+
+    def test_get_all_measurements_invalid_page(self):
+        """Test that an invalid cursor or page size returns a 400."""
+        self.client.force_authenticate(user=self.staff)
+
+        assert self.client.get("/api/measurements/?cursor=abc").status_code == 400
+        assert self.client.get("/api/measurements/?page_size=0").status_code == 400
 
 
 class MeasurementSearchTest(TestCase):
@@ -218,6 +227,41 @@ class TemperatureViewTest(TestCase):
         temperatures = json.loads(response.content)
         assert temperatures == ["25.5"]
 
+    def test_get_temperature_summary(self):
+        """Test the summary mode returns a distribution instead of raw values."""
+        response = self.client.post(
+            "/api/measurements/temperatures/",
+            json.dumps({"mode": "summary", "bins": 2, "quantiles": [0.5]}),
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        summary = json.loads(response.content)
+        assert summary["count"] == 3
+        assert summary["min"] == 25.5
+        assert summary["max"] == 30.0
+        assert summary["quantiles"] == {"0.5": 26.5}
+        assert summary["histogram"]["counts"] == [2, 1]
+
+    def test_get_temperature_summary_by_month(self):
+        """Test the summary mode applies the month filter."""
+        response = self.client.post(
+            "/api/measurements/temperatures/",
+            json.dumps({"mode": "summary", "month": 2}),
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        summary = json.loads(response.content)
+        assert summary["count"] == 1
+        assert summary["mean"] == 26.5
+
+    def test_invalid_summary_parameters(self):
+        """Test invalid modes and summary options are rejected."""
+        for body in ({"mode": "everything"}, {"mode": "summary", "bins": 0}, {"mode": "summary", "quantiles": [2]}):
+            response = self.client.post(
+                "/api/measurements/temperatures/", json.dumps(body), content_type="application/json"
+            )
+            assert response.status_code == 400
+
     @patch("measurements.views.parse_month_parameter")
     def test_invalid_month_parameter(self, mock_parse_month):
         """Test handling of invalid month parameter."""
@@ -273,12 +317,15 @@ class TemperatureCachingTest(TestCase):
         measurement = Measurement.objects.create(location=Point(5, 5), timestamp=jan_date, local_date=jan_date.date())
         Temperature.objects.create(measurement=measurement, value=25.5, time_waited=timedelta(seconds=10))
 
-    @patch("measurements.views._get_cached_temperature_results_for_months")
-    @patch("measurements.views._cache_temperature_results_by_month")
+    @patch("measurement_analysis.views.get_cached_partitions")
+    @patch("measurement_analysis.views.cache_partitions")
     def test_cache_hit_returns_cached_data(self, mock_cache_set, mock_cache_get):
         """Test that cached data is returned when available."""
         # Mock cache hit
-        mock_cache_get.return_value = (["25.5"], [])  # cached_results, missing_months
+        mock_cache_get.return_value = (
+            {1: TemperatureSketch.from_values(["25.5"])},
+            [],
+        )  # cached sketches, missing_months
 
         response = self.client.post(
             "/api/measurements/temperatures/",
@@ -291,12 +338,12 @@ class TemperatureCachingTest(TestCase):
         mock_cache_get.assert_called_once()
         mock_cache_set.assert_not_called()
 
-    @patch("measurements.views._get_cached_temperature_results_for_months")
-    @patch("measurements.views._cache_temperature_results_by_month")
+    @patch("measurement_analysis.views.get_cached_partitions")
+    @patch("measurement_analysis.views.cache_partitions")
     def test_cache_miss_fetches_and_caches_data(self, mock_cache_set, mock_cache_get):
         """Test that missing data is fetched and cached."""
         # Mock cache miss
-        mock_cache_get.return_value = ([], [1])  # cached_results, missing_months
+        mock_cache_get.return_value = ({}, [1])  # cached sketches, missing_months
 
         response = self.client.post(
             "/api/measurements/temperatures/",
@@ -308,15 +355,16 @@ class TemperatureCachingTest(TestCase):
         temperatures = json.loads(response.content)
         assert temperatures == ["25.5"]
 
-        mock_cache_get.assert_called_once()
+        # Looked up once, and once more after taking the computation lock
+        assert mock_cache_get.call_count == 2
         mock_cache_set.assert_called_once()
 
-    @patch("measurements.views._get_cached_temperature_results_for_months")
-    @patch("measurements.views._cache_temperature_results_by_month")
+    @patch("measurement_analysis.views.get_cached_partitions")
+    @patch("measurement_analysis.views.cache_partitions")
     def test_partial_cache_hit_combines_data(self, mock_cache_set, mock_cache_get):
         """Test combining cached and fresh data for partial cache hits."""
         # Mock partial cache hit
-        mock_cache_get.return_value = (["20.0"], [1])  # some cached, some missing
+        mock_cache_get.return_value = ({2: TemperatureSketch.from_values(["20.0"])}, [1])  # some cached, some missing
 
         response = self.client.post(
             "/api/measurements/temperatures/",
@@ -330,9 +378,58 @@ class TemperatureCachingTest(TestCase):
         assert "20.0" in temperatures  # cached data
         assert "25.5" in temperatures  # fresh data
 
-        mock_cache_get.assert_called_once()
+        # Looked up once, and once more after taking the computation lock
+        assert mock_cache_get.call_count == 2
         mock_cache_set.assert_called_once()
 
+    def test_temperature_partitions_cached_with_one_query(self):
+        """Test uncached months are fetched with a single query and served from the cache afterwards."""
+        with self.assertNumQueries(1):
+            first = self.client.post(
+                "/api/measurements/temperatures/", json.dumps({"month": [1, 2, 3]}), content_type="application/json"
+            )
+        with self.assertNumQueries(0):
+            second = self.client.post(
+                "/api/measurements/temperatures/", json.dumps({"month": 1}), content_type="application/json"
+            )
+
+        assert json.loads(first.content) == json.loads(second.content) == ["25.5"]
+
+    def test_last_30_days_sketches_cached_per_day(self):
+        """Test the last 30 days are merged from daily sketches, so a new day only computes that day."""
+        from measurement_analysis.views import build_cache_key
+
+        today = timezone.now().date()
+        measurement = Measurement.objects.create(location=Point(5, 5), local_date=today - timedelta(days=3))
+        Temperature.objects.create(measurement=measurement, value=21.0, time_waited=timedelta(seconds=10))
+        cache.clear()
+
+        first = self.client.post("/api/measurements/temperatures/", json.dumps({"month": 0}), "application/json")
+        cache.delete(build_cache_key("temperature_values", today))
+        with self.assertNumQueries(1):
+            second = self.client.post("/api/measurements/temperatures/", json.dumps({"month": 0}), "application/json")
+
+        assert json.loads(first.content) == json.loads(second.content) == ["21.0"]
+
+    def test_last_30_days_include_later_dates(self):
+        """Test measurements dated after the last 30 days are counted in its last day."""
+        from measurement_analysis.views import last_30_days
+
+        from measurements.views import _fetch_temperature_day_sketches
+
+        measurement = Measurement.objects.create(
+            location=Point(5, 5), local_date=timezone.now().date() + timedelta(days=10)
+        )
+        Temperature.objects.create(measurement=measurement, value=23.0, time_waited=timedelta(seconds=10))
+        cache.clear()
+
+        days = last_30_days()
+        assert set(_fetch_temperature_day_sketches(None, days)) == {days[-1]}
+        assert set(_fetch_temperature_day_sketches(None, days[:-1])) == set()
+
+        response = self.client.post("/api/measurements/temperatures/", json.dumps({"month": 0}), "application/json")
+        assert json.loads(response.content) == ["23.0"]
+
 
 class TemperatureHelperFunctionsTest(TestCase):
     """Test suite for temperature view helper functions."""
@@ -352,7 +449,7 @@ class TemperatureHelperFunctionsTest(TestCase):
         Measurement.objects.create(location=Point(6, 6), timestamp=timezone.now(), local_date=timezone.now().date())
 
         queryset = _build_temperature_queryset()
-        temperatures = list(queryset.values_list("temperature__value", flat=True))
+        temperatures = list(queryset.values_list("temperature_value", flat=True))
         assert temperatures == [25.5]
 
     def test_build_temperature_cache_key_for_month(self):
@@ -368,40 +465,48 @@ class TemperatureHelperFunctionsTest(TestCase):
         assert "temperature_values" in key
         assert "1" in key
 
-    @patch("measurements.views.cache")
-    def test_cache_temperature_results_by_month_single_month(self, mock_cache):
-        """Test caching results for a single month."""
-        from measurements.views import _cache_temperature_results_by_month
+    def test_fetch_temperature_sketches_groups_by_month(self):
+        """Test sketches are built per month from a single grouped query."""
+        from measurements.views import _fetch_temperature_sketches
 
-        results = [25.5, 26.0]
-        polygon = Polygon.from_bbox((0, 0, 10, 10))
-        months = [1]
+        for month, value in ((1, 20.0), (1, 20.0), (2, 22.5)):
+            measurement = Measurement.objects.create(location=Point(5, 5), local_date=f"2024-{month:02d}-10")
+            Temperature.objects.create(measurement=measurement, value=value, time_waited=timedelta(seconds=10))
+
+        with self.assertNumQueries(1):
+            sketches = _fetch_temperature_sketches(None, [1, 2, 3])
+
+        assert set(sketches) == {1, 2}
+        assert sketches[1].counts == {200: 2}
+        assert sketches[2].counts == {225: 1}
 
-        # Create a queryset mock for the function to use
-        with patch("measurements.views._build_temperature_queryset") as mock_queryset:
-            mock_qs = MagicMock()
-            mock_qs.annotate.return_value.values_list.return_value = [(25.5, 1), (26.0, 1)]
-            mock_queryset.return_value = mock_qs
+    @patch("measurement_analysis.views.cache")
+    def test_cache_temperature_sketches(self, mock_cache):
+        """Test caching one sketch per month."""
+        from measurement_analysis.views import cache_partitions
+
+        polygon = Polygon.from_bbox((0, 0, 10, 10))
+        sketches = {1: TemperatureSketch.from_values([25.5]), 2: TemperatureSketch.from_values([26.0])}
 
-            _cache_temperature_results_by_month(results, polygon.wkt, months)
-            mock_cache.set.assert_called_once()
+        cache_partitions("temperature_values", sketches, polygon.wkt)
+        assert mock_cache.set.call_count == 2
 
-    @patch("measurements.views.cache")
-    def test_cache_temperature_results_by_month_last_30_days(self, mock_cache):
-        """Test caching results for last 30 days (month=0)."""
-        from measurements.views import _cache_temperature_results_by_month
+    @patch("measurement_analysis.views.cache")
+    def test_cache_temperature_sketches_last_30_days(self, mock_cache):
+        """Test caching the sketches for last 30 days (month=0) per day."""
+        from measurement_analysis.views import cache_partitions, last_30_days
 
-        results = [25.5, 26.0]
         polygon = Polygon.from_bbox((0, 0, 10, 10))
-        months = [0]  # Last 30 days
+        day = last_30_days()[-2]
 
-        _cache_temperature_results_by_month(results, polygon.wkt, months)
+        cache_partitions("temperature_values", {day: TemperatureSketch.from_values([25.5, 26.0])}, polygon.wkt)
         mock_cache.set.assert_called_once()
+        assert ":day:" in mock_cache.set.call_args[0][0]
+        assert mock_cache.set.call_args[0][0].endswith(day.isoformat())
 
-    def test_cache_temperature_results_empty_data(self):
+    def test_cache_temperature_sketches_empty_data(self):
         """Test that empty data doesn't cause caching errors."""
-        from measurements.views import _cache_temperature_results_by_month
+        from measurement_analysis.views import cache_partitions
 
         # Should not raise exceptions with empty data
-        _cache_temperature_results_by_month([], None, [])
-        _cache_temperature_results_by_month(None, None, None)
+        cache_partitions("temperature_values", {}, None)
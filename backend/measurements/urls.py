@@ -9,6 +9,7 @@ app_name = "measurements"
 urlpatterns = [
     path("search/", views.measurement_search, name="measurement_search"),
     path("temperatures/", views.temperature_view, name="temperature_view"),
+    path("changes/", views.measurement_changes, name="measurement_changes"),
     path("", views.measurement_view, name="measurement_view"),
     path("aggregated/", include("measurement_analysis.urls")),
 ]
@@ -1,32 +1,46 @@
 """Create views associated with measurements."""
 
+import json
 import logging
 import os
 
-from django.core.cache import cache
-from django.db.models.expressions import RawSQL
-from django.http import HttpResponseNotAllowed, JsonResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
 from dotenv import load_dotenv
+from measurement_analysis.conditional import conditional_view
+from measurement_analysis.models import RegionAggregate
+from measurement_analysis.regions import ALL_MONTHS, apply_region_filter, get_region, get_region_payloads
 from measurement_analysis.views import (
+    analysis_versions,
     apply_boundary_filter,
+    apply_day_filter,
     apply_month_filter,
     build_cache_key,
-    get_cached_results_for_months,
+    canonical_redirect,
+    get_partitions,
+    last_30_days,
     parse_month_parameter,
+    read_analysis_request,
 )
+from measurement_analysis.warming import record_request
 from measurement_collection.views import add_measurement_view
+from measurement_export.changes import get_changes
 from measurement_export.views import (
     apply_location_annotations,
     build_base_queryset,
     prepare_measurement_data,
     search_measurements_view,
 )
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, authentication_classes
 
-from .models import Measurement
+from .distribution import TemperatureSketch, parse_summary_options
+from .models import MeasurementMetrics
 
 load_dotenv()
-cache_timeout = int(os.getenv("DJANGO_CACHE_TIMEOUT", 300))  # Default to 5 minutes
+# Measurements per page of the listing, and the largest page a client may request
+measurement_page_size = int(os.getenv("DJANGO_MEASUREMENT_PAGE_SIZE", 500))
+measurement_max_page_size = int(os.getenv("DJANGO_MEASUREMENT_MAX_PAGE_SIZE", 5000))
 
 logger = logging.getLogger("WATERWATCH")
 
@@ -58,28 +72,111 @@ def measurement_view(request):
 
 
 def get_all_measurements(request):
-    """Export all measurements with related metrics, campaigns, and user info.
+    """Export measurements with related metrics, campaigns, and user info, one page at a time.
+
+    Pages are selected by keyset on the measurement ID, so each page costs the same no matter
+    how deep into the listing it is. With ``stream=true`` all measurements are streamed as
+    newline-delimited JSON instead, fetched in pages of the same size.
 
     Parameters
     ----------
     request : HttpRequest
-        The HTTP request object
+        The HTTP request object, with optional query parameters:
+        - cursor: ID of the last measurement of the previous page
+        - page_size: Number of measurements per page, capped at the maximum page size
+        - stream: "true" to stream all measurements as NDJSON
 
     Returns
     -------
-    JsonResponse
-        JSON response containing measurements with related metrics and campaigns.
+    JsonResponse | StreamingHttpResponse
+        The page of measurements and the cursor of the next page, or the NDJSON stream.
     """
-    user = request.user
-    if not user.groups.filter(name="researcher").exists() and not user.is_superuser and not user.is_staff:
+    if not _can_export(request.user):
         return JsonResponse({"error": "Forbidden: insufficient permissions"}, status=403)
 
+    try:
+        cursor, page_size = _parse_page_parameters(request.GET)
+    except ValueError as err:
+        return JsonResponse({"error": str(err)}, status=400)
+
     # Start with our base queryset
     qs = build_base_queryset(ordered=True)
     # Add geographic annotations and prepare complete data
     qs = apply_location_annotations(qs)
-    data = prepare_measurement_data(qs)
-    return JsonResponse(data, safe=False, json_dumps_params={"indent": 2})
+
+    if request.GET.get("stream") == "true":
+        rows = _stream_measurements(qs, cursor, page_size)
+        response = StreamingHttpResponse(rows, content_type="application/x-ndjson")
+        response["Content-Disposition"] = 'attachment; filename="measurements.ndjson"'
+        return response
+
+    # Fetch one extra measurement to know whether there is a next page
+    data = prepare_measurement_data(qs.filter(id__gt=cursor)[: page_size + 1])
+    results = data[:page_size]
+    next_cursor = results[-1]["id"] if len(data) > page_size else None
+    return JsonResponse({"results": results, "next_cursor": next_cursor})
+
+
+@api_view(["GET"])
+def measurement_changes(request):
+    """Get the measurements inserted, updated or deleted since a cursor of the change log.
+
+    Lets a downstream copy stay in sync by reading only what changed since its last sync,
+    starting from cursor 0 for a full copy.
+
+    Parameters
+    ----------
+    request : HttpRequest
+        The HTTP request object, with optional query parameters:
+        - cursor: ``next_cursor`` of the previous response
+        - page_size: Maximum number of changes to read, capped at the maximum page size
+
+    Returns
+    -------
+    JsonResponse
+        The changed measurements, the cursor to continue from and whether more changes are available,
+        or a 400 JSON response if the cursor is not a change of the log.
+    """
+    if not _can_export(request.user):
+        return JsonResponse({"error": "Forbidden: insufficient permissions"}, status=403)
+
+    try:
+        cursor, page_size = _parse_page_parameters(request.GET)
+        changes = get_changes(cursor, page_size)
+    except ValueError as err:
+        return JsonResponse({"error": str(err)}, status=400)
+    return JsonResponse(changes)
+
+
+def _can_export(user):
+    """Check whether a user may export measurements."""
+    return user.groups.filter(name="researcher").exists() or user.is_superuser or user.is_staff
+
+
+def _parse_page_parameters(query_params):
+    """Parse the cursor and page size of the measurement listing.
+
+    Raises a ValueError if either is not a valid integer.
+    """
+    try:
+        cursor = int(query_params.get("cursor", 0))
+        page_size = int(query_params.get("page_size", measurement_page_size))
+    except ValueError:
+        raise ValueError("cursor and page_size must be integers") from None
+    if cursor < 0 or page_size < 1:
+        raise ValueError("cursor must be non-negative and page_size positive")
+    return cursor, min(page_size, measurement_max_page_size)
+
+
+def _stream_measurements(queryset, cursor, page_size):
+    """Yield all measurements after the cursor as NDJSON lines, one page in memory at a time."""
+    while True:
+        page = prepare_measurement_data(queryset.filter(id__gt=cursor)[:page_size])
+        for row in page:
+            yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+        if len(page) < page_size:
+            return
+        cursor = page[-1]["id"]
 
 
 @api_view(["POST"])
@@ -111,9 +208,8 @@ def measurement_search(request):
 
 def _build_temperature_queryset(boundary_geometry=None, months=None):
     """Build an optimized queryset for temperature data only."""
-    # Only select_related temperature since that's all we need
-    queryset = Measurement.objects.select_related("temperature")
-    queryset = queryset.filter(temperature__isnull=False)
+    # Read from the wide metrics table to avoid joining the temperature table
+    queryset = MeasurementMetrics.objects.filter(temperature_value__isnull=False)
 
     # Apply boundary filter if provided
     queryset = apply_boundary_filter(queryset, boundary_geometry)
@@ -127,95 +223,159 @@ def _build_temperature_cache_key_for_month(boundary_geometry, month):
     return build_cache_key("temperature_values", month, boundary_geometry)
 
 
-def _get_cached_temperature_results_for_months(boundary_geometry, months):
-    """Get cached temperature results for multiple months and identify which are missing."""
-    return get_cached_results_for_months("temperature_values", months, boundary_geometry)
+def _fetch_temperature_sketches(boundary_geometry, months):
+    """Build one temperature sketch per month with a single grouped query.
+
+    Returns a dictionary mapping month to sketch. Months without temperatures are left out.
+    """
+    queryset = _build_temperature_queryset(boundary_geometry, months)
+
+    sketches = {}
+    rows = queryset.values("local_month", "temperature_value").annotate(n=Count("id")).order_by()
+    for row in rows:
+        sketches.setdefault(row["local_month"], TemperatureSketch()).add(row["temperature_value"], row["n"])
+    return sketches
 
 
-def _cache_temperature_results_by_month(results_list, boundary_geometry, months):
-    """Cache temperature results grouped by month."""
-    if not results_list or not months:
-        return
+def _fetch_temperature_day_sketches(boundary_geometry, days):
+    """Build one temperature sketch per day of the last 30 days with a single grouped query.
 
+    Returns a dictionary mapping day to sketch. Days without temperatures are left out.
+    """
+    queryset = apply_day_filter(_build_temperature_queryset(boundary_geometry), days)
+
+    sketches = {}
+    rows = queryset.values("day", "temperature_value").annotate(n=Count("id")).order_by()
+    for row in rows:
+        sketches.setdefault(row["day"], TemperatureSketch()).add(row["temperature_value"], row["n"])
+    return sketches
+
+
+def _get_temperature_sketch(boundary_geometry, months):
+    """Get the temperature sketch for a boundary and months, merging cached per-month or per-day sketches."""
+    if not months:
+        # If no months specified, summarize all data without smart caching
+        rows = _build_temperature_queryset(boundary_geometry).values("temperature_value").annotate(n=Count("id"))
+        return TemperatureSketch.from_value_counts((row["temperature_value"], row["n"]) for row in rows.order_by())
+
+    if months == [0]:
+        # The last 30 days are merged from cached daily sketches
+        sketches = get_partitions(
+            "temperature_values",
+            last_30_days(),
+            boundary_geometry,
+            lambda missing_days: _fetch_temperature_day_sketches(boundary_geometry, missing_days),
+        )
+        return TemperatureSketch.merged(sketches.values())
+
+    sketches = get_partitions(
+        "temperature_values",
+        months,
+        boundary_geometry,
+        lambda missing_months: _fetch_temperature_sketches(boundary_geometry, missing_months),
+    )
+    return TemperatureSketch.merged(sketches.values())
+
+
+def compute_region_temperature_payloads(region, months):
+    """Build the temperature sketch payload of every month for a region."""
+    queryset = apply_region_filter(MeasurementMetrics.objects.filter(temperature_value__isnull=False), region)
+    rows = queryset.filter(local_month__in=months).values("local_month", "temperature_value").annotate(n=Count("id"))
+
+    sketches = {month: TemperatureSketch() for month in months}
+    for row in rows.order_by():
+        sketches[row["local_month"]].add(row["temperature_value"], row["n"])
+    return {month: sketch.to_payload() for month, sketch in sketches.items()}
+
+
+def _get_region_temperature_sketch(region, months):
+    """Get the temperature sketch of a saved region from its precomputed monthly sketches."""
     if 0 in months:
-        # For last 30 days, cache all results together
-        cache_key = _build_temperature_cache_key_for_month(boundary_geometry, 0)
-        cache.set(cache_key, results_list, cache_timeout)
-    else:
-        # We need to fetch the data with month info to group properly
-        # This requires modifying the queryset to include month data
-        queryset = _build_temperature_queryset(boundary_geometry, months)
-        queryset = queryset.annotate(month=RawSQL("EXTRACT(month FROM local_date)", []))
-        results_with_month = queryset.values_list("temperature__value", "month")
-
-        # Group by month
-        results_by_month = {}
-        for temp_value, month in results_with_month:
-            if month not in results_by_month:
-                results_by_month[month] = []
-            results_by_month[month].append(temp_value)
-
-        # Cache each month's results
-        for month, month_results in results_by_month.items():
-            cache_key = _build_temperature_cache_key_for_month(boundary_geometry, month)
-            cache.set(cache_key, month_results, cache_timeout)
+        # The last 30 days move every day, so they are not precomputed
+        queryset = apply_month_filter(
+            apply_region_filter(MeasurementMetrics.objects.filter(temperature_value__isnull=False), region), months
+        )
+        rows = queryset.values("temperature_value").annotate(n=Count("id")).order_by()
+        return TemperatureSketch.from_value_counts((row["temperature_value"], row["n"]) for row in rows)
 
+    payloads = get_region_payloads(
+        region,
+        RegionAggregate.TEMPERATURE_VALUES,
+        months or ALL_MONTHS,
+        lambda missing_months: compute_region_temperature_payloads(region, missing_months),
+    )
+    return TemperatureSketch.merged(TemperatureSketch.from_payload(payload) for payload in payloads.values())
 
-@api_view(["POST"])
+
+# Parameters of the temperature view besides the month, region and boundary
+SUMMARY_PARAMETERS = ("mode", "bins", "quantiles")
+
+
+def _temperature_versions(request):
+    return analysis_versions(request, SUMMARY_PARAMETERS)
+
+
+@conditional_view(_temperature_versions, methods=("GET", "HEAD", "POST"))
+@api_view(["GET", "POST"])
+# Public data; not reading the session keeps `Vary: Cookie` off, so a proxy can share responses
+@authentication_classes([])
 def temperature_view(request):
     """
-    Handle POST requests to retrieve temperature measurements with smart caching.
+    Handle requests to retrieve temperature measurements with smart caching.
+
+    Responses carry an ETag derived from the versions of the months they read, so a client
+    sending it back in ``If-None-Match`` receives a 304 while the data did not change.
+
+    The parameters are sent as a JSON body with POST, or as query parameters with GET (with
+    comma-separated quantiles), which a caching proxy can store. GET requests are redirected to
+    their canonical URL (see ``canonical_query``) first.
 
     Parameters
     ----------
     request : HttpRequest
         The HTTP request object containing JSON data with optional:
         - month: Month parameter for temporal filtering
-        - boundary_geometry: WKT of a polygon to filter measurements within that area
+        - region: Id of a saved region, served from precomputed sketches
+        - boundary_geometry: WKT of a polygon to filter measurements within that area, used if no region is given
+        - mode: "raw" (default) for all values, or "summary" for a server-computed distribution
+        - bins: Number of histogram bins in summary mode
+        - quantiles: List of quantiles (0-1) to compute in summary mode
 
     Returns
     -------
     JsonResponse
-        A JSON response containing a list of temperature values.
+        A JSON response containing a list of temperature values, or in summary mode an object
+        with count, mean, std, min, max, quantiles and histogram.
     """
-    data = request.data or {}
+    redirect = canonical_redirect(request, SUMMARY_PARAMETERS)
+    if redirect is not None:
+        return redirect
+
+    data = read_analysis_request(request)
     boundary_geometry = data.get("boundary_geometry", None)
     month_param = data.get("month", None)
+    region_id = data.get("region", None)
+    mode = data.get("mode", "raw")
+    if mode not in ("raw", "summary"):
+        return JsonResponse({"error": "Invalid mode; must be 'raw' or 'summary'"}, status=400)
 
     try:
         # Parse month parameter using shared utility
         months = parse_month_parameter(month_param)
+        bins, quantiles = parse_summary_options(data) if mode == "summary" else (None, None)
 
-        # Try to get cached results
-        if months:
-            cached_results, missing_months = _get_cached_temperature_results_for_months(boundary_geometry, months)
-
-            # If we have all results cached, return them
-            if not missing_months:
-                return JsonResponse(cached_results, safe=False, json_dumps_params={"indent": 2})
-
-            # Otherwise, we need to fetch missing months
-            months_to_fetch = missing_months
+        if region_id is not None:
+            sketch = _get_region_temperature_sketch(get_region(region_id), months)
         else:
-            cached_results = []
-            months_to_fetch = []
+            sketch = _get_temperature_sketch(boundary_geometry, months)
+            if months:
+                record_request("temperature_values", months, boundary_geometry)
 
-        # Fetch missing data
-        if months_to_fetch:
-            queryset = _build_temperature_queryset(boundary_geometry, months_to_fetch)
-            new_temperature_values = list(queryset.values_list("temperature__value", flat=True))
-
-            # Cache the new results
-            _cache_temperature_results_by_month(new_temperature_values, boundary_geometry, months_to_fetch)
-
-            # Combine with cached results
-            all_results = cached_results + new_temperature_values
-        else:
-            # If no months specified, get all data without smart caching
-            queryset = _build_temperature_queryset(boundary_geometry, months)
-            all_results = list(queryset.values_list("temperature__value", flat=True))
+        if mode == "summary":
+            return JsonResponse(sketch.summary(bins, quantiles))
 
-        return JsonResponse(all_results, safe=False, json_dumps_params={"indent": 2})
+        values = sketch.values()
+        return JsonResponse(values, safe=False, json_dumps_params={"indent": 2})
 
     except ValueError as e:
         return JsonResponse({"error": str(e)}, status=400)